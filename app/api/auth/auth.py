@@ -1,16 +1,33 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 
 from dotenv import load_dotenv
-from fastapi import Depends, HTTPException, Request
+from fastapi import (
+    Depends,
+    HTTPException,
+    Request,
+    WebSocket,
+    WebSocketException,
+    status,
+)
+from fastapi.requests import HTTPConnection
 from fastapi.security import OAuth2PasswordBearer
+from fastapi.security.utils import get_authorization_scheme_param
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.invalidation import bus
 from app.dependencies import get_async_db
 from app.models.users import User
+from app.schemas.users import UserRoleEnum
 
 load_dotenv()
 
@@ -18,6 +35,12 @@ load_dotenv()
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+AUTH_STATELESS = settings.AUTH_STATELESS
+STATELESS_ACCESS_TOKEN_EXPIRE_MINUTES = settings.STATELESS_ACCESS_TOKEN_EXPIRE_MINUTES
+TOKEN_CLAIMS_VERSION = settings.TOKEN_CLAIMS_VERSION
+USER_CACHE_ENABLED = settings.USER_CACHE_ENABLED
+PASSWORD_HASH_EXECUTOR = settings.PASSWORD_HASH_EXECUTOR
+PASSWORD_HASH_WORKERS = settings.PASSWORD_HASH_WORKERS
 
 # PASSWORD HASH
 pwd_context = CryptContext(
@@ -25,16 +48,80 @@ pwd_context = CryptContext(
 )
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
+# USER CACHE (sub email -> Principal snapshot)
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+bus.register("user", user_cache.invalidate, user_cache.clear)
+
+# PRINCIPAL
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated user snapshot (token claims or cache), not bound to a session."""
+
+    id: int
+    email: str
+    role: UserRoleEnum
+    is_active: bool
+
+
+def principal_from_claims(payload: dict) -> Principal | None:
+    if payload.get("ver") != TOKEN_CLAIMS_VERSION:
+        return None
+
+    try:
+        return Principal(
+            id=int(payload["uid"]),
+            email=payload["sub"],
+            role=UserRoleEnum(payload["role"]),
+            is_active=bool(payload["active"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def principal_from_user(user: User) -> Principal:
+    return Principal(
+        id=user.id,
+        email=user.email,
+        role=UserRoleEnum(user.role),
+        is_active=bool(user.is_active),
+    )
+
+
+async def invalidate_cached_user(*emails: str | None, version: int = 0):
+    # on every worker; ``version`` is the row version after the write
+    for email in emails:
+        if email is not None:
+            await bus.invalidate("user", email, version)
+
+
 # TOKENS
 
 
-def create_access_token(data: dict):
+def create_access_token(data: dict, expires_minutes: int | None = None):
     expires = datetime.now(timezone.utc) + timedelta(
-        minutes=ACCESS_TOKEN_EXPIRE_MINUTES
+        minutes=expires_minutes or ACCESS_TOKEN_EXPIRE_MINUTES
     )
     return jwt.encode({**data, "exp": expires}, SECRET_KEY, algorithm=ALGORITHM)
 
 
+def create_user_access_token(user: User):
+    if not AUTH_STATELESS:
+        return create_access_token({"sub": user.email})
+
+    claims = {
+        "sub": user.email,
+        "uid": user.id,
+        "role": UserRoleEnum(user.role).value,
+        "active": bool(user.is_active),
+        "ver": TOKEN_CLAIMS_VERSION,
+    }
+    return create_access_token(claims, STATELESS_ACCESS_TOKEN_EXPIRE_MINUTES)
+
+
 def create_refresh_token(data: dict):
     expires = datetime.now(timezone.utc) + timedelta(days=7)
     return jwt.encode({**data, "exp": expires}, SECRET_KEY, algorithm=ALGORITHM)
@@ -75,13 +162,26 @@ def verify_refresh_token(request: Request):
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
-) -> User:
+) -> User | Principal:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise HTTPException(status_code=401, detail="Invalid token payload")
 
+        # fast path: trust the claims, reload only stale or claim-less tokens
+        if AUTH_STATELESS:
+            principal = principal_from_claims(payload)
+            if principal is not None:
+                if not principal.is_active:
+                    raise HTTPException(status_code=403, detail="User is not active")
+                return principal
+
+        if USER_CACHE_ENABLED:
+            principal = user_cache.get(email)
+            if principal is not None:
+                return principal
+
         query = await db.execute(select(User).where(User.email == email))
         user = query.scalars().first()
 
@@ -91,12 +191,73 @@ async def get_current_user(
         if not user.is_active:
             raise HTTPException(status_code=403, detail="User is not active")
 
+        # a write that raced this read may have invalidated the row already
+        if USER_CACHE_ENABLED and user.version >= bus.version_of("user", email):
+            user_cache.set(email, principal_from_user(user))
+
         return user
 
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
 
+async def get_websocket_user(
+    websocket: WebSocket, db: AsyncSession = Depends(get_async_db)
+) -> User | Principal:
+    # browsers cannot set headers on a WebSocket handshake, so ?token= also works
+    token = websocket.query_params.get("token")
+    if token is None:
+        scheme, param = get_authorization_scheme_param(
+            websocket.headers.get("Authorization")
+        )
+        token = param if scheme.lower() == "bearer" else None
+
+    if not token:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION, reason="Not authenticated"
+        )
+
+    try:
+        return await get_current_user(token=token, db=db)
+    except HTTPException as e:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION, reason=str(e.detail)
+        )
+
+
+def token_subject(connection: HTTPConnection) -> str | None:
+    """Email of a validly signed bearer token, for per-user rate limits."""
+    scheme, token = get_authorization_scheme_param(
+        connection.headers.get("Authorization")
+    )
+    if scheme.lower() != "bearer" or not token:
+        return None
+
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+
+async def get_fresh_user(
+    current_user: User | Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    if isinstance(current_user, User):
+        return current_user
+
+    user = await db.get(User, current_user.id)
+
+    if user is None:
+        raise HTTPException(status_code=401, detail="User is not found")
+
+    if not user.is_active:
+        raise HTTPException(status_code=403, detail="User is not active")
+
+    return user
+
+
 # OTHER
 
 
@@ -106,3 +267,86 @@ def hash_password(password: str) -> str:
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
+
+
+# PASSWORD HASH EXECUTOR
+
+_hash_executor: Executor | None = None
+
+
+def _hash_mp_context():
+    # forking a process that already runs threads (the event loop's
+    # executors, aiosqlite, the pool) can copy a held lock into the child
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+
+
+def _create_hash_executor(kind: str) -> Executor:
+    if kind == "process":
+        try:
+            return ProcessPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS, mp_context=_hash_mp_context()
+            )
+        except (ImportError, NotImplementedError, OSError, ValueError):
+            pass
+
+    return ThreadPoolExecutor(
+        max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+    )
+
+
+def get_hash_executor() -> Executor | None:
+    global _hash_executor
+
+    if PASSWORD_HASH_EXECUTOR == "inline":
+        return None
+
+    if _hash_executor is None:
+        _hash_executor = _create_hash_executor(PASSWORD_HASH_EXECUTOR)
+    return _hash_executor
+
+
+def start_hash_executor():
+    """Starts the hash workers; the lifespan calls it before other threads run."""
+    executor = get_hash_executor()
+    if isinstance(executor, ProcessPoolExecutor):
+        # workers are started by the first submit, not by the constructor
+        executor.submit(int)
+
+
+def shutdown_hash_executor():
+    global _hash_executor
+
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+
+async def _run_in_hash_executor(func, *args):
+    global _hash_executor
+
+    executor = get_hash_executor()
+    if executor is None:
+        return func(*args)
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(executor, func, *args)
+    except (BrokenProcessPool, OSError):
+        if not isinstance(executor, ProcessPoolExecutor):
+            raise
+
+    # process pool is unusable here, fall back to threads for the process lifetime
+    executor.shutdown(wait=False, cancel_futures=True)
+    _hash_executor = _create_hash_executor("thread")
+    return await loop.run_in_executor(_hash_executor, func, *args)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_hash_executor(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_hash_executor(verify_password, plain_password, hashed_password)
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, Form, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.admission import priority_lane
+from app.core.ratelimit import Rate, RateLimit
 from app.dependencies import get_async_db
 from app.schemas.users import UserAuthSchema, UserCreateSchema, UserResponseSchema
 from app.services.auth_service import (
@@ -10,22 +12,33 @@ from app.services.auth_service import (
     register_user,
 )
 
-router_auth = APIRouter(prefix="/auth", tags=["Auth"])
+# logins keep working while the database limiter sheds other traffic
+router_auth = APIRouter(
+    prefix="/auth", tags=["Auth"], dependencies=[Depends(priority_lane)]
+)
+
+# each of these hashes a password: cap guesses per client and the CPU overall
+password_limit = RateLimit("auth_password", per_ip=Rate(10, 60), per_route=Rate(50, 1))
+refresh_limit = RateLimit("auth_refresh", per_ip=Rate(30, 60))
 
 
-@router_auth.post("/register", response_model=UserResponseSchema)
+@router_auth.post(
+    "/register",
+    response_model=UserResponseSchema,
+    dependencies=[Depends(password_limit)],
+)
 async def register(
     user_data: UserCreateSchema, db: AsyncSession = Depends(get_async_db)
 ):
     return await register_user(user_data, db)
 
 
-@router_auth.post("/login")
+@router_auth.post("/login", dependencies=[Depends(password_limit)])
 async def login(creds: UserAuthSchema, db: AsyncSession = Depends(get_async_db)):
     return await login_user(creds, db)
 
 
-@router_auth.post("/token")
+@router_auth.post("/token", dependencies=[Depends(password_limit)])
 async def login_token(
     response: Response,
     username: str = Form(...),
@@ -35,9 +48,9 @@ async def login_token(
     return await login_user_token(response, username, password, db)
 
 
-@router_auth.post("/refresh")
-async def refresh_token(request: Request):
-    return await refresh_user_token(request)
+@router_auth.post("/refresh", dependencies=[Depends(refresh_limit)])
+async def refresh_token(request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await refresh_user_token(request, db)
 
 
 @router_auth.post("/logout")
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from app.core.database import engine
+from app.core.pool import pool_stats
+
+router_health = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router_health.get("/live")
+async def live():
+    return {"status": "ok"}
+
+
+@router_health.get("/ready")
+async def ready(request: Request):
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready"}
+
+
+@router_health.get("/pool")
+async def pool():
+    return pool_stats(engine)
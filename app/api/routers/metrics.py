@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.api.auth.auth import user_cache
+from app.core.admission import db_limiter
+from app.core.database import engine
+from app.core.invalidation import bus
+from app.core.live import hub
+from app.core.metrics import metrics
+from app.core.pool import pool_stats
+from app.core.ratelimit import rate_limit_stats
+from app.services.tasks_service import task_list_flights
+
+router_metrics = APIRouter(tags=["Metrics"])
+
+
+@router_metrics.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return metrics.render(
+        {
+            "db_pool": pool_stats(engine),
+            "db_limit": db_limiter.stats(),
+            "auth_user_cache": user_cache.stats(),
+            "live": hub.stats(),
+            "invalidation": bus.stats(),
+            "rate_limit": rate_limit_stats(),
+            "task_list_flights": task_list_flights.stats(),
+        }
+    )
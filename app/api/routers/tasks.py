@@ -1,21 +1,42 @@
-from typing import List
+from typing import Annotated, List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query, WebSocket
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.auth.auth import get_current_user
+from app.api.auth.auth import get_current_user, get_websocket_user, token_subject
+from app.core.ratelimit import Rate, RateLimit
+from app.core.responses import PreEncodedJSONResponse
 from app.dependencies import get_async_db
 from app.models.users import User
-from app.schemas.tasks import TaskCreateSchema, TaskResponseSchema, TaskUpdateSchema
+from app.schemas.tasks import (
+    TaskBulkResultSchema,
+    TaskBulkSchema,
+    TaskChangesParamsSchema,
+    TaskChangesSchema,
+    TaskCreateSchema,
+    TaskExportParamsSchema,
+    TaskListParamsSchema,
+    TaskResponseSchema,
+    TaskUpdateSchema,
+)
 from app.services.tasks_service import (
+    bulk_tasks_from_user,
     create_task_user,
     delete_task_from_user,
+    export_tasks_from_user,
+    get_task_changes,
     get_task_from_user,
     get_tasks_from_user,
+    stream_task_events,
     update_task_from_user,
+    websocket_task_events,
 )
 
-router_tasks = APIRouter(prefix="/{user_id}/tasks", tags=["Tasks"])
+tasks_limit = RateLimit("tasks", per_user=Rate(600, 60), user_key=token_subject)
+
+router_tasks = APIRouter(
+    prefix="/{user_id}/tasks", tags=["Tasks"], dependencies=[Depends(tasks_limit)]
+)
 
 
 @router_tasks.post("/", response_model=TaskResponseSchema)
@@ -30,32 +51,119 @@ async def create_task(
     )
 
 
-@router_tasks.get("/", response_model=List[TaskResponseSchema])
+@router_tasks.post("/bulk", response_model=TaskBulkResultSchema)
+async def bulk_tasks(
+    user_id: int,
+    bulk_data: TaskBulkSchema,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    return await bulk_tasks_from_user(
+        user_id=user_id, bulk_data=bulk_data, db=db, current_user=current_user
+    )
+
+
+@router_tasks.get("/export")
+async def export_tasks(
+    user_id: int,
+    params: Annotated[TaskExportParamsSchema, Query()],
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    return await export_tasks_from_user(
+        user_id=user_id, db=db, current_user=current_user, params=params
+    )
+
+
+@router_tasks.get(
+    "/changes",
+    response_model=TaskChangesSchema,
+    response_class=PreEncodedJSONResponse,
+)
+async def get_changes(
+    user_id: int,
+    params: Annotated[TaskChangesParamsSchema, Query()],
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    return await get_task_changes(
+        user_id=user_id, db=db, current_user=current_user, params=params
+    )
+
+
+@router_tasks.get("/stream")
+async def stream_tasks(
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    return await stream_task_events(user_id=user_id, db=db, current_user=current_user)
+
+
+@router_tasks.websocket("/ws")
+async def tasks_websocket(
+    websocket: WebSocket,
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_websocket_user),
+):
+    await websocket_task_events(
+        websocket=websocket, user_id=user_id, db=db, current_user=current_user
+    )
+
+
+@router_tasks.get(
+    "/",
+    response_model=List[TaskResponseSchema],
+    response_class=PreEncodedJSONResponse,
+)
 async def get_tasks(
     user_id: int,
+    params: Annotated[TaskListParamsSchema, Query()],
+    if_none_match: Annotated[str | None, Header()] = None,
     db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    return await get_tasks_from_user(user_id=user_id, db=db, current_user=current_user)
+    return await get_tasks_from_user(
+        user_id=user_id,
+        db=db,
+        current_user=current_user,
+        params=params,
+        if_none_match=if_none_match,
+    )
 
 
-@router_tasks.get("/{task_id}", response_model=TaskResponseSchema)
+@router_tasks.get(
+    "/{task_id}",
+    response_model=TaskResponseSchema,
+    response_class=PreEncodedJSONResponse,
+)
 async def get_task(
     user_id: int,
     task_id: int,
+    if_none_match: Annotated[str | None, Header()] = None,
     db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     return await get_task_from_user(
-        user_id=user_id, task_id=task_id, db=db, current_user=current_user
+        user_id=user_id,
+        task_id=task_id,
+        db=db,
+        current_user=current_user,
+        if_none_match=if_none_match,
     )
 
 
-@router_tasks.put("/{task_id}", response_model=TaskResponseSchema)
+@router_tasks.put(
+    "/{task_id}",
+    response_model=TaskResponseSchema,
+    response_class=PreEncodedJSONResponse,
+)
 async def update_task(
     user_id: int,
     task_id: int,
     new_data: TaskUpdateSchema,
+    if_match: Annotated[str | None, Header()] = None,
     db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -65,6 +173,7 @@ async def update_task(
         new_data=new_data,
         db=db,
         current_user=current_user,
+        if_match=if_match,
     )
 
 
@@ -1,23 +1,34 @@
-from typing import List
+from typing import Annotated, List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.auth.auth import get_current_user
+from app.api.auth.auth import get_current_user, get_fresh_user, token_subject
+from app.core.ratelimit import Rate, RateLimit
 from app.dependencies import get_async_db
 from app.models.users import User
-from app.schemas.users import UserResponseSchema, UserUpdateSchema
+from app.schemas.users import (
+    UserListParamsSchema,
+    UserResponseSchema,
+    UserUpdateSchema,
+)
 from app.services.users_service import delete_user_, get_user_, get_users_, update_user_
 
-router_users = APIRouter(prefix="/users", tags=["User"])
+users_limit = RateLimit("users", per_user=Rate(120, 60), user_key=token_subject)
+
+router_users = APIRouter(
+    prefix="/users", tags=["User"], dependencies=[Depends(users_limit)]
+)
 
 
 @router_users.get("/", response_model=List[UserResponseSchema])
 async def get_users(
+    response: Response,
+    params: Annotated[UserListParamsSchema, Query()],
     db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    return await get_users_(db, current_user)
+    return await get_users_(db, current_user, params=params, response=response)
 
 
 @router_users.get("/{user_id}", response_model=UserResponseSchema)
@@ -34,7 +45,7 @@ async def update_user(
     user_id: int,
     new_data: UserUpdateSchema,
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_fresh_user),
 ):
     return await update_user_(user_id, new_data, db, current_user)
 
@@ -43,6 +54,6 @@ async def update_user(
 async def delete_user(
     user_id: int,
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_fresh_user),
 ):
     return await delete_user_(user_id, db, current_user)
@@ -0,0 +1,211 @@
+import asyncio
+import time
+from collections import deque
+
+from fastapi import HTTPException
+from fastapi.requests import HTTPConnection
+
+from app.core.config import settings
+from app.core.metrics import RequestStats
+
+DB_LIMIT_ENABLED = settings.DB_LIMIT_ENABLED
+
+# routes whose requests may exceed the limit and skip the queue
+PRIORITY = "priority"
+DEFAULT = "default"
+
+
+def priority_lane(connection: HTTPConnection):
+    """Router dependency putting the router's database work in the priority lane."""
+    connection.state.db_lane = PRIORITY
+
+
+def db_lane(connection: HTTPConnection) -> str:
+    return getattr(connection.state, "db_lane", DEFAULT)
+
+
+class Admission:
+    """One request's slot; ``release`` is idempotent."""
+
+    __slots__ = ("limiter", "lane", "started", "stats", "baseline", "released")
+
+    def __init__(
+        self,
+        limiter: "AdaptiveLimiter | None",
+        started: float = 0.0,
+        lane: str = DEFAULT,
+    ):
+        self.limiter = limiter
+        self.lane = lane
+        self.started = started
+        self.stats: RequestStats | None = None
+        self.baseline = 0.0
+        self.released = limiter is None
+
+    def track(self, stats: RequestStats):
+        """Samples the database time ``stats`` records from now on.
+
+        Without it the sample is the whole time the slot was held, which
+        counts work done off the database, such as password hashing.
+        """
+        self.stats = stats
+        self.baseline = stats.db_seconds + stats.pool_seconds
+
+    def latency(self) -> float:
+        if self.stats is None:
+            return self.limiter._timer() - self.started
+        return self.stats.db_seconds + self.stats.pool_seconds - self.baseline
+
+    def release(self, failed: bool = False):
+        if not self.released:
+            self.released = True
+            self.limiter.release(self.latency(), failed, self.lane)
+
+
+class AdaptiveLimiter:
+    """AIMD limit on the requests holding a database session at once.
+
+    Every default lane release is a latency sample: the database time of
+    the request, see ``Admission.track``. A sample within ``latency_target``
+    taken while the limit was in use grows the limit by ``1 / limit``,
+    about one per limit's worth of requests; a slower or failed one
+    multiplies it by ``backoff``, at most once per ``latency_target`` so
+    the requests already in flight do not collapse it. Over the limit,
+    requests wait up to ``queue_timeout`` in a bounded queue and are then
+    shed with a 503, rather than piling up on the pool and timing out
+    together. The priority lane gets ``priority_headroom`` slots above
+    the limit and is served from the queue first; its samples are not
+    taken, so a burst there cannot shrink the limit of the default lane.
+    """
+
+    def __init__(
+        self,
+        initial: int = settings.DB_LIMIT_INITIAL,
+        min_limit: int = settings.DB_LIMIT_MIN,
+        max_limit: int = settings.DB_LIMIT_MAX,
+        latency_target: float = settings.DB_LIMIT_LATENCY_TARGET_MS / 1000,
+        backoff: float = 0.9,
+        queue_timeout: float = settings.DB_LIMIT_QUEUE_TIMEOUT_MS / 1000,
+        queue_size: int = settings.DB_LIMIT_QUEUE_SIZE,
+        priority_headroom: int = settings.DB_LIMIT_PRIORITY_HEADROOM,
+        timer=time.monotonic,
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.queue_timeout = queue_timeout
+        self.queue_size = queue_size
+        self.priority_headroom = priority_headroom
+        self._timer = timer
+
+        self.inflight = 0
+        self.waiters: dict[str, deque[asyncio.Future]] = {
+            PRIORITY: deque(),
+            DEFAULT: deque(),
+        }
+        self._last_decrease = -float("inf")
+
+        self.admitted = 0
+        self.queued = 0
+        self.shed = 0
+        self.decreases = 0
+
+    def capacity(self, lane: str) -> int:
+        capacity = int(self.limit)
+        return capacity + self.priority_headroom if lane == PRIORITY else capacity
+
+    def queue_length(self) -> int:
+        return sum(len(waiters) for waiters in self.waiters.values())
+
+    async def acquire(self, lane: str = DEFAULT) -> Admission:
+        # nobody overtakes the queue, except priority over default
+        ahead = self.waiters[PRIORITY] or (lane == DEFAULT and self.waiters[DEFAULT])
+        if not ahead and self.inflight < self.capacity(lane):
+            self.inflight += 1
+        else:
+            await self._wait(lane)
+
+        self.admitted += 1
+        return Admission(self, self._timer(), lane)
+
+    async def _wait(self, lane: str):
+        if lane == DEFAULT and self.queue_length() >= self.queue_size:
+            self._shed()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters[lane].append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            self._abandon(lane, waiter)
+            raise
+
+        if not waiter.done():
+            self._abandon(lane, waiter)
+            self._shed()
+
+    def _abandon(self, lane: str, waiter: asyncio.Future):
+        if waiter.done():
+            # handed a slot while giving up: pass it on
+            self.inflight -= 1
+            self._wake()
+        else:
+            waiter.cancel()
+            self.waiters[lane].remove(waiter)
+
+    def _shed(self):
+        self.shed += 1
+        raise HTTPException(
+            status_code=503,
+            detail="Server is overloaded",
+            headers={"Retry-After": "1"},
+        )
+
+    def release(self, latency: float, failed: bool = False, lane: str = DEFAULT):
+        if lane == DEFAULT:
+            self.observe(latency, failed)
+        self.inflight -= 1
+        self._wake()
+
+    def observe(self, latency: float, failed: bool = False):
+        if failed or latency > self.latency_target:
+            now = self._timer()
+            if now - self._last_decrease >= self.latency_target:
+                self._last_decrease = now
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self.decreases += 1
+        elif self.inflight * 2 >= self.limit:
+            # only grow a limit that is actually being used
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def _wake(self):
+        for lane in (PRIORITY, DEFAULT):
+            waiters = self.waiters[lane]
+            while waiters and self.inflight < self.capacity(lane):
+                # the slot is handed over, not released and re-taken
+                self.inflight += 1
+                waiters.popleft().set_result(None)
+
+    async def admit(self, lane: str = DEFAULT) -> Admission:
+        if not DB_LIMIT_ENABLED:
+            return Admission(None)
+        return await self.acquire(lane)
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "inflight": self.inflight,
+            "waiting": self.queue_length(),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": self.shed,
+            "decreases": self.decreases,
+        }
+
+
+db_limiter = AdaptiveLimiter()
@@ -0,0 +1,200 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+from contextlib import suppress
+from typing import Awaitable, Callable
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# a peer whose socket buffer grows past this is too slow and is cut off
+RELAY_MAX_BUFFER = 1024 * 1024
+
+
+class Broker:
+    """Carries messages to the other workers of the deployment.
+
+    Publishers deliver to their own process directly; ``publish`` only has
+    to reach the other workers, which hand each message to the handlers
+    subscribed to its channel. It returns whether the message left this
+    process. ``on_connect`` handlers run on every (re)connection, when
+    messages may have been missed. The base class has no peers: it is the
+    single-worker broker.
+    """
+
+    # whether other processes may be listening
+    shared = False
+
+    def __init__(self):
+        self.handlers: dict[str, list[Callable[[dict], None]]] = {}
+        self.connect_handlers: list[Callable[[], Awaitable[None]]] = []
+
+    def subscribe(self, channel: str, handler: Callable[[dict], None]):
+        self.handlers.setdefault(channel, []).append(handler)
+
+    def on_connect(self, handler: Callable[[], Awaitable[None]]):
+        self.connect_handlers.append(handler)
+
+    def dispatch(self, channel: str, message: dict):
+        for handler in self.handlers.get(channel, ()):
+            try:
+                handler(message)
+            except Exception:
+                logger.exception("Broker handler for %s failed", channel)
+
+    async def publish(self, channel: str, message: dict) -> bool:
+        return False
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class LocalBroker(Broker):
+    """Single-process deployments and tests: nothing to forward."""
+
+
+class SocketBroker(Broker):
+    """Workers on one host, relayed over a Unix domain socket.
+
+    Every worker connects to the relay at ``path`` and writes messages as
+    JSON lines; the relay copies each line to every other connection.
+    Whichever worker holds the ``<path>.lock`` flock runs the relay, so
+    when it exits another worker takes over and the rest reconnect.
+    Delivery is best effort: messages published while disconnected are
+    dropped, and ``publish`` reports it.
+    """
+
+    shared = True
+
+    def __init__(self, path: str, reconnect_delay: float = 0.5):
+        super().__init__()
+        self.path = path
+        self.reconnect_delay = reconnect_delay
+        self.connected = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock_file = None
+        self._relay: asyncio.AbstractServer | None = None
+        self._peers: set[asyncio.StreamWriter] = set()
+
+    async def publish(self, channel: str, message: dict) -> bool:
+        writer = self._writer
+        if writer is None or writer.is_closing():
+            return False
+        line = json.dumps({"c": channel, "m": message}, separators=(",", ":"))
+        writer.write(line.encode() + b"\n")
+        return True
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+        if self._relay is not None:
+            self._relay.close()
+            for peer in list(self._peers):
+                peer.close()
+            self._relay = None
+            with suppress(FileNotFoundError):
+                os.unlink(self.path)
+
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    # CLIENT
+
+    async def _run(self):
+        while True:
+            try:
+                await self._elect()
+                reader, writer = await asyncio.open_unix_connection(
+                    self.path, limit=RELAY_MAX_BUFFER
+                )
+            except OSError:
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            self._writer = writer
+            self.connected.set()
+            try:
+                for handler in self.connect_handlers:
+                    await handler()
+                while line := await reader.readline():
+                    frame = json.loads(line)
+                    self.dispatch(frame["c"], frame["m"])
+            except (OSError, ValueError):
+                logger.warning("Broker connection to %s lost", self.path)
+            finally:
+                self.connected.clear()
+                self._writer = None
+                writer.close()
+
+            await asyncio.sleep(self.reconnect_delay)
+
+    # RELAY
+
+    def _try_lock(self) -> bool:
+        if self._lock_file is not None:
+            return True
+
+        lock_file = open(f"{self.path}.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+
+        self._lock_file = lock_file
+        return True
+
+    async def _elect(self):
+        if self._relay is not None or not self._try_lock():
+            return
+
+        # the lock holder owns the path; a leftover socket is stale
+        with suppress(FileNotFoundError):
+            os.unlink(self.path)
+        self._relay = await asyncio.start_unix_server(
+            self._serve_peer, path=self.path, limit=RELAY_MAX_BUFFER
+        )
+        logger.info("Broker relay listening on %s", self.path)
+
+    async def _serve_peer(self, reader, writer):
+        self._peers.add(writer)
+        try:
+            while line := await reader.readline():
+                for peer in list(self._peers):
+                    if peer is writer:
+                        continue
+                    if peer.transport.get_write_buffer_size() > RELAY_MAX_BUFFER:
+                        peer.close()
+                        self._peers.discard(peer)
+                        continue
+                    peer.write(line)
+        except OSError:
+            pass
+        finally:
+            self._peers.discard(writer)
+            writer.close()
+
+
+def create_broker(kind: str = settings.BROKER) -> Broker:
+    if kind == "socket":
+        return SocketBroker(settings.BROKER_PATH)
+    return LocalBroker()
+
+
+broker = create_broker()
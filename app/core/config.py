@@ -15,12 +15,91 @@ class Settings(BaseSettings):
     DB_PORT: int
     DB_NAME: str
 
+    # databases: startup
+    DB_AUTO_MIGRATE: bool = True
+    DB_POOL_WARMUP: int = 5
+
+    # databases: connection pool (ignored for sqlite, which uses a static pool)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # databases: adaptive limit on requests holding a session (AIMD on
+    # latency); excess requests queue briefly, then get a 503
+    DB_LIMIT_ENABLED: bool = True
+    DB_LIMIT_INITIAL: int = 20
+    DB_LIMIT_MIN: int = 2
+    DB_LIMIT_MAX: int = 100
+    DB_LIMIT_LATENCY_TARGET_MS: float = 250
+    DB_LIMIT_QUEUE_TIMEOUT_MS: float = 100
+    DB_LIMIT_QUEUE_SIZE: int = 100
+    DB_LIMIT_PRIORITY_HEADROOM: int = 5
+
+    # observability: Prometheus /metrics
+    METRICS_ENABLED: bool = True
+
+    # observability: log requests over a query budget or repeating a statement
+    QUERY_LOG_THRESHOLD: int = 20
+    QUERY_REPEAT_THRESHOLD: int = 5
+
     # auth
     SECRET_KEY: str
     PASSWORD_SALT: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    # auth: claims-only access tokens
+    AUTH_STATELESS: bool = False
+    STATELESS_ACCESS_TOKEN_EXPIRE_MINUTES: int = 5
+    TOKEN_CLAIMS_VERSION: int = 1
+
+    # auth: in-process cache of authenticated users
+    USER_CACHE_ENABLED: bool = False
+    USER_CACHE_SIZE: int = 1024
+    USER_CACHE_TTL_SECONDS: int = 60
+
+    # auth: password hashing executor ("process", "thread" or "inline")
+    PASSWORD_HASH_EXECUTOR: str = "process"
+    PASSWORD_HASH_WORKERS: int = 2
+
+    # tasks: ownership-checked single-statement UPDATE/DELETE
+    TASK_SINGLE_STATEMENT_WRITES: bool = True
+
+    # tasks: concurrent identical list reads share one query (single-flight)
+    TASK_LIST_COALESCING: bool = True
+
+    # tasks: rows fetched per round trip when streaming an export
+    TASK_EXPORT_BATCH_SIZE: int = 500
+
+    # tasks: background expiry of overdue tasks
+    TASK_EXPIRY_ENABLED: bool = True
+    TASK_EXPIRY_CHUNK_SIZE: int = 500
+    TASK_EXPIRY_MAX_SLEEP_SECONDS: float = 30
+
+    # rate limiting: token buckets, "memory" per worker or "shared" by the
+    # workers of one host (a mapped file at RATE_LIMIT_PATH)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_STORE: str = "memory"
+    RATE_LIMIT_PATH: str = "/tmp/todo-ratelimit"
+    RATE_LIMIT_SLOTS: int = 65536
+
+    # live updates: per-user SSE/WebSocket feed of task changes
+    LIVE_EVENTS_ENABLED: bool = True
+    LIVE_QUEUE_SIZE: int = 100
+    LIVE_HEARTBEAT_SECONDS: float = 15
+
+    # workers: cross-process messaging, "local" for one worker or "socket"
+    # for workers on one host (live events and cache invalidation)
+    BROKER: str = "local"
+    BROKER_PATH: str = "/tmp/todo-broker.sock"
+
+    # workers: cache invalidation bus
+    INVALIDATION_OUTBOX_SIZE: int = 1000
+    INVALIDATION_HISTORY_SIZE: int = 10000
+    INVALIDATION_HISTORY_TTL_SECONDS: float = 300
+
     class Config:
         env_file = ".env.example"
 
@@ -0,0 +1,154 @@
+import uuid
+from collections import deque
+from typing import Callable, Hashable, NamedTuple
+
+from app.core.broker import Broker, broker
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+INVALIDATION_CHANNEL = "invalidate"
+
+
+class CacheHandlers(NamedTuple):
+    invalidate: Callable[[Hashable], None]
+    clear: Callable[[], None]
+
+
+class InvalidationBus:
+    """Broadcasts cache invalidations to every worker of the deployment.
+
+    Caches register a namespace; ``invalidate`` drops the key here and on
+    every other worker. Messages carry the sender's ``origin`` and a
+    sequence number, so receivers drop duplicates and notice gaps.
+    Delivery is at least once: the last ``outbox_size`` messages are sent
+    again after every reconnect, and whenever that is not enough (a gap,
+    a missed window, an overflowing outbox) caches are cleared instead.
+    Clearing too much costs a few misses; keeping a stale entry would not.
+
+    ``version`` is the version the key changed to. It is remembered for a
+    while so a read that started before the write cannot put the old row
+    back into the cache: see ``version_of``.
+    """
+
+    def __init__(
+        self,
+        broker: Broker,
+        outbox_size: int = settings.INVALIDATION_OUTBOX_SIZE,
+        history_size: int = settings.INVALIDATION_HISTORY_SIZE,
+        history_ttl: float = settings.INVALIDATION_HISTORY_TTL_SECONDS,
+    ):
+        self.broker = broker
+        self.origin = uuid.uuid4().hex
+        self.seq = 0
+        self.handlers: dict[str, CacheHandlers] = {}
+        # recent messages, sent or not, replayed on reconnect
+        self.outbox: deque[dict] = deque(maxlen=outbox_size)
+        self.overflowed = False
+        # origin -> last sequence number applied
+        self.peers: dict[str, int] = {}
+        self.versions = TTLCache(maxsize=history_size, ttl=history_ttl)
+
+        self.published = 0
+        self.received = 0
+        self.duplicates = 0
+        self.gaps = 0
+        self.flushes = 0
+
+        broker.subscribe(INVALIDATION_CHANNEL, self.receive)
+        broker.on_connect(self.resync)
+
+    def register(
+        self,
+        namespace: str,
+        invalidate: Callable[[Hashable], None],
+        clear: Callable[[], None],
+    ):
+        self.handlers[namespace] = CacheHandlers(invalidate, clear)
+
+    def version_of(self, namespace: str, key: Hashable) -> int:
+        """Highest version ``key`` was invalidated at recently, else 0.
+
+        Fill a cache only with rows at least this new.
+        """
+        return self.versions.get((namespace, key), 0)
+
+    async def invalidate(self, namespace: str, key: Hashable, version: int = 0):
+        self.apply(namespace, key, version)
+        if not self.broker.shared:
+            return
+
+        self.seq += 1
+        message = {"o": self.origin, "s": self.seq, "n": namespace, "k": key}
+        if version:
+            message["v"] = version
+        await self.send(message)
+
+    async def send(self, message: dict):
+        full = len(self.outbox) == self.outbox.maxlen
+        self.outbox.append(message)
+
+        if await self.broker.publish(INVALIDATION_CHANNEL, message):
+            self.published += 1
+        elif full:
+            # the oldest message may never have left: peers must clear all
+            self.overflowed = True
+
+    def apply(self, namespace: str, key: Hashable, version: int = 0):
+        if version > self.version_of(namespace, key):
+            self.versions.set((namespace, key), version)
+
+        handlers = self.handlers.get(namespace)
+        if handlers is not None:
+            handlers.invalidate(key)
+
+    def clear(self):
+        self.flushes += 1
+        for handlers in self.handlers.values():
+            handlers.clear()
+
+    def receive(self, message: dict):
+        origin, seq = message["o"], message["s"]
+        last = self.peers.get(origin)
+        if last is not None and seq <= last:
+            self.duplicates += 1
+            return
+
+        self.received += 1
+        self.peers[origin] = seq
+        if message.get("flush"):
+            self.clear()
+            return
+
+        self.apply(message["n"], message["k"], message.get("v", 0))
+        if last is not None and seq > last + 1:
+            # the messages in between are lost for good
+            self.gaps += 1
+            self.clear()
+
+    async def resync(self):
+        # whatever was broadcast while we were away is unknown
+        self.clear()
+
+        if self.overflowed:
+            self.overflowed = False
+            self.outbox.clear()
+            self.seq += 1
+            await self.send({"o": self.origin, "s": self.seq, "flush": True})
+            return
+
+        # peers drop what they already applied
+        for message in list(self.outbox):
+            await self.broker.publish(INVALIDATION_CHANNEL, message)
+
+    def stats(self) -> dict:
+        return {
+            "published": self.published,
+            "received": self.received,
+            "duplicates": self.duplicates,
+            "gaps": self.gaps,
+            "flushes": self.flushes,
+            "outbox": len(self.outbox),
+        }
+
+
+bus = InvalidationBus(broker)
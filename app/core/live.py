@@ -0,0 +1,124 @@
+import asyncio
+import json
+from contextlib import contextmanager
+from typing import Iterator, NamedTuple
+
+from app.core.broker import Broker, broker
+from app.core.config import settings
+
+LIVE_EVENTS_ENABLED = settings.LIVE_EVENTS_ENABLED
+LIVE_QUEUE_SIZE = settings.LIVE_QUEUE_SIZE
+
+TASKS_CHANNEL = "tasks"
+
+
+class LiveEvent(NamedTuple):
+    kind: str
+    # JSON encoded once per event and shared by every subscriber
+    data: str
+
+
+class SlowConsumer(Exception):
+    """The subscriber fell a full queue behind and was dropped."""
+
+
+_DROPPED = LiveEvent("dropped", "{}")
+
+
+class Subscription:
+    """One connected client: a bounded queue of events for one user."""
+
+    __slots__ = ("user_id", "queue")
+
+    def __init__(self, user_id: int, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue[LiveEvent] = asyncio.Queue(queue_size)
+
+    def offer(self, event: LiveEvent) -> bool:
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            # the backlog is useless once events are lost; the client has to
+            # resync anyway, so wake it with the drop marker straight away
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_DROPPED)
+            return False
+
+    async def next(self, timeout: float) -> LiveEvent | None:
+        """Next event, or ``None`` after ``timeout`` idle seconds."""
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+        if event is _DROPPED:
+            raise SlowConsumer()
+        return event
+
+
+class EventHub:
+    """In-process fan-out of task events to the subscribers of each user.
+
+    Idle subscribers cost a queue and nothing else; publishing looks up
+    the subscribers of one user. Events published here reach this
+    worker's subscribers directly and the other workers' through the
+    broker.
+    """
+
+    def __init__(self, broker: Broker, queue_size: int = LIVE_QUEUE_SIZE):
+        self.broker = broker
+        self.queue_size = queue_size
+        self.subscribers: dict[int, set[Subscription]] = {}
+        self.delivered = 0
+        self.dropped = 0
+        broker.subscribe(TASKS_CHANNEL, self.deliver)
+
+    def wants(self, user_id: int) -> bool:
+        # lets publishers skip building events nobody can receive
+        return LIVE_EVENTS_ENABLED and (
+            user_id in self.subscribers or self.broker.shared
+        )
+
+    @contextmanager
+    def subscribe(self, user_id: int) -> Iterator[Subscription]:
+        subscription = Subscription(user_id, self.queue_size)
+        self.subscribers.setdefault(user_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscribers = self.subscribers.get(user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscribers[user_id]
+
+    async def publish(self, message: dict):
+        if not self.wants(message["user_id"]):
+            return
+        self.deliver(message)
+        await self.broker.publish(TASKS_CHANNEL, message)
+
+    def deliver(self, message: dict):
+        subscribers = self.subscribers.get(message["user_id"])
+        if not subscribers:
+            return
+
+        event = LiveEvent(message["event"], json.dumps(message))
+        for subscription in list(subscribers):
+            if subscription.offer(event):
+                self.delivered += 1
+            else:
+                self.dropped += 1
+                subscribers.discard(subscription)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": sum(len(s) for s in self.subscribers.values()),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+hub = EventHub(broker)
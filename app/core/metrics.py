@@ -0,0 +1,268 @@
+import logging
+import re
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+QUERY_LOG_THRESHOLD = settings.QUERY_LOG_THRESHOLD
+QUERY_REPEAT_THRESHOLD = settings.QUERY_REPEAT_THRESHOLD
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """Fixed-bucket histogram; plain attribute updates, no locks."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str, lines: list[str]):
+        sep = "," if labels else ""
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+
+
+_SPACES = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|%s|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\(\?(?:, \?)+\)")
+
+
+def fingerprint(statement: str) -> str:
+    statement = _SPACES.sub(" ", statement).strip()
+    statement = _LITERALS.sub("?", statement)
+    return _IN_LISTS.sub("(?...)", statement)
+
+
+class RequestStats:
+    """DB work done while serving the current request."""
+
+    __slots__ = ("queries", "db_seconds", "pool_seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        # waiting for a pooled connection, not counted in db_seconds
+        self.pool_seconds = 0.0
+        # compiled SQL strings are cached, so this stays small and cheap
+        self.statements: dict[str, int] = {}
+
+    def record(self, statement: str, seconds: float = 0.0):
+        self.queries += 1
+        self.db_seconds += seconds
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    def record_checkout(self, seconds: float):
+        self.pool_seconds += seconds
+
+    def fingerprints(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for statement, count in self.statements.items():
+            key = fingerprint(statement)
+            counts[key] = counts.get(key, 0) + count
+        return counts
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        return {
+            key: count
+            for key, count in self.fingerprints().items()
+            if count >= threshold
+        }
+
+    def report(self) -> str:
+        return "\n".join(
+            f"{count:>4} x {key}"
+            for key, count in sorted(
+                self.fingerprints().items(), key=lambda item: -item[1]
+            )
+        )
+
+
+current_request: ContextVar[RequestStats | None] = ContextVar(
+    "current_request", default=None
+)
+
+
+class RouteMetrics:
+    __slots__ = ("labels", "statuses", "latency", "db_queries", "db_seconds")
+
+    def __init__(self, method: str, route: str):
+        # rendered once here, not per request or per scrape
+        self.labels = f'method="{method}",route="{escape_label(route)}"'
+        self.statuses: dict[int, int] = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.db_queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_seconds = Histogram(LATENCY_BUCKETS)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.routes: dict[tuple[str, str], RouteMetrics] = {}
+        self.db_query_seconds = Histogram(LATENCY_BUCKETS)
+
+    def route(self, method: str, route: str) -> RouteMetrics:
+        metrics = self.routes.get((method, route))
+        if metrics is None:
+            metrics = self.routes[(method, route)] = RouteMetrics(method, route)
+        return metrics
+
+    def observe_request(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        stats: RequestStats,
+    ):
+        metrics = self.route(method, route)
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+        metrics.latency.observe(seconds)
+        metrics.db_queries.observe(stats.queries)
+        metrics.db_seconds.observe(stats.db_seconds)
+
+    def render(self, gauges: dict[str, dict] | None = None) -> str:
+        lines: list[str] = []
+        routes = list(self.routes.values())
+
+        lines.append("# TYPE http_requests_total counter")
+        for metrics in routes:
+            for status, count in list(metrics.statuses.items()):
+                lines.append(
+                    f'http_requests_total{{{metrics.labels},status="{status}"}} {count}'
+                )
+
+        for name, attr in (
+            ("http_request_duration_seconds", "latency"),
+            ("db_queries_per_request", "db_queries"),
+            ("db_time_per_request_seconds", "db_seconds"),
+        ):
+            lines.append(f"# TYPE {name} histogram")
+            for metrics in routes:
+                getattr(metrics, attr).render(name, metrics.labels, lines)
+
+        lines.append("# TYPE db_query_duration_seconds histogram")
+        self.db_query_seconds.render("db_query_duration_seconds", "", lines)
+
+        for prefix, values in (gauges or {}).items():
+            for key, value in values.items():
+                if isinstance(value, (int, float)):
+                    lines.append(f"# TYPE {prefix}_{key} gauge")
+                    lines.append(f"{prefix}_{key} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        self.routes.clear()
+        self.db_query_seconds = Histogram(LATENCY_BUCKETS)
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = MetricsRegistry()
+
+
+# ------------------------------------------------------
+# INSTRUMENTATION
+# ------------------------------------------------------
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing each request under its route template."""
+
+    def __init__(self, app, registry: MetricsRegistry = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            self.registry.observe_request(
+                scope["method"], route, status, time.perf_counter() - started, stats
+            )
+            current_request.reset(token)
+            log_query_budget(scope["method"], route, stats)
+
+
+def log_query_budget(method: str, route: str, stats: RequestStats):
+    if QUERY_LOG_THRESHOLD and stats.queries > QUERY_LOG_THRESHOLD:
+        logger.warning(
+            "%s %s issued %s queries (threshold %s):\n%s",
+            method,
+            route,
+            stats.queries,
+            QUERY_LOG_THRESHOLD,
+            stats.report(),
+        )
+        return
+
+    if QUERY_REPEAT_THRESHOLD:
+        repeated = stats.repeated(QUERY_REPEAT_THRESHOLD)
+        if repeated:
+            logger.warning(
+                "%s %s repeated a statement %s+ times, possible N+1:\n%s",
+                method,
+                route,
+                QUERY_REPEAT_THRESHOLD,
+                "\n".join(f"{n:>4} x {key}" for key, n in repeated.items()),
+            )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def install_db_metrics(engine, registry: MetricsRegistry = metrics):
+    target = engine.sync_engine
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        registry.db_query_seconds.observe(elapsed)
+
+        stats = current_request.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+    if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target, "after_cursor_execute", after_cursor_execute)
@@ -0,0 +1,89 @@
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+MIGRATION_LOCK_NAME = "todo_project_migrations"
+MIGRATION_LOCK_TIMEOUT = 60
+
+# schema created by the old drop_all/create_all startup, before Alembic
+BASELINE_REVISION = "0001"
+
+
+def alembic_config() -> Config:
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    return config
+
+
+def schema_is_current(connection, config: Config) -> bool:
+    current = MigrationContext.configure(connection).get_current_revision()
+    return current == ScriptDirectory.from_config(config).get_current_head()
+
+
+def upgrade_schema(connection, config: Config) -> bool:
+    if schema_is_current(connection, config):
+        return False
+
+    config.attributes["connection"] = connection
+
+    current = MigrationContext.configure(connection).get_current_revision()
+    if current is None and inspect(connection).has_table("Users"):
+        command.stamp(config, BASELINE_REVISION)
+
+    command.upgrade(config, "head")
+    return True
+
+
+@asynccontextmanager
+async def migration_lock(conn: AsyncConnection):
+    # only one worker migrates; the others wait and then find the schema current
+    dialect = conn.dialect.name
+
+    if dialect == "mysql":
+        res = await conn.execute(
+            text("SELECT GET_LOCK(:name, :timeout)"),
+            {"name": MIGRATION_LOCK_NAME, "timeout": MIGRATION_LOCK_TIMEOUT},
+        )
+        if res.scalar() != 1:
+            raise RuntimeError("Could not acquire the migration lock")
+    elif dialect == "postgresql":
+        await conn.execute(
+            text("SELECT pg_advisory_lock(hashtext(:name))"),
+            {"name": MIGRATION_LOCK_NAME},
+        )
+
+    try:
+        yield
+    finally:
+        if dialect == "mysql":
+            await conn.execute(
+                text("SELECT RELEASE_LOCK(:name)"), {"name": MIGRATION_LOCK_NAME}
+            )
+        elif dialect == "postgresql":
+            await conn.execute(
+                text("SELECT pg_advisory_unlock(hashtext(:name))"),
+                {"name": MIGRATION_LOCK_NAME},
+            )
+
+
+async def run_migrations(engine: AsyncEngine) -> bool:
+    config = alembic_config()
+
+    async with engine.connect() as conn:
+        # fast path: a restart against an up-to-date schema does no DDL
+        if await conn.run_sync(schema_is_current, config):
+            return False
+        await conn.rollback()
+
+        async with migration_lock(conn):
+            applied = await conn.run_sync(upgrade_schema, config)
+            await conn.commit()
+
+    return applied
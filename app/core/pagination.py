@@ -0,0 +1,26 @@
+import base64
+import json
+from typing import Any, Callable, TypeVar
+
+from fastapi import HTTPException
+
+T = TypeVar("T")
+
+
+def encode_cursor(key: dict) -> str:
+    """Opaque cursor for a keyset position: unpadded URL-safe base64 JSON."""
+    raw = json.dumps(key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, parse: Callable[[Any], T]) -> T:
+    """Decodes ``cursor`` and returns ``parse`` of its key.
+
+    Malformed base64 or JSON, and a ``parse`` raising KeyError, TypeError
+    or ValueError on the key, are all answered with 400.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return parse(json.loads(base64.urlsafe_b64decode(padded)))
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,231 @@
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import struct
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, NamedTuple
+
+from fastapi import HTTPException
+from fastapi.requests import HTTPConnection
+
+from app.core.config import settings
+
+RATE_LIMIT_ENABLED = settings.RATE_LIMIT_ENABLED
+
+# every declared policy, for /metrics
+policies: list["RateLimit"] = []
+
+
+class Rate(NamedTuple):
+    """``limit`` requests per ``period`` seconds, in bursts of up to ``limit``."""
+
+    limit: int
+    period: float
+
+    @property
+    def refill(self) -> float:
+        return self.limit / self.period
+
+
+# ------------------------------------------------------
+# STORES
+# ------------------------------------------------------
+
+
+class RateLimitStore(ABC):
+    """Token buckets by key.
+
+    ``take`` refills the bucket for the time since its last use, takes one
+    token and returns 0, or returns the seconds until a token is available.
+    Buckets of unknown keys start full.
+    """
+
+    @abstractmethod
+    def take(self, key: str, rate: Rate, now: float) -> float: ...
+
+    @abstractmethod
+    def clear(self): ...
+
+
+def refill(tokens: float, updated: float, rate: Rate, now: float) -> float:
+    return min(rate.limit, tokens + max(0.0, now - updated) * rate.refill)
+
+
+class MemoryStore(RateLimitStore):
+    """Buckets of one worker, least recently used evicted past ``maxsize``."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def take(self, key: str, rate: Rate, now: float) -> float:
+        bucket = self._buckets.get(key)
+        tokens = rate.limit if bucket is None else refill(*bucket, rate, now)
+
+        wait = 0.0 if tokens >= 1 else (1 - tokens) / rate.refill
+        if not wait:
+            tokens -= 1
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        self._buckets.clear()
+
+
+class SharedMemoryStore(RateLimitStore):
+    """Buckets shared by the workers of one host through a mapped file.
+
+    The file is a table of ``slots`` buckets in sets of ``WAYS``; a key
+    hashes to one set, locked with ``lockf`` while its bucket is updated,
+    so each request costs one hash and one small locked read-modify-write.
+    A full set evicts its least recently used bucket, which then starts
+    full again: size ``slots`` for the number of clients you expect.
+    """
+
+    WAYS = 4
+    # key hash (0 = empty), tokens, last update
+    SLOT = struct.Struct("<Qdd")
+
+    def __init__(self, path: str, slots: int):
+        self.path = path
+        self.sets = max(1, slots // self.WAYS)
+        self.set_size = self.SLOT.size * self.WAYS
+        size = self.sets * self.set_size
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+
+    @staticmethod
+    def hash(key: str) -> int:
+        # stable across processes, unlike hash()
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    def take(self, key: str, rate: Rate, now: float) -> float:
+        tag = self.hash(key)
+        base = (tag % self.sets) * self.set_size
+
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, self.set_size, base)
+        try:
+            offset, tokens = self._find(base, tag, rate, now)
+
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate.refill
+            if not wait:
+                tokens -= 1
+
+            self.SLOT.pack_into(self._map, offset, tag, tokens, now)
+            return wait
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, self.set_size, base)
+
+    def _find(self, base: int, tag: int, rate: Rate, now: float):
+        victim, oldest = base, math.inf
+        for offset in range(base, base + self.set_size, self.SLOT.size):
+            slot_tag, tokens, updated = self.SLOT.unpack_from(self._map, offset)
+            if slot_tag == tag:
+                return offset, refill(tokens, updated, rate, now)
+            if slot_tag == 0:
+                updated = -math.inf
+            if updated < oldest:
+                victim, oldest = offset, updated
+        return victim, float(rate.limit)
+
+    def clear(self):
+        self._map[:] = bytes(len(self._map))
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+
+def create_store(kind: str = settings.RATE_LIMIT_STORE) -> RateLimitStore:
+    if kind == "shared":
+        return SharedMemoryStore(settings.RATE_LIMIT_PATH, settings.RATE_LIMIT_SLOTS)
+    return MemoryStore(settings.RATE_LIMIT_SLOTS)
+
+
+store = create_store()
+
+
+# ------------------------------------------------------
+# POLICIES
+# ------------------------------------------------------
+
+
+class RateLimit:
+    """Route dependency enforcing token buckets per client IP, per user and
+    for the whole policy.
+
+    Declare one next to the routes it guards, in ``dependencies=[...]``;
+    routes sharing a policy share its buckets. Route dependencies run
+    before the endpoint's own, so a rejected request never opens a
+    database session. ``user_key`` names the caller from the request,
+    without touching the database; requests it cannot name only count
+    against the IP and policy buckets.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        per_ip: Rate | None = None,
+        per_user: Rate | None = None,
+        per_route: Rate | None = None,
+        user_key: Callable[[HTTPConnection], str | None] | None = None,
+        store: RateLimitStore | None = None,
+        timer=time.monotonic,
+    ):
+        self.name = name
+        self.per_ip = per_ip
+        self.per_user = per_user
+        self.per_route = per_route
+        self.user_key = user_key
+        self._store = store
+        self._timer = timer
+        self.rejected = 0
+        policies.append(self)
+
+    @property
+    def store(self) -> RateLimitStore:
+        return self._store or store
+
+    def buckets(self, connection: HTTPConnection):
+        if self.per_ip is not None and connection.client is not None:
+            yield f"{self.name}:ip:{connection.client.host}", self.per_ip
+
+        if self.per_user is not None and self.user_key is not None:
+            user = self.user_key(connection)
+            if user is not None:
+                yield f"{self.name}:user:{user}", self.per_user
+
+        if self.per_route is not None:
+            yield f"{self.name}:route", self.per_route
+
+    async def __call__(self, connection: HTTPConnection):
+        # WebSocket handshakes are long-lived and not counted
+        if not RATE_LIMIT_ENABLED or connection.scope["type"] != "http":
+            return
+
+        now = self._timer()
+        for key, rate in self.buckets(connection):
+            wait = self.store.take(key, rate, now)
+            if wait:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=429,
+                    detail="Too many requests",
+                    headers={"Retry-After": str(math.ceil(wait))},
+                )
+
+
+def rate_limit_stats() -> dict:
+    return {f"{policy.name}_rejected": policy.rejected for policy in policies}
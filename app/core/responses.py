@@ -0,0 +1,32 @@
+from fastapi.responses import Response
+
+
+class PreEncodedJSONResponse(Response):
+    """JSON response whose body is already serialised to bytes.
+
+    Returned directly from a route, it skips FastAPI's response_model
+    validation and ``jsonable_encoder`` pass, so the service must have
+    validated the payload itself.
+    """
+
+    media_type = "application/json"
+
+
+# ETAGS
+
+
+def etag_matches(header: str | None, etag: str, weak: bool = True) -> bool:
+    # weak comparison for If-None-Match, strong for If-Match (RFC 9110 8.8.3.2)
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+
+    tags = [tag.strip() for tag in header.split(",")]
+    if weak:
+        return etag.removeprefix("W/") in {tag.removeprefix("W/") for tag in tags}
+    return not etag.startswith("W/") and etag in tags
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,54 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Runs one call per key at a time; callers arriving meanwhile share it.
+
+    The first caller runs ``fn`` itself and the others wait for its result
+    or exception. If it is cancelled (its client went away) the waiters
+    start over and one of them runs ``fn`` instead. Results are not kept
+    after the call: this coalesces concurrent work, it is not a cache.
+    """
+
+    def __init__(self):
+        self.calls: dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        while (call := self.calls.get(key)) is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(call)
+            except asyncio.CancelledError:
+                if not call.cancelled():
+                    raise
+
+        call = asyncio.get_running_loop().create_future()
+        self.calls[key] = call
+        self.leaders += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        except Exception as exc:
+            call.set_exception(exc)
+            # retrieved, so an exception nobody waited for is not logged
+            call.exception()
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            del self.calls[key]
+
+    def stats(self) -> dict:
+        return {
+            "inflight": len(self.calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
@@ -2,15 +2,46 @@ import asyncio
 import re
 
 from fastapi import HTTPException
+from fastapi.requests import HTTPConnection
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.admission import db_lane, db_limiter
 from app.core.config import settings
 from app.core.database import engine
+from app.core.metrics import RequestStats, current_request
 
+# the database, not the request, failed: a sign of overload
+DB_OVERLOAD_ERRORS = (exc.TimeoutError, exc.OperationalError)
 
-async def get_async_db():
-    async with AsyncSession(engine) as session:
-        yield session
+
+async def get_async_db(connection: HTTPConnection):
+    admission = await db_limiter.admit(db_lane(connection))
+
+    stats = current_request.get()
+    if stats is None:
+        # no MetricsMiddleware: the limiter still needs the request's DB time
+        stats = RequestStats()
+        current_request.set(stats)
+    admission.track(stats)
+
+    try:
+        async with AsyncSession(engine) as session:
+            session.info["admission"] = admission
+            yield session
+    except DB_OVERLOAD_ERRORS:
+        admission.release(failed=True)
+        raise
+    finally:
+        admission.release()
+
+
+async def release_db(db: AsyncSession):
+    """Close the session and free its admission slot before a long stream."""
+    await db.close()
+    admission = db.info.get("admission")
+    if admission is not None:
+        admission.release()
 
 
 async def user_valid(user):
@@ -48,10 +48,23 @@ def configure_migration_context(connection):
         connection=connection,
         target_metadata=Base.metadata,
         compare_type=True,
-        include_schemas=True
+        include_schemas=True,
     )
 
 
+def run_migrations_with_connection(connection) -> None:
+    """Run migrations on a connection provided by the application.
+
+    The app passes its own connection through ``config.attributes`` so the
+    upgrade runs inside the caller's transaction and advisory lock.
+
+    """
+    configure_migration_context(connection)
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
 async def run_migrations_online() -> None:
     """Run migrations in 'online' mode.
 
@@ -82,5 +95,7 @@ async def run_migrations_online() -> None:
 
 if context.is_offline_mode():
     run_migrations_offline()
+elif config.attributes.get("connection") is not None:
+    run_migrations_with_connection(config.attributes["connection"])
 else:
     asyncio.run(run_migrations_online())
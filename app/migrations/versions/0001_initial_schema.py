@@ -0,0 +1,70 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "Users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=50), nullable=True),
+        sa.Column("email", sa.String(length=100), nullable=True),
+        sa.Column("password", sa.String(length=100), nullable=False),
+        sa.Column(
+            "role", sa.Enum("ADMIN", "USER", name="userroleenum"), nullable=False
+        ),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_Users_email", "Users", ["email"], unique=True)
+    op.create_index("ix_Users_is_active", "Users", ["is_active"])
+    op.create_index("ix_Users_name", "Users", ["name"])
+
+    op.create_table(
+        "Tasks",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=50), nullable=True),
+        sa.Column("description", sa.String(length=256), nullable=True),
+        sa.Column(
+            "status",
+            sa.Enum("DONE", "IN_PROGRESS", "EXPIRED", name="taskenum"),
+            nullable=False,
+        ),
+        sa.Column("deadline", sa.DateTime(), nullable=True),
+        sa.Column("is_completed", sa.Boolean(), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["Users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_Tasks_deadline", "Tasks", ["deadline"])
+    op.create_index("ix_Tasks_is_completed", "Tasks", ["is_completed"])
+    op.create_index("ix_Tasks_status", "Tasks", ["status"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_Tasks_status", table_name="Tasks")
+    op.drop_index("ix_Tasks_is_completed", table_name="Tasks")
+    op.drop_index("ix_Tasks_deadline", table_name="Tasks")
+    op.drop_table("Tasks")
+
+    op.drop_index("ix_Users_name", table_name="Users")
+    op.drop_index("ix_Users_is_active", table_name="Users")
+    op.drop_index("ix_Users_email", table_name="Users")
+    op.drop_table("Users")
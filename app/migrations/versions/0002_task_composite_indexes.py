@@ -0,0 +1,41 @@
+"""per-user composite indexes on Tasks
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:01
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    "ix_Tasks_user_id": ["user_id"],
+    "ix_Tasks_user_id_deadline": ["user_id", "deadline"],
+    "ix_Tasks_user_id_status_deadline": ["user_id", "status", "deadline"],
+    "ix_Tasks_is_completed_deadline": ["is_completed", "deadline"],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # databases from create_all on the indexed models already carry these;
+    # checked here because MySQL has no CREATE INDEX IF NOT EXISTS
+    existing = {i["name"] for i in sa.inspect(op.get_bind()).get_indexes("Tasks")}
+    for name, columns in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, "Tasks", columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in reversed(INDEXES):
+        op.drop_index(name, table_name="Tasks")
@@ -0,0 +1,37 @@
+"""per-user tasks_version counter for conditional GETs
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:02
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # databases from create_all on the current models already have it
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("Users")}
+    if "tasks_version" in columns:
+        return
+
+    with op.batch_alter_table("Users") as batch_op:
+        batch_op.add_column(
+            sa.Column("tasks_version", sa.Integer(), server_default="0", nullable=False)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("Users") as batch_op:
+        batch_op.drop_column("tasks_version")
@@ -0,0 +1,67 @@
+"""sync_version on Tasks and TaskTombstones for delta sync
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:04
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # databases from create_all on the current models already have these
+    inspector = sa.inspect(op.get_bind())
+
+    columns = {c["name"] for c in inspector.get_columns("Tasks")}
+    if "sync_version" not in columns:
+        with op.batch_alter_table("Tasks") as batch_op:
+            batch_op.add_column(
+                sa.Column(
+                    "sync_version", sa.Integer(), server_default="0", nullable=False
+                )
+            )
+    # no CREATE INDEX IF NOT EXISTS on MySQL: skip names already there
+    indexes = {i["name"] for i in inspector.get_indexes("Tasks")}
+    if "ix_Tasks_user_id_sync_version" not in indexes:
+        op.create_index(
+            "ix_Tasks_user_id_sync_version", "Tasks", ["user_id", "sync_version"]
+        )
+
+    indexes = set()
+    if inspector.has_table("TaskTombstones"):
+        indexes = {i["name"] for i in inspector.get_indexes("TaskTombstones")}
+    else:
+        op.create_table(
+            "TaskTombstones",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("task_id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("sync_version", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    if "ix_TaskTombstones_user_id_sync_version" not in indexes:
+        op.create_index(
+            "ix_TaskTombstones_user_id_sync_version",
+            "TaskTombstones",
+            ["user_id", "sync_version"],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_TaskTombstones_user_id_sync_version", table_name="TaskTombstones")
+    op.drop_table("TaskTombstones")
+    op.drop_index("ix_Tasks_user_id_sync_version", table_name="Tasks")
+    with op.batch_alter_table("Tasks") as batch_op:
+        batch_op.drop_column("sync_version")
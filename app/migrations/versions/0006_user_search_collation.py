@@ -0,0 +1,41 @@
+"""case-insensitive name and email on SQLite for indexed prefix search
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:05
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = {"name": 50, "email": 100}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # MySQL's default collation already is; SQLite's LIKE only uses NOCASE indexes
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    with op.batch_alter_table("Users", recreate="always") as batch_op:
+        for column, length in COLUMNS.items():
+            batch_op.alter_column(column, type_=sa.String(length, collation="NOCASE"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    with op.batch_alter_table("Users", recreate="always") as batch_op:
+        for column, length in COLUMNS.items():
+            batch_op.alter_column(column, type_=sa.String(length))
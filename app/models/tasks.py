@@ -1,6 +1,17 @@
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    case,
+    literal,
+)
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -13,7 +24,17 @@ def default_deadline():
 
 class Task(Base):
     __tablename__ = "Tasks"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # per-user listing by deadline and due-soon scans
+        Index("ix_Tasks_user_id_deadline", "user_id", "deadline"),
+        # per-user status filters
+        Index("ix_Tasks_user_id_status_deadline", "user_id", "status", "deadline"),
+        # overdue scans across all users
+        Index("ix_Tasks_is_completed_deadline", "is_completed", "deadline"),
+        # delta sync: a user's changes since a tasks_version
+        Index("ix_Tasks_user_id_sync_version", "user_id", "sync_version"),
+        {"extend_existing": True},
+    )
 
     id = Column(Integer, primary_key=True)
     title = Column(String(50))
@@ -27,10 +48,16 @@ class Task(Base):
         index=True,
     )
     is_completed = Column(Boolean, default=False, index=True)
+    # optimistic concurrency: ORM flushes update WHERE version = <loaded>
+    version = Column(Integer, nullable=False, server_default="1")
+    # owner's tasks_version as of the last write to this row
+    sync_version = Column(Integer, default=0, server_default="0", nullable=False)
 
-    user_id = Column(Integer, ForeignKey("Users.id"))
+    user_id = Column(Integer, ForeignKey("Users.id"), index=True)
     user = relationship("User", back_populates="tasks")
 
+    __mapper_args__ = {"version_id_col": version}
+
     async def update_status(self):
         if self.is_completed:
             self.status = TaskEnum.DONE
@@ -39,5 +66,33 @@ class Task(Base):
         else:
             self.status = TaskEnum.IN_PROGRESS
 
+    @staticmethod
+    def status_expression(is_completed, deadline):
+        # SQL counterpart of update_status for set-based UPDATE statements
+        status_type = Task.__table__.c.status.type
+        return case(
+            (is_completed, literal(TaskEnum.DONE, status_type)),
+            (
+                deadline < datetime.now(timezone.utc),
+                literal(TaskEnum.EXPIRED, status_type),
+            ),
+            else_=literal(TaskEnum.IN_PROGRESS, status_type),
+        )
+
     def __repr__(self):
         return f"<Task id={self.id} title={self.title} status={self.status}>"
+
+
+class TaskTombstone(Base):
+    """Marker left by a deleted task so delta sync can report the deletion."""
+
+    __tablename__ = "TaskTombstones"
+    __table_args__ = (
+        Index("ix_TaskTombstones_user_id_sync_version", "user_id", "sync_version"),
+        {"extend_existing": True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    sync_version = Column(Integer, nullable=False)
@@ -10,10 +10,24 @@ class User(Base):
     __table_args__ = {"extend_existing": True}
 
     id = Column(Integer, primary_key=True)
-    name = Column(String(50), index=True)
-    email = Column(String(100), unique=True, index=True)
+    # case-insensitive like MySQL's default collation, so SQLite can answer
+    # the admin search's LIKE prefixes from the name and email indexes
+    name = Column(
+        String(50).with_variant(String(50, collation="NOCASE"), "sqlite"), index=True
+    )
+    email = Column(
+        String(100).with_variant(String(100, collation="NOCASE"), "sqlite"),
+        unique=True,
+        index=True,
+    )
     password = Column(String(100), nullable=False)
     role = Column(Enum(UserRoleEnum), default=UserRoleEnum.USER, nullable=False)
     is_active = Column(Boolean, default=True, index=True)
+    # bumped by every task write; the collection ETag for conditional GETs
+    tasks_version = Column(Integer, default=0, server_default="0", nullable=False)
+    # optimistic concurrency for the user row itself, see Task.version
+    version = Column(Integer, nullable=False, server_default="1")
 
     tasks = relationship("Task", back_populates="user")
+
+    __mapper_args__ = {"version_id_col": version}
@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum as PyEnum
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -29,11 +29,85 @@ class TaskUpdateSchema(BaseModel):
     status: Optional[TaskEnum] = None
     deadline: Optional[datetime] = None
     is_completed: Optional[bool] = None
+    # expected current version; the write is rejected with 409 if it moved on
+    version: Optional[int] = None
+
+
+class TaskOrderEnum(str, PyEnum):
+    ID = "id"
+    DEADLINE = "deadline"
+
+
+class SortDirectionEnum(str, PyEnum):
+    ASC = "asc"
+    DESC = "desc"
+
+
+class TaskListParamsSchema(BaseModel):
+    limit: int = Field(default=100, ge=1, le=500)
+    cursor: Optional[str] = None
+    order_by: TaskOrderEnum = Field(default=TaskOrderEnum.ID)
+    direction: SortDirectionEnum = Field(default=SortDirectionEnum.ASC)
+    status: Optional[TaskEnum] = None
+    is_completed: Optional[bool] = None
+    deadline_from: Optional[datetime] = None
+    deadline_to: Optional[datetime] = None
+
+
+class TaskExportFormatEnum(str, PyEnum):
+    NDJSON = "ndjson"
+    JSON = "json"
+
+
+class TaskExportParamsSchema(BaseModel):
+    format: TaskExportFormatEnum = Field(default=TaskExportFormatEnum.NDJSON)
+    all_users: bool = Field(default=False)
+
+
+class TaskChangesParamsSchema(BaseModel):
+    # cursor from the previous sync; omitted for the initial full sync
+    since: Optional[str] = None
 
 
 class TaskResponseSchema(TaskBaseSchema):
+    # the column is nullable, though the API always sets it
+    deadline: Optional[datetime]
     id: int
     user_id: int
+    version: int = Field(default=1)
 
     class Config:
         from_attributes = True
+
+
+class TaskBulkUpdateItemSchema(TaskUpdateSchema):
+    id: int
+
+
+class TaskBulkSchema(BaseModel):
+    # items are validated one by one so best-effort batches can report per item
+    create: List[Dict[str, Any]] = Field(default_factory=list, max_length=500)
+    update: List[Dict[str, Any]] = Field(default_factory=list, max_length=500)
+    delete: List[int] = Field(default_factory=list, max_length=500)
+    atomic: bool = Field(default=True)
+
+
+class TaskBulkItemResultSchema(BaseModel):
+    op: str
+    index: int
+    status_code: int
+    id: Optional[int] = None
+    detail: Optional[Any] = None
+    task: Optional[TaskResponseSchema] = None
+
+
+class TaskBulkResultSchema(BaseModel):
+    applied: bool
+    results: List[TaskBulkItemResultSchema]
+
+
+class TaskChangesSchema(BaseModel):
+    # apply deleted before changed: a changed task may reuse a deleted id
+    changed: List[TaskResponseSchema]
+    deleted: List[int]
+    cursor: str
@@ -30,6 +30,8 @@ class UserUpdateSchema(BaseModel):
     email: str | None = Field(default=None, json_schema_extra={"unique": True})
     password: str | None = Field(default=None)
     role: UserRoleEnum | None = Field(default=None)
+    # expected current version; the write is rejected with 409 if it moved on
+    version: int | None = Field(default=None)
 
     @field_validator("email")
     @classmethod
@@ -40,10 +42,20 @@ class UserUpdateSchema(BaseModel):
 class UserResponseSchema(UserBaseSchema):
     id: int
     is_active: bool
+    version: int = Field(default=1)
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserListParamsSchema(BaseModel):
+    limit: int = Field(default=100, ge=1, le=500)
+    cursor: str | None = Field(default=None)
+    q: str | None = Field(default=None, min_length=1, max_length=100)
+    role: UserRoleEnum | None = Field(default=None)
+    is_active: bool | None = Field(default=None)
+    with_total: bool = Field(default=False)
+
+
 class UserAuthSchema(BaseModel):
     email: str
     password: str
@@ -3,10 +3,10 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.auth.auth import (
-    create_access_token,
     create_refresh_token,
-    hash_password,
-    verify_password,
+    create_user_access_token,
+    hash_password_async,
+    verify_password_async,
     verify_refresh_token,
 )
 from app.dependencies import get_async_db
@@ -18,7 +18,7 @@ async def register_user(
     user_data: UserCreateSchema, db: AsyncSession = Depends(get_async_db)
 ) -> User:
 
-    hashed = hash_password(user_data.password)
+    hashed = await hash_password_async(user_data.password)
 
     user = await db.execute(select(User).where(User.email == user_data.email))
     if user.scalars().first():
@@ -56,10 +56,10 @@ async def login_user(creds: UserAuthSchema, db: AsyncSession = Depends(get_async
     if not user.is_active:
         raise HTTPException(status_code=403, detail="User is blocked")
 
-    if not verify_password(creds.password, user.password):
+    if not await verify_password_async(creds.password, user.password):
         raise HTTPException(status_code=401, detail="Invalid password")
 
-    access_token = create_access_token({"sub": user.email})
+    access_token = create_user_access_token(user)
     refresh_token = create_refresh_token({"sub": user.email})
 
     return {
@@ -84,11 +84,11 @@ async def login_user_token(
     if not user.is_active:
         raise HTTPException(status_code=401, detail="User is blocked")
 
-    if not verify_password(password, user.password):
+    if not await verify_password_async(password, user.password):
         raise HTTPException(status_code=401, detail="Invalid password")
 
     # tokens
-    access_token = create_access_token({"sub": user.email})
+    access_token = create_user_access_token(user)
     refresh_token = create_refresh_token({"sub": user.email})
 
     # cookies
@@ -103,7 +103,9 @@ async def login_user_token(
     }
 
 
-async def refresh_user_token(request: Request):
+async def refresh_user_token(
+    request: Request, db: AsyncSession = Depends(get_async_db)
+):
     try:
         payload = verify_refresh_token(request)
         email: str = payload.get("sub")
@@ -114,7 +116,14 @@ async def refresh_user_token(request: Request):
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
 
-    new_access_token = create_access_token({"sub": email})
+    # the user's current claims, not just the email, for stateless tokens
+    res = await db.execute(select(User).where(User.email == email))
+    user = res.scalars().first()
+
+    if not user or not user.is_active:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    new_access_token = create_user_access_token(user)
     return {
         "message": "Refresh token is valid",
         "email": email,
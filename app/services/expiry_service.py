@@ -0,0 +1,221 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.tasks import Task
+from app.schemas.tasks import TaskEnum
+from app.services.tasks_service import (
+    bump_tasks_version,
+    deadline_listeners,
+    owner_tasks_version,
+    publish_task_event,
+)
+
+logger = logging.getLogger(__name__)
+
+EXPIRY_LOCK_NAME = "todo_project_task_expiry"
+
+
+def overdue_filter(now: datetime):
+    return (
+        Task.is_completed.is_(False),
+        Task.deadline < now,
+        Task.status == TaskEnum.IN_PROGRESS,
+    )
+
+
+async def expire_overdue_tasks(db: AsyncSession, now: datetime, chunk_size: int) -> int:
+    expired = 0
+
+    while True:
+        # bounded chunks keep each transaction (and its row locks) short
+        res = await db.execute(
+            select(Task.id, Task.user_id)
+            .where(*overdue_filter(now))
+            .order_by(Task.deadline)
+            .limit(chunk_size)
+        )
+        rows = res.all()
+        if not rows:
+            break
+
+        task_ids = [row.id for row in rows]
+        # status changes, so cached task lists of these users go stale
+        await bump_tasks_version(db, *{row.user_id for row in rows})
+        await db.execute(
+            update(Task)
+            .where(Task.id.in_(task_ids), *overdue_filter(now))
+            .values(
+                status=TaskEnum.EXPIRED,
+                version=Task.version + 1,
+                sync_version=owner_tasks_version(Task.user_id),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        # a task completed since the SELECT was skipped by the UPDATE; the
+        # owners' rows stay locked, so only this UPDATE stamped their version
+        res = await db.execute(
+            select(Task.id, Task.user_id).where(
+                Task.id.in_(task_ids),
+                Task.status == TaskEnum.EXPIRED,
+                Task.sync_version == owner_tasks_version(Task.user_id),
+            )
+        )
+        updated = res.all()
+        await db.commit()
+
+        for row in updated:
+            await publish_task_event("expired", row.user_id, row.id)
+
+        expired += len(updated)
+        if len(task_ids) < chunk_size:
+            break
+
+    return expired
+
+
+async def next_deadline(db: AsyncSession, now: datetime) -> datetime | None:
+    res = await db.execute(
+        select(func.min(Task.deadline)).where(
+            Task.is_completed.is_(False),
+            Task.deadline >= now,
+            Task.status == TaskEnum.IN_PROGRESS,
+        )
+    )
+    deadline = res.scalar()
+    return deadline and as_utc(deadline)
+
+
+def as_utc(deadline: datetime) -> datetime:
+    # SQLite and MySQL DATETIME hand back naive UTC
+    if deadline.tzinfo is None:
+        return deadline.replace(tzinfo=timezone.utc)
+    return deadline
+
+
+@asynccontextmanager
+async def expiry_lock(conn: AsyncConnection):
+    """Yields whether this worker may run the pass; other workers skip it."""
+    dialect = conn.dialect.name
+
+    if dialect == "mysql":
+        res = await conn.execute(
+            text("SELECT GET_LOCK(:name, 0)"), {"name": EXPIRY_LOCK_NAME}
+        )
+        acquired = res.scalar() == 1
+    elif dialect == "postgresql":
+        res = await conn.execute(
+            text("SELECT pg_try_advisory_lock(hashtext(:name))"),
+            {"name": EXPIRY_LOCK_NAME},
+        )
+        acquired = bool(res.scalar())
+    else:
+        acquired = True
+    # the lock belongs to the connection, not to this transaction
+    await conn.commit()
+
+    try:
+        yield acquired
+    finally:
+        if acquired and dialect == "mysql":
+            await conn.execute(
+                text("SELECT RELEASE_LOCK(:name)"), {"name": EXPIRY_LOCK_NAME}
+            )
+        elif acquired and dialect == "postgresql":
+            await conn.execute(
+                text("SELECT pg_advisory_unlock(hashtext(:name))"),
+                {"name": EXPIRY_LOCK_NAME},
+            )
+
+
+class TaskExpiryScheduler:
+    """Moves overdue tasks to EXPIRED, sleeping until the next deadline.
+
+    Every worker runs one, but ``expiry_lock`` lets a single worker at a
+    time make a pass, so each task is expired and announced once. Writes
+    setting a deadline before the next pass wake the scheduler early.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine = engine,
+        chunk_size: int = settings.TASK_EXPIRY_CHUNK_SIZE,
+        max_sleep: float = settings.TASK_EXPIRY_MAX_SLEEP_SECONDS,
+    ):
+        self.engine = engine
+        self.chunk_size = chunk_size
+        self.max_sleep = max_sleep
+        self.next_run: datetime | None = None
+        self._task: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+
+    async def run_once(self) -> float:
+        now = datetime.now(timezone.utc)
+
+        async with self.engine.connect() as conn:
+            async with expiry_lock(conn) as acquired:
+                if not acquired:
+                    # another worker is on it; ours will find nothing overdue
+                    return self.max_sleep
+
+                async with AsyncSession(conn, expire_on_commit=False) as db:
+                    expired = await expire_overdue_tasks(db, now, self.chunk_size)
+                    deadline = await next_deadline(db, now)
+                    await db.commit()
+
+        if expired:
+            logger.info("Expired %s overdue tasks", expired)
+
+        if deadline is None:
+            return self.max_sleep
+        delay = (deadline - datetime.now(timezone.utc)).total_seconds()
+        return min(max(delay, 0.0), self.max_sleep)
+
+    async def _run(self):
+        while True:
+            try:
+                delay = await self.run_once()
+            except Exception:
+                logger.exception("Task expiry run failed")
+                delay = self.max_sleep
+
+            self.next_run = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def wake(self):
+        self._wake.set()
+
+    def deadline_changed(self, deadline: datetime):
+        if self.next_run is not None and as_utc(deadline) < self.next_run:
+            self.wake()
+
+    def start(self):
+        if self._task is None:
+            deadline_listeners.append(self.deadline_changed)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+
+        deadline_listeners.remove(self.deadline_changed)
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+expiry_scheduler = TaskExpiryScheduler()
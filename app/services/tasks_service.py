@@ -1,12 +1,435 @@
-from fastapi import HTTPException, status
-from fastapi.responses import JSONResponse, Response
-from sqlalchemy import select
+import asyncio
+import zlib
+from datetime import datetime
+from typing import Callable, NamedTuple
+
+from fastapi import (
+    HTTPException,
+    WebSocket,
+    WebSocketDisconnect,
+    WebSocketException,
+    status,
+)
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    and_,
+    bindparam,
+    delete,
+    exists,
+    false,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
 
-from app.dependencies import task_valid, user_valid
-from app.models.tasks import Task
+from app.core.config import settings
+from app.core.live import SlowConsumer, Subscription, hub
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.responses import PreEncodedJSONResponse, etag_matches, not_modified
+from app.core.singleflight import SingleFlight
+from app.dependencies import release_db, task_valid, user_valid
+from app.models.tasks import Task, TaskTombstone
 from app.models.users import User
-from app.schemas.tasks import TaskCreateSchema, TaskUpdateSchema
+from app.schemas.tasks import (
+    SortDirectionEnum,
+    TaskBulkItemResultSchema,
+    TaskBulkResultSchema,
+    TaskBulkSchema,
+    TaskBulkUpdateItemSchema,
+    TaskChangesParamsSchema,
+    TaskChangesSchema,
+    TaskCreateSchema,
+    TaskExportFormatEnum,
+    TaskExportParamsSchema,
+    TaskListParamsSchema,
+    TaskOrderEnum,
+    TaskResponseSchema,
+    TaskUpdateSchema,
+)
+
+TASK_SINGLE_STATEMENT_WRITES = settings.TASK_SINGLE_STATEMENT_WRITES
+TASK_EXPORT_BATCH_SIZE = settings.TASK_EXPORT_BATCH_SIZE
+TASK_LIST_COALESCING = settings.TASK_LIST_COALESCING
+LIVE_HEARTBEAT_SECONDS = settings.LIVE_HEARTBEAT_SECONDS
+
+# plain columns instead of ORM entities: no identity map or instance state
+TASK_COLUMNS = (
+    Task.id,
+    Task.user_id,
+    Task.title,
+    Task.description,
+    Task.status,
+    Task.deadline,
+    Task.is_completed,
+    Task.version,
+)
+task_list_adapter = TypeAdapter(list[TaskResponseSchema])
+task_adapter = TypeAdapter(TaskResponseSchema)
+
+# concurrent identical list reads share one query and one encoded body
+task_list_flights = SingleFlight()
+
+
+class TaskPage(NamedTuple):
+    # encoded once and shared by every coalesced caller; None when empty
+    body: bytes | None
+    next_cursor: str | None
+
+
+# PAGINATION
+
+
+def encode_task_cursor(task: Task, order_by: TaskOrderEnum) -> str:
+    key = {"id": task.id}
+    if order_by == TaskOrderEnum.DEADLINE:
+        key["deadline"] = task.deadline and task.deadline.isoformat()
+    return encode_cursor(key)
+
+
+def decode_task_cursor(cursor: str, order_by: TaskOrderEnum) -> dict:
+    def parse(key) -> dict:
+        key["id"] = int(key["id"])
+        if order_by == TaskOrderEnum.DEADLINE and key["deadline"] is not None:
+            key["deadline"] = datetime.fromisoformat(key["deadline"])
+        return key
+
+    return decode_cursor(cursor, parse)
+
+
+def filter_tasks(query, params: TaskListParamsSchema):
+    if params.status is not None:
+        query = query.where(Task.status == params.status)
+
+    if params.is_completed is not None:
+        query = query.where(Task.is_completed == params.is_completed)
+
+    if params.deadline_from is not None:
+        query = query.where(Task.deadline >= params.deadline_from)
+
+    if params.deadline_to is not None:
+        query = query.where(Task.deadline < params.deadline_to)
+
+    return query
+
+
+def _seek(column, value, descending: bool):
+    return column < value if descending else column > value
+
+
+def paginate_tasks(
+    query, params: TaskListParamsSchema, key: dict | None, undated: bool = False
+):
+    # by deadline, tasks without one follow the others, by id: read as a
+    # second range so both halves keep seeking the (user_id, deadline) index
+    descending = params.direction == SortDirectionEnum.DESC
+    by_deadline = params.order_by == TaskOrderEnum.DEADLINE
+    dated = by_deadline and not undated
+    columns = (Task.deadline, Task.id) if dated else (Task.id,)
+
+    if by_deadline:
+        query = query.where(
+            Task.deadline.is_not(None) if dated else Task.deadline.is_(None)
+        )
+        if undated and key is not None and key["deadline"] is not None:
+            # a dated cursor: the undated range is read from its start
+            key = None
+
+    # keyset: seek past the last row of the previous page instead of OFFSET
+    if key is not None:
+        after_id = _seek(Task.id, key["id"], descending)
+
+        if dated:
+            after_id = or_(
+                _seek(Task.deadline, key["deadline"], descending),
+                and_(Task.deadline == key["deadline"], after_id),
+            )
+        query = query.where(after_id)
+
+    order = [column.desc() if descending else column.asc() for column in columns]
+    return query.order_by(*order).limit(params.limit + 1)
+
+
+# ACCESS
+
+
+async def check_user_access(user_id: int, db: AsyncSession, current_user: User):
+    # self-service: the principal from get_current_user is the target user
+    if current_user.id == user_id:
+        return
+
+    user_exists = await db.scalar(select(exists().where(User.id == user_id)))
+    await user_valid(user_exists)
+
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+
+# VERSIONING
+
+
+async def get_tasks_version(user_id: int, db: AsyncSession, current_user: User) -> int:
+    # one read answers the access check and yields the collection version
+    version = await db.scalar(select(User.tasks_version).where(User.id == user_id))
+
+    if current_user.id != user_id:
+        await user_valid(version is not None)
+
+        if current_user.role != "admin":
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    return version or 0
+
+
+async def bump_tasks_version(db: AsyncSession, *user_ids: int):
+    # runs before the task write it accounts for: the Users row lock then
+    # orders concurrent writers, so versions commit in increasing order
+    await db.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(tasks_version=User.tasks_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def owner_tasks_version(user_id):
+    # the version bumped earlier in this transaction; stamped on written rows
+    return select(User.tasks_version).where(User.id == user_id).scalar_subquery()
+
+
+async def record_tombstones(db: AsyncSession, user_id: int, *task_ids: int):
+    # copied from the rows about to be deleted, in the same transaction
+    await db.execute(
+        insert(TaskTombstone).from_select(
+            ["task_id", "user_id", "sync_version"],
+            select(Task.id, Task.user_id, owner_tasks_version(user_id)).where(
+                Task.id.in_(task_ids), Task.user_id == user_id
+            ),
+        )
+    )
+
+
+def list_etag(version: int, params: TaskListParamsSchema) -> str:
+    # every page and filter combination is its own representation
+    params_hash = zlib.crc32(params.model_dump_json().encode())
+    return f'W/"{version}-{params_hash:08x}"'
+
+
+def task_etag(task: Task) -> str:
+    # every write bumps Task.version, so the version alone identifies the body
+    return f'"{task.version}"'
+
+
+def task_response(task: Task, if_none_match: str | None = None) -> Response:
+    etag = task_etag(task)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    body = task_adapter.dump_json(task_adapter.validate_python(task))
+    return PreEncodedJSONResponse(body, headers={"ETag": etag})
+
+
+def expected_versions(
+    if_match: str | None, new_data: TaskUpdateSchema
+) -> tuple[list[int] | None, int]:
+    """Versions a conditional update may overwrite, and the status on a miss.
+
+    ``If-Match`` takes precedence and fails with 412 as HTTP prescribes; a
+    ``version`` in the body fails with 409. ``None`` means unconditional.
+    """
+    if if_match is not None:
+        if if_match.strip() == "*":
+            return None, 412
+
+        # strong comparison: weak or foreign tags can never match
+        versions = []
+        for tag in if_match.split(","):
+            tag = tag.strip()
+            if len(tag) > 2 and tag[0] == tag[-1] == '"' and tag[1:-1].isdigit():
+                versions.append(int(tag[1:-1]))
+        return versions, 412
+
+    if new_data.version is not None:
+        return [new_data.version], 409
+    return None, 409
+
+
+def version_conflict(status_code: int) -> HTTPException:
+    return HTTPException(
+        status_code=status_code, detail="Task has been modified by another request"
+    )
+
+
+# SINGLE-STATEMENT WRITES
+
+
+async def raise_task_write_error(
+    user_id: int,
+    task_id: int,
+    db: AsyncSession,
+    current_user: User,
+    forbidden_detail: str,
+    versions: list[int] | None = None,
+    conflict_status: int = 409,
+):
+    # slow path only: explain why an ownership-checked statement matched nothing
+    await check_user_access(user_id, db, current_user)
+
+    task = await db.get(Task, task_id)
+    await task_valid(task)
+
+    if task.user_id == user_id and versions is not None:
+        raise version_conflict(conflict_status)
+
+    raise HTTPException(status_code=403, detail=forbidden_detail)
+
+
+async def update_task_statement(
+    user_id: int,
+    task_id: int,
+    new_data: TaskUpdateSchema,
+    db: AsyncSession,
+    current_user: User,
+    if_match: str | None = None,
+):
+    if current_user.role != "admin" and current_user.id != user_id:
+        await raise_task_write_error(
+            user_id, task_id, db, current_user, "You are not admin"
+        )
+
+    versions, conflict_status = expected_versions(if_match, new_data)
+
+    values = {}
+    if new_data.title:
+        values["title"] = new_data.title
+
+    if new_data.description:
+        values["description"] = new_data.description
+
+    if new_data.deadline:
+        values["deadline"] = new_data.deadline
+
+    if new_data.is_completed is not None:
+        values["is_completed"] = new_data.is_completed
+
+    values["status"] = Task.status_expression(
+        (
+            literal(values["is_completed"], Boolean())
+            if "is_completed" in values
+            else Task.is_completed
+        ),
+        (
+            literal(values["deadline"], DateTime())
+            if "deadline" in values
+            else Task.deadline
+        ),
+    )
+
+    values["version"] = Task.version + 1
+    values["sync_version"] = owner_tasks_version(user_id)
+
+    stmt = (
+        update(Task)
+        .where(Task.id == task_id, Task.user_id == user_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if versions is not None:
+        # the version check rides on the write itself; no read beforehand
+        stmt = stmt.where(Task.version.in_(versions))
+
+    try:
+        await bump_tasks_version(db, user_id)
+        if db.get_bind().dialect.update_returning:
+            res = await db.execute(
+                stmt.returning(Task), execution_options={"populate_existing": True}
+            )
+            task = res.scalars().first()
+        else:
+            res = await db.execute(stmt)
+            task = None
+            if res.rowcount:
+                task = await db.get(Task, task_id, populate_existing=True)
+    except Exception:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail="An internal server error occurred " + "when updating the object",
+        )
+
+    if task is None:
+        await raise_task_write_error(
+            user_id,
+            task_id,
+            db,
+            current_user,
+            "You are not admin",
+            versions,
+            conflict_status,
+        )
+
+    try:
+        # keep the loaded row usable after commit expires the session
+        db.expunge(task)
+        await db.commit()
+        return task
+    except Exception:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail="An internal server error occurred " + "when updating the object",
+        )
+
+
+async def delete_task_statement(
+    user_id: int,
+    task_id: int,
+    db: AsyncSession,
+    current_user: User,
+):
+    if current_user.role != "admin" and current_user.id != user_id:
+        await raise_task_write_error(
+            user_id, task_id, db, current_user, "Not enough permissions"
+        )
+
+    stmt = (
+        delete(Task)
+        .where(Task.id == task_id, Task.user_id == user_id)
+        .execution_options(synchronize_session="evaluate")
+    )
+
+    try:
+        await bump_tasks_version(db, user_id)
+        await record_tombstones(db, user_id, task_id)
+        res = await db.execute(stmt)
+    except Exception:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail="An internal server error occurred " + "when deleting the object",
+        )
+
+    if not res.rowcount:
+        await raise_task_write_error(
+            user_id, task_id, db, current_user, "Not enough permissions"
+        )
+
+    try:
+        await db.commit()
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    except Exception:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail="An internal server error occurred " + "when deleting the object",
+        )
 
 
 async def create_task_user(
@@ -15,11 +438,7 @@ async def create_task_user(
     db: AsyncSession,
     current_user: User,
 ):
-    user = await db.get(User, user_id)
-    await user_valid(user)
-
-    if current_user.role != "admin" and current_user.id != user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    await check_user_access(user_id, db, current_user)
 
     new_task = Task(
         user_id=user_id,
@@ -28,14 +447,15 @@ async def create_task_user(
         status=task_data.status.value,
         deadline=task_data.deadline,
         is_completed=False,
+        sync_version=owner_tasks_version(user_id),
     )
 
     try:
         await new_task.update_status()
+        await bump_tasks_version(db, user_id)
         db.add(new_task)
         await db.commit()
         await db.refresh(new_task)
-        return new_task
     except Exception:
         await db.rollback()
         raise HTTPException(
@@ -43,52 +463,100 @@ async def create_task_user(
             detail="An internal server error occurred " + "when creating the object",
         )
 
+    await publish_task_event("created", user_id, new_task.id, new_task)
+    return new_task
+
 
 async def get_tasks_from_user(
     user_id: int,
     db: AsyncSession,
     current_user: User,
+    params: TaskListParamsSchema | None = None,
+    if_none_match: str | None = None,
 ):
-    user = await db.get(User, user_id)
-    await user_valid(user)
+    version = await get_tasks_version(user_id, db, current_user)
 
-    if current_user.role != "admin" and current_user.id != user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    params = params or TaskListParamsSchema()
 
-    res_tasks = await db.execute(select(Task).where(Task.user_id == user.id))
-    tasks = res_tasks.scalars().all()
+    # an unchanged collection is answered from the version alone
+    etag = list_etag(version, params)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
 
-    if not tasks:
-        return JSONResponse(status_code=200, content={"message": "User list is empty"})
-    return tasks
+    async def read_page():
+        return await read_task_page(user_id, db, params)
 
+    # access is checked per caller above; the page only depends on the key
+    if TASK_LIST_COALESCING:
+        key = (user_id, version, params.model_dump_json())
+        page = await task_list_flights.do(key, read_page)
+    else:
+        page = await read_page()
 
-async def get_task_from_user(
-    user_id: int,
-    task_id: int,
-    db: AsyncSession,
-    current_user: User,
-):
+    headers = {"ETag": etag}
+    if page.body is None:
+        return JSONResponse(
+            status_code=200, content={"message": "User list is empty"}, headers=headers
+        )
 
-    user = await db.get(User, user_id)
-    await user_valid(user)
+    if page.next_cursor is not None:
+        headers["X-Next-Cursor"] = page.next_cursor
+    return PreEncodedJSONResponse(page.body, headers=headers)
 
-    if current_user.role != "admin" and current_user.id != user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+async def read_task_page(
+    user_id: int, db: AsyncSession, params: TaskListParamsSchema
+) -> TaskPage:
+    query = filter_tasks(select(*TASK_COLUMNS).where(Task.user_id == user_id), params)
+    key = decode_task_cursor(params.cursor, params.order_by) if params.cursor else None
+    by_deadline = params.order_by == TaskOrderEnum.DEADLINE
+    undated = by_deadline and key is not None and key["deadline"] is None
+
+    res_tasks = await db.execute(paginate_tasks(query, params, key, undated))
+    rows = res_tasks.mappings().all()
+
+    if by_deadline and not undated and len(rows) <= params.limit:
+        # the dated tasks ran out within this page: fill it with undated ones
+        res_tasks = await db.execute(
+            paginate_tasks(query, params, key, undated=True).limit(
+                params.limit + 1 - len(rows)
+            )
+        )
+        rows = [*rows, *res_tasks.mappings().all()]
+    if not rows:
+        return TaskPage(None, None)
+
+    tasks = task_list_adapter.validate_python(rows[: params.limit])
+    next_cursor = None
+    if len(rows) > params.limit:
+        next_cursor = encode_task_cursor(tasks[-1], params.order_by)
+
+    # validated once above; serialised in one pass by pydantic-core
+    return TaskPage(task_list_adapter.dump_json(tasks), next_cursor)
+
+
+async def get_owned_task(
+    user_id: int, task_id: int, db: AsyncSession, current_user: User
+) -> Task:
+    await check_user_access(user_id, db, current_user)
 
     task = await db.get(Task, task_id)
     await task_valid(task)
 
-    if task.user_id != user.id:
+    if task.user_id != user_id:
         raise HTTPException(status_code=403, detail="Task does not belong to this user")
+    return task
 
-    try:
-        return task
-    except Exception:
-        raise HTTPException(
-            status_code=500,
-            detail="An internal server error occurred " + "when updating the object",
-        )
+
+async def get_task_from_user(
+    user_id: int,
+    task_id: int,
+    db: AsyncSession,
+    current_user: User,
+    if_none_match: str | None = None,
+):
+    task = await get_owned_task(user_id, task_id, db, current_user)
+    return task_response(task, if_none_match)
 
 
 async def update_task_from_user(
@@ -97,12 +565,16 @@ async def update_task_from_user(
     new_data: TaskUpdateSchema,
     db: AsyncSession,
     current_user: User,
+    if_match: str | None = None,
 ):
-    user = await db.get(User, user_id)
-    await user_valid(user)
+    if TASK_SINGLE_STATEMENT_WRITES:
+        task = await update_task_statement(
+            user_id, task_id, new_data, db, current_user, if_match
+        )
+        await publish_task_event("updated", user_id, task_id, task)
+        return task_response(task)
 
-    if current_user.role != "admin" and current_user.id != user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    await check_user_access(user_id, db, current_user)
 
     task = await db.get(Task, task_id)
     await task_valid(task)
@@ -110,9 +582,17 @@ async def update_task_from_user(
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    if task.user_id != user.id:
+    if task.user_id != user_id:
         raise HTTPException(status_code=403, detail="You are not admin")
 
+    versions, conflict_status = expected_versions(if_match, new_data)
+    if versions is not None and task.version not in versions:
+        raise version_conflict(conflict_status)
+
+    # before any attribute changes, so autoflush cannot write the row first
+    await bump_tasks_version(db, user_id)
+    task.sync_version = owner_tasks_version(user_id)
+
     if new_data.title:
         task.title = new_data.title
 
@@ -129,7 +609,10 @@ async def update_task_from_user(
         await task.update_status()
         await db.commit()
         await db.refresh(task)
-        return task
+    except StaleDataError:
+        # another request committed between our read and the versioned flush
+        await db.rollback()
+        raise version_conflict(409)
     except Exception:
         await db.rollback()
         raise HTTPException(
@@ -137,6 +620,9 @@ async def update_task_from_user(
             detail="An internal server error occurred " + "when updating the object",
         )
 
+    await publish_task_event("updated", user_id, task_id, task)
+    return task_response(task)
+
 
 async def delete_task_from_user(
     user_id: int,
@@ -144,11 +630,12 @@ async def delete_task_from_user(
     db: AsyncSession,
     current_user: User,
 ):
-    user = await db.get(User, user_id)
-    await user_valid(user)
+    if TASK_SINGLE_STATEMENT_WRITES:
+        response = await delete_task_statement(user_id, task_id, db, current_user)
+        await publish_task_event("deleted", user_id, task_id)
+        return response
 
-    if current_user.role != "admin" and current_user.id != user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    await check_user_access(user_id, db, current_user)
 
     task = await db.get(Task, task_id)
     await task_valid(task)
@@ -156,15 +643,513 @@ async def delete_task_from_user(
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    if task.user_id != user.id:
+    if task.user_id != user_id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
     try:
+        await bump_tasks_version(db, user_id)
+        await record_tombstones(db, user_id, task_id)
         await db.delete(task)
         await db.commit()
-        return Response(status_code=status.HTTP_204_NO_CONTENT)
     except Exception:
         raise HTTPException(
             status_code=500,
             detail="An internal server error occurred " + "when deleting the object",
         )
+
+    await publish_task_event("deleted", user_id, task_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+# DELTA SYNC
+
+
+def encode_sync_cursor(version: int) -> str:
+    return encode_cursor({"v": version})
+
+
+def decode_sync_cursor(cursor: str) -> int:
+    return decode_cursor(cursor, lambda key: int(key["v"]))
+
+
+async def get_task_changes(
+    user_id: int,
+    db: AsyncSession,
+    current_user: User,
+    params: TaskChangesParamsSchema | None = None,
+):
+    # read first: later commits land above the cursor and are sent again next
+    # time, which is harmless because clients apply changes idempotently
+    version = await get_tasks_version(user_id, db, current_user)
+
+    params = params or TaskChangesParamsSchema()
+    cursor = encode_sync_cursor(version)
+
+    query = select(*TASK_COLUMNS).where(Task.user_id == user_id)
+    deleted = []
+    if params.since is not None:
+        since = decode_sync_cursor(params.since)
+        if since >= version:
+            changes = TaskChangesSchema(changed=[], deleted=[], cursor=cursor)
+            return PreEncodedJSONResponse(changes.model_dump_json())
+
+        query = query.where(Task.sync_version > since)
+        res = await db.execute(
+            select(TaskTombstone.task_id).where(
+                TaskTombstone.user_id == user_id, TaskTombstone.sync_version > since
+            )
+        )
+        deleted = list(res.scalars())
+
+    res = await db.execute(query.order_by(Task.sync_version, Task.id))
+    changes = TaskChangesSchema(
+        changed=task_list_adapter.validate_python(res.mappings().all()),
+        deleted=deleted,
+        cursor=cursor,
+    )
+    return PreEncodedJSONResponse(changes.model_dump_json())
+
+
+# LIVE UPDATES
+
+# called with the deadline of every committed task write, see expiry_service
+deadline_listeners: list[Callable[[datetime], None]] = []
+
+
+async def publish_task_event(
+    kind: str,
+    user_id: int,
+    task_id: int,
+    task: Task | TaskResponseSchema | None = None,
+):
+    # after commit only: subscribers must never see a write that rolled back
+    deadline = getattr(task, "deadline", None)
+    if deadline is not None:
+        for listener in deadline_listeners:
+            listener(deadline)
+
+    if not hub.wants(user_id):
+        return
+
+    payload = None
+    if task is not None:
+        payload = task_adapter.dump_python(
+            task_adapter.validate_python(task), mode="json"
+        )
+    await hub.publish(
+        {"event": kind, "user_id": user_id, "task_id": task_id, "task": payload}
+    )
+
+
+async def sse_frames(user_id: int):
+    with hub.subscribe(user_id) as subscription:
+        # first frame flushes the headers; clients then catch up via /changes
+        yield ": connected\n\n"
+        async for event in live_events(subscription):
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: {event.kind}\ndata: {event.data}\n\n"
+        yield "event: resync\ndata: {}\n\n"
+
+
+async def live_events(subscription: Subscription):
+    """Events for one subscriber, ``None`` when idle; ends if it was dropped."""
+    while True:
+        try:
+            yield await subscription.next(LIVE_HEARTBEAT_SECONDS)
+        except SlowConsumer:
+            return
+
+
+async def stream_task_events(user_id: int, db: AsyncSession, current_user: User):
+    await check_user_access(user_id, db, current_user)
+    # an idle subscriber must not pin a pooled connection for hours
+    await release_db(db)
+
+    return StreamingResponse(
+        sse_frames(user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def websocket_task_events(
+    websocket: WebSocket, user_id: int, db: AsyncSession, current_user: User
+):
+    try:
+        await check_user_access(user_id, db, current_user)
+    except HTTPException as e:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION, reason=str(e.detail)
+        )
+    await release_db(db)
+
+    await websocket.accept()
+    with hub.subscribe(user_id) as subscription:
+
+        async def send_events():
+            try:
+                async for event in live_events(subscription):
+                    if event is None:
+                        await websocket.send_text('{"event":"heartbeat"}')
+                    else:
+                        await websocket.send_text(event.data)
+                await websocket.close(
+                    code=status.WS_1013_TRY_AGAIN_LATER, reason="resync"
+                )
+            except WebSocketDisconnect:
+                pass
+
+        sender = asyncio.create_task(send_events())
+        try:
+            # clients never send; receiving is how a hang-up is noticed at once
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            sender.cancel()
+
+
+# EXPORT
+
+
+async def stream_task_rows(bind, query):
+    # own session: the request-scoped one may be closed before streaming ends
+    async with AsyncSession(bind) as db:
+        result = await db.stream(
+            query.execution_options(yield_per=TASK_EXPORT_BATCH_SIZE)
+        )
+        async for rows in result.mappings().partitions():
+            yield [
+                task_adapter.dump_json(task_adapter.validate_python(row))
+                for row in rows
+            ]
+
+
+async def export_ndjson(batches):
+    async for lines in batches:
+        yield b"\n".join(lines) + b"\n"
+
+
+async def export_json_array(batches):
+    # the opening bracket goes out before the query has returned anything
+    yield b"["
+    first = True
+    async for items in batches:
+        chunk = b",".join(items)
+        yield chunk if first else b"," + chunk
+        first = False
+    yield b"]"
+
+
+async def export_tasks_from_user(
+    user_id: int,
+    db: AsyncSession,
+    current_user: User,
+    params: TaskExportParamsSchema,
+):
+    await check_user_access(user_id, db, current_user)
+
+    query = select(*TASK_COLUMNS).order_by(Task.id)
+    if params.all_users:
+        if current_user.role != "admin":
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+        scope = "all"
+    else:
+        query = query.where(Task.user_id == user_id)
+        scope = str(user_id)
+
+    batches = stream_task_rows(db.bind, query)
+    if params.format == TaskExportFormatEnum.JSON:
+        body, media_type = export_json_array(batches), "application/json"
+    else:
+        body, media_type = export_ndjson(batches), "application/x-ndjson"
+
+    filename = f"tasks-{scope}.{params.format.value}"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# BULK
+
+
+BULK_UPDATE_FIELDS = ("title", "description", "deadline", "is_completed")
+
+
+def bulk_update_statement(user_id: int):
+    table = Task.__table__
+    # a NULL parameter keeps the column: items only bind the fields they set
+    values = {
+        field: func.coalesce(
+            bindparam(f"b_{field}", type_=table.c[field].type), table.c[field]
+        )
+        for field in BULK_UPDATE_FIELDS
+    }
+    return (
+        update(table)
+        .where(
+            table.c.id == bindparam("b_id"),
+            table.c.user_id == user_id,
+            # NULL for items without a version: those write unconditionally
+            table.c.version
+            == func.coalesce(
+                bindparam("b_version", type_=table.c.version.type), table.c.version
+            ),
+        )
+        .values(
+            **values,
+            status=Task.status_expression(values["is_completed"], values["deadline"]),
+            version=table.c.version + 1,
+            sync_version=owner_tasks_version(user_id),
+        )
+    )
+
+
+def bulk_insert_statement(user_id: int):
+    table = Task.__table__
+    deadline = bindparam("b_deadline", type_=table.c.deadline.type)
+    return insert(table).values(
+        user_id=user_id,
+        title=bindparam("b_title", type_=table.c.title.type),
+        description=bindparam("b_description", type_=table.c.description.type),
+        deadline=deadline,
+        is_completed=False,
+        status=Task.status_expression(false(), deadline),
+        sync_version=owner_tasks_version(user_id),
+    )
+
+
+BULK_EVENTS = {"create": "created", "update": "updated", "delete": "deleted"}
+
+
+def bulk_result_order(result: TaskBulkItemResultSchema):
+    return ("create", "update", "delete").index(result.op), result.index
+
+
+async def bulk_tasks_from_user(
+    user_id: int,
+    bulk_data: TaskBulkSchema,
+    db: AsyncSession,
+    current_user: User,
+):
+    await check_user_access(user_id, db, current_user)
+
+    errors = {}
+
+    def fail(op: str, index: int, status_code: int, detail, task_id=None):
+        errors[(op, index)] = TaskBulkItemResultSchema(
+            op=op, index=index, status_code=status_code, id=task_id, detail=detail
+        )
+
+    creates = []
+    for index, item in enumerate(bulk_data.create):
+        try:
+            creates.append((index, TaskCreateSchema.model_validate(item)))
+        except ValidationError as e:
+            fail(
+                "create", index, 422, e.errors(include_url=False, include_context=False)
+            )
+
+    updates = []
+    for index, item in enumerate(bulk_data.update):
+        try:
+            updates.append((index, TaskBulkUpdateItemSchema.model_validate(item)))
+        except ValidationError as e:
+            fail(
+                "update", index, 422, e.errors(include_url=False, include_context=False)
+            )
+
+    # one read resolves existence and ownership for every referenced task
+    task_ids = {data.id for _, data in updates} | set(bulk_data.delete)
+    existing = {}
+    if task_ids:
+        res = await db.execute(
+            select(Task.id, Task.user_id, Task.version).where(Task.id.in_(task_ids))
+        )
+        existing = {row.id: row._asdict() for row in res}
+
+    def owned(op: str, index: int, task_id: int) -> bool:
+        row = existing.get(task_id)
+        if row is None:
+            fail(op, index, 404, "Task is not found", task_id)
+            return False
+        if row["user_id"] != user_id:
+            fail(op, index, 403, "Task does not belong to this user", task_id)
+            return False
+        return True
+
+    update_rows = {}
+    expected_versions = {}
+    updated = []
+    for index, data in updates:
+        if not owned("update", index, data.id):
+            continue
+        if data.version is not None and data.version != existing[data.id]["version"]:
+            fail(
+                "update",
+                index,
+                409,
+                "Task has been modified by another request",
+                data.id,
+            )
+            continue
+
+        if data.version is not None:
+            expected_versions[data.id] = data.version
+        row = update_rows.setdefault(data.id, dict.fromkeys(BULK_UPDATE_FIELDS))
+        if data.title:
+            row["title"] = data.title
+        if data.description:
+            row["description"] = data.description
+        if data.deadline:
+            row["deadline"] = data.deadline
+        if data.is_completed is not None:
+            row["is_completed"] = data.is_completed
+        updated.append((index, data.id))
+
+    deleted = [
+        (index, task_id)
+        for index, task_id in enumerate(bulk_data.delete)
+        if owned("delete", index, task_id)
+    ]
+
+    if bulk_data.atomic and errors:
+        result = TaskBulkResultSchema(
+            applied=False, results=sorted(errors.values(), key=bulk_result_order)
+        )
+        return JSONResponse(status_code=422, content=result.model_dump(mode="json"))
+
+    try:
+        if creates or update_rows or deleted:
+            await bump_tasks_version(db, user_id)
+
+        if creates:
+            await db.execute(
+                bulk_insert_statement(user_id),
+                [
+                    {
+                        "b_title": data.title,
+                        "b_description": data.description,
+                        "b_deadline": data.deadline,
+                    }
+                    for _, data in creates
+                ],
+            )
+
+        if update_rows:
+            await db.execute(
+                bulk_update_statement(user_id),
+                [
+                    {
+                        "b_id": task_id,
+                        "b_version": expected_versions.get(task_id),
+                        **{f"b_{field}": value for field, value in row.items()},
+                    }
+                    for task_id, row in update_rows.items()
+                ],
+            )
+
+        if deleted:
+            await record_tombstones(db, user_id, *{task_id for _, task_id in deleted})
+            await db.execute(
+                delete(Task)
+                .where(
+                    Task.user_id == user_id,
+                    Task.id.in_({task_id for _, task_id in deleted}),
+                )
+                .execution_options(synchronize_session="evaluate")
+            )
+
+        # rows written above carry this batch's sync_version: the created ones
+        # are found by it, ids ascending in insert order, without RETURNING
+        # (MySQL has none), and an updated one without it failed the UPDATE's
+        # version check because it changed after it was read
+        written = []
+        if creates:
+            written.append(
+                and_(
+                    Task.user_id == user_id,
+                    Task.sync_version == owner_tasks_version(user_id),
+                )
+            )
+        if update_rows:
+            written.append(Task.id.in_(update_rows))
+
+        tasks, stale, created = {}, set(), []
+        if written:
+            res = await db.execute(
+                select(Task, owner_tasks_version(user_id))
+                .where(or_(*written))
+                .order_by(Task.id)
+                .execution_options(populate_existing=True)
+            )
+            for task, stamp in res:
+                tasks[task.id] = task
+                if task.id not in update_rows:
+                    created.append(task.id)
+                elif task.sync_version != stamp:
+                    stale.add(task.id)
+
+        for index, task_id in updated:
+            if task_id in stale:
+                fail(
+                    "update",
+                    index,
+                    409,
+                    "Task has been modified by another request",
+                    task_id,
+                )
+
+        if bulk_data.atomic and stale:
+            await db.rollback()
+            result = TaskBulkResultSchema(
+                applied=False, results=sorted(errors.values(), key=bulk_result_order)
+            )
+            return JSONResponse(status_code=422, content=result.model_dump(mode="json"))
+
+        results = list(errors.values())
+        for op, items in (
+            (
+                "create",
+                [(index, task_id) for (index, _), task_id in zip(creates, created)],
+            ),
+            ("update", [item for item in updated if item[1] not in stale]),
+        ):
+            for index, task_id in items:
+                task = tasks.get(task_id)
+                results.append(
+                    TaskBulkItemResultSchema(
+                        op=op,
+                        index=index,
+                        status_code=200 if task else 404,
+                        id=task_id,
+                        task=TaskResponseSchema.model_validate(task) if task else None,
+                    )
+                )
+
+        for index, task_id in deleted:
+            results.append(
+                TaskBulkItemResultSchema(
+                    op="delete", index=index, status_code=204, id=task_id
+                )
+            )
+
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail="An internal server error occurred " + "when updating the objects",
+        )
+
+    results.sort(key=bulk_result_order)
+    for result in results:
+        if result.status_code < 300:
+            await publish_task_event(
+                BULK_EVENTS[result.op], user_id, result.id, result.task
+            )
+
+    return TaskBulkResultSchema(applied=True, results=results)
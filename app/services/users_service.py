@@ -1,26 +1,104 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.responses import JSONResponse, Response
-from sqlalchemy import select
+from sqlalchemy import func, select, text, union
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
 
-from app.api.auth.auth import get_current_user
+from app.api.auth.auth import get_current_user, invalidate_cached_user
+from app.core.pagination import decode_cursor, encode_cursor
 from app.dependencies import get_async_db, user_valid
 from app.models.users import User
-from app.schemas.users import UserUpdateSchema
+from app.schemas.users import UserListParamsSchema, UserUpdateSchema
+
+# PAGINATION
+
+
+def encode_user_cursor(user: User) -> str:
+    return encode_cursor({"id": user.id})
+
+
+def decode_user_cursor(cursor: str) -> int:
+    return decode_cursor(cursor, lambda key: int(key["id"]))
+
+
+def prefix_match(column, prefix: str):
+    # LIKE 'prefix%' with the wildcards escaped: compared under the column's
+    # collation, where a code-point range is not. The pattern is bound whole,
+    # as an index range needs a constant pattern rather than ? || '%'
+    escaped = "".join("/" + c if c in "%_/" else c for c in prefix)
+    return column.like(escaped + "%", escape="/")
+
+
+def filter_users(query, params: UserListParamsSchema):
+    after_id = decode_user_cursor(params.cursor) if params.cursor else None
+
+    def after(select_):
+        return select_ if after_id is None else select_.where(User.id > after_id)
+
+    if params.q is not None:
+        # one prefix range per index; an OR of the two would read every row
+        matches = union(
+            after(select(User.id).where(prefix_match(User.name, params.q))),
+            after(select(User.id).where(prefix_match(User.email, params.q))),
+        ).subquery()
+        query = query.join(matches, User.id == matches.c.id)
+    else:
+        query = after(query)
+
+    if params.role is not None:
+        query = query.where(User.role == params.role)
+
+    if params.is_active is not None:
+        query = query.where(User.is_active == params.is_active)
+
+    return query.order_by(User.id).limit(params.limit + 1)
+
+
+async def estimate_user_count(db: AsyncSession) -> int:
+    # table statistics instead of COUNT(*): cheap, but only approximate
+    if db.bind.dialect.name == "mysql":
+        res = await db.execute(
+            text(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+            ),
+            {"table": User.__tablename__},
+        )
+        return int(res.scalar() or 0)
+
+    # the last primary key is a B-tree edge read; deletions make it an overestimate
+    return int(await db.scalar(select(func.max(User.id))) or 0)
 
 
 async def get_users_(
     db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
+    params: UserListParamsSchema | None = None,
+    response: Response | None = None,
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    result = await db.execute(select(User))
+    params = params or UserListParamsSchema()
+
+    result = await db.execute(filter_users(select(User), params))
     users = result.scalars().all()
 
+    headers = {}
+    if params.with_total:
+        headers["X-Total-Estimate"] = str(await estimate_user_count(db))
+
     if not users:
-        return JSONResponse(status_code=200, content={"message": "User list is empty"})
+        return JSONResponse(
+            status_code=200, content={"message": "User list is empty"}, headers=headers
+        )
+
+    if len(users) > params.limit:
+        users = users[: params.limit]
+        headers["X-Next-Cursor"] = encode_user_cursor(users[-1])
+
+    if response is not None:
+        response.headers.update(headers)
     return users
 
 
@@ -56,6 +134,13 @@ async def update_user_(
     if current_user.role != "admin" and current_user.id != user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
+    if new_data.version is not None and new_data.version != user.version:
+        raise HTTPException(
+            status_code=409, detail="User has been modified by another request"
+        )
+
+    old_email = user.email
+
     if new_data.name is not None:
         user.name = new_data.name
 
@@ -69,10 +154,20 @@ async def update_user_(
         if current_user.role != "admin":
             raise HTTPException(status_code=403, detail="Not enough permissions")
         user.role = new_data.role
+
+    new_email = user.email
+
     try:
         await db.commit()
         await db.refresh(user)
+        await invalidate_cached_user(old_email, new_email, version=user.version)
         return user
+    except StaleDataError:
+        # the flush's UPDATE ... WHERE version = <loaded> matched no row
+        await db.rollback()
+        raise HTTPException(
+            status_code=409, detail="User has been modified by another request"
+        )
     except Exception:
         await db.rollback()
         raise HTTPException(
@@ -92,9 +187,14 @@ async def delete_user_(
     if current_user.role != "admin" and current_user.id != user.id:
         raise HTTPException(status_code=403, detail="You are not admin")
 
+    email = user.email
+    # no row will ever reach this version, so no read can cache it again
+    deleted_version = user.version + 1
+
     try:
         await db.delete(user)
         await db.commit()
+        await invalidate_cached_user(email, version=deleted_version)
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     except Exception:
         await db.rollback()
@@ -0,0 +1,113 @@
+"""In-process ASGI harness shared by the benchmark scripts.
+
+Requests go through ``httpx.AsyncClient`` / ``ASGITransport`` like
+``tests/e2e``, against a throwaway database, with a statement counter on
+the engine so every scenario can report queries per request. The default
+database is a temporary SQLite file: an in-memory database shares one
+connection, so concurrent write transactions would collide. Rate limits
+are off, since every request comes from the same client.
+"""
+
+import asyncio
+import statistics
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from httpx import ASGITransport, AsyncClient, Response
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import ratelimit
+from app.core.database import Base
+from app.dependencies import get_async_db
+from main import app
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+@dataclass
+class BenchApp:
+    client: AsyncClient
+    session_factory: sessionmaker
+    queries: int = 0
+
+    def count_query(self, *args):
+        self.queries += 1
+
+    async def run(
+        self,
+        requests: int,
+        concurrency: int,
+        make_request: Callable[[AsyncClient, int], Awaitable[Response]],
+    ) -> dict:
+        latencies: list[float] = []
+        errors = 0
+        next_index = iter(range(requests))
+
+        async def worker():
+            nonlocal errors
+            for i in next_index:
+                started = time.perf_counter()
+                resp = await make_request(self.client, i)
+                latencies.append((time.perf_counter() - started) * 1000)
+                if resp.status_code >= 400:
+                    errors += 1
+
+        queries_before = self.queries
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        return {
+            "requests": requests,
+            "errors": errors,
+            "throughput_rps": requests / elapsed,
+            "p50_ms": statistics.median(latencies),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "queries_per_request": (self.queries - queries_before) / requests,
+        }
+
+
+@asynccontextmanager
+async def bench_app(database_url: str | None = None):
+    tmpdir = tempfile.TemporaryDirectory()
+    engine = create_async_engine(
+        database_url or f"sqlite+aiosqlite:///{tmpdir.name}/bench.db"
+    )
+    session_factory = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    async def override_get_async_db():
+        async with session_factory() as session:
+            yield session
+
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    rate_limit_enabled = ratelimit.RATE_LIMIT_ENABLED
+    ratelimit.RATE_LIMIT_ENABLED = False
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://bench"
+        ) as client:
+            bench = BenchApp(client=client, session_factory=session_factory)
+            event.listen(engine.sync_engine, "before_cursor_execute", bench.count_query)
+            yield bench
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
+        ratelimit.RATE_LIMIT_ENABLED = rate_limit_enabled
+        await engine.dispose()
+        tmpdir.cleanup()
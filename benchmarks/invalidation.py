@@ -0,0 +1,78 @@
+"""Cache invalidation propagation latency between workers.
+
+Starts ``--workers`` invalidation buses in one process, each on its own
+``SocketBroker`` over a real Unix socket like separate uvicorn workers
+would be, then has them take turns invalidating keys. Reports the time
+from ``invalidate`` until every other worker has dropped the key:
+
+    python -m benchmarks.invalidation --workers 4 --messages 1000
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+from app.core.broker import SocketBroker
+from app.core.invalidation import InvalidationBus
+from benchmarks.harness import percentile
+
+
+async def measure(workers: int, messages: int) -> dict:
+    tmpdir = tempfile.TemporaryDirectory()
+    brokers: list[SocketBroker] = []
+    buses: list[InvalidationBus] = []
+    arrivals: dict[str, list[float]] = {}
+
+    def receiver(key):
+        arrivals.setdefault(key, []).append(time.perf_counter())
+
+    for _ in range(workers):
+        broker = SocketBroker(f"{tmpdir.name}/bus.sock", reconnect_delay=0.02)
+        bus = InvalidationBus(broker)
+        bus.register("bench", receiver, lambda: None)
+        await broker.start()
+        await asyncio.wait_for(broker.connected.wait(), 5)
+        brokers.append(broker)
+        buses.append(bus)
+
+    latencies: list[float] = []
+    try:
+        for i in range(messages):
+            key = f"key-{i}"
+            started = time.perf_counter()
+            await buses[i % workers].invalidate("bench", key, version=i + 1)
+            # the sender applies locally too: wait for all the others
+            while len(arrivals.get(key, ())) < workers:
+                await asyncio.sleep(0)
+            latencies.append((max(arrivals.pop(key)) - started) * 1000)
+    finally:
+        for broker in brokers:
+            await broker.stop()
+        tmpdir.cleanup()
+
+    return {
+        "workers": workers,
+        "messages": messages,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": max(latencies),
+        "gaps": sum(bus.gaps for bus in buses),
+    }
+
+
+async def main(args):
+    result = await measure(args.workers, args.messages)
+    print(
+        f"{result['workers']} workers, {result['messages']} invalidations: "
+        f"p50 {result['p50_ms']:.3f} ms, p99 {result['p99_ms']:.3f} ms, "
+        f"max {result['max_ms']:.3f} ms, gaps {result['gaps']}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--messages", type=int, default=1000)
+    asyncio.run(main(parser.parse_args()))
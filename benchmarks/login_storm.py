@@ -0,0 +1,88 @@
+"""Task-read latency during a concurrent login storm.
+
+Runs the ASGI app in-process against a temporary SQLite file (see
+``benchmarks.harness``) and compares password hashing inline on the event
+loop (the old behaviour) with the thread and process pool executors:
+
+    python -m benchmarks.login_storm --logins 200 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from httpx import AsyncClient
+
+from app.api.auth import auth
+from benchmarks.harness import bench_app, percentile
+from benchmarks.scenarios import Scenarios
+from benchmarks.seed import seed
+
+
+async def run_storm(
+    client: AsyncClient, scenarios: Scenarios, logins: int, concurrency: int
+) -> dict:
+    latencies: list[float] = []
+    done = asyncio.Event()
+
+    async def read_tasks():
+        i = 0
+        while not done.is_set():
+            started = time.perf_counter()
+            await scenarios.task_list(client, i)
+            latencies.append((time.perf_counter() - started) * 1000)
+            i += 1
+
+    async def login_worker(worker: int):
+        for i in range(worker, logins, concurrency):
+            await scenarios.login_storm(client, i)
+
+    started = time.perf_counter()
+    reader_task = asyncio.create_task(read_tasks())
+    await asyncio.gather(*(login_worker(w) for w in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await reader_task
+
+    return {
+        "logins_per_s": logins / elapsed,
+        "reads": len(latencies),
+        "read_p50_ms": statistics.median(latencies),
+        "read_p99_ms": percentile(latencies, 99),
+        "read_max_ms": max(latencies),
+    }
+
+
+async def main(args):
+    async with bench_app() as bench:
+        scenarios = Scenarios(await seed(bench.session_factory, args.users, 20))
+
+        print(
+            f"{'executor':<10}{'logins/s':>10}{'reads':>8}{'p50 ms':>10}"
+            f"{'p99 ms':>10}{'max ms':>10}"
+        )
+        for kind in args.executors:
+            auth.shutdown_hash_executor()
+            auth.PASSWORD_HASH_EXECUTOR = kind
+            result = await run_storm(
+                bench.client, scenarios, args.logins, args.concurrency
+            )
+            print(
+                f"{kind:<10}{result['logins_per_s']:>10.1f}{result['reads']:>8}"
+                f"{result['read_p50_ms']:>10.2f}{result['read_p99_ms']:>10.2f}"
+                f"{result['read_max_ms']:>10.2f}"
+            )
+
+    auth.shutdown_hash_executor()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--executors", nargs="+", default=["inline", "thread", "process"]
+    )
+    asyncio.run(main(parser.parse_args()))
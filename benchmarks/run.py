@@ -0,0 +1,128 @@
+"""Benchmark suite: throughput, latency percentiles and queries per request.
+
+Seeds a synthetic dataset, runs each scenario through the ASGI app and
+prints one row per scenario. ``--save`` writes the results as a JSON
+baseline; ``--compare`` diffs a run against one and exits non-zero on a
+regression beyond ``--tolerance``:
+
+    python -m benchmarks.run --users 200 --tasks 50 --save baseline.json
+    python -m benchmarks.run --users 200 --tasks 50 --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.harness import bench_app
+from benchmarks.scenarios import SCENARIOS, Scenarios
+from benchmarks.seed import seed
+
+
+async def run_suite(
+    users: int,
+    tasks_per_user: int,
+    requests: int,
+    concurrency: int,
+    scenarios: tuple[str, ...] = SCENARIOS,
+    login_requests: int | None = None,
+) -> dict:
+    async with bench_app() as bench:
+        data = await seed(bench.session_factory, users, tasks_per_user)
+        drivers = Scenarios(data)
+
+        results = {}
+        for name in scenarios:
+            count = login_requests if name == "login_storm" else requests
+            results[name] = await bench.run(
+                count or requests, concurrency, getattr(drivers, name)
+            )
+
+    return {
+        "params": {
+            "users": users,
+            "tasks_per_user": tasks_per_user,
+            "requests": requests,
+            "concurrency": concurrency,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 {base['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms"
+            )
+        if result["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {base['throughput_rps']:.1f} -> "
+                f"{result['throughput_rps']:.1f} req/s"
+            )
+        # query counts are deterministic; any increase is a regression
+        if result["queries_per_request"] > base["queries_per_request"] + 1e-9:
+            regressions.append(
+                f"{name}: queries/request {base['queries_per_request']:.2f} -> "
+                f"{result['queries_per_request']:.2f}"
+            )
+    return regressions
+
+
+def print_results(report: dict):
+    print(
+        f"{'scenario':<18}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+        f"{'p99 ms':>10}{'q/req':>8}{'errors':>8}"
+    )
+    for name, r in report["results"].items():
+        print(
+            f"{name:<18}{r['throughput_rps']:>10.1f}{r['p50_ms']:>10.2f}"
+            f"{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+            f"{r['queries_per_request']:>8.2f}{r['errors']:>8}"
+        )
+
+
+async def main(args) -> int:
+    report = await run_suite(
+        args.users,
+        args.tasks,
+        args.requests,
+        args.concurrency,
+        tuple(args.scenarios),
+        args.logins,
+    )
+    print_results(report)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(report, indent=2))
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if baseline["params"] != report["params"]:
+            print("warning: baseline was recorded with different parameters")
+        regressions = compare(baseline, report, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=50, help="tasks per user")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--scenarios", nargs="+", default=SCENARIOS, choices=SCENARIOS)
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON to diff against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    sys.exit(asyncio.run(main(parser.parse_args())))
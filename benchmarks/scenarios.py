@@ -0,0 +1,53 @@
+"""Benchmark scenarios.
+
+Each scenario builds a request from the seeded data and the request index;
+``BenchApp.run`` drives it with the requested concurrency.
+"""
+
+from httpx import AsyncClient
+
+from app.api.auth import auth
+from benchmarks.seed import ADMIN_EMAIL, PASSWORD, SeededData
+
+
+class Scenarios:
+    def __init__(self, data: SeededData):
+        self.data = data
+        # tokens are minted directly; only login_storm pays for hashing
+        self.headers = {
+            user_id: bearer(email) for user_id, email in zip(data.user_ids, data.emails)
+        }
+        self.admin_headers = bearer(ADMIN_EMAIL)
+
+    def user(self, i: int) -> int:
+        return self.data.user_ids[i % len(self.data.user_ids)]
+
+    async def login_storm(self, client: AsyncClient, i: int):
+        email = self.data.emails[i % len(self.data.emails)]
+        return await client.post(
+            "/auth/login", json={"email": email, "password": PASSWORD}
+        )
+
+    async def task_list(self, client: AsyncClient, i: int):
+        user_id = self.user(i)
+        return await client.get(f"/{user_id}/tasks/", headers=self.headers[user_id])
+
+    async def toggle_complete(self, client: AsyncClient, i: int):
+        user_id = self.user(i)
+        tasks = self.data.task_ids[user_id]
+        task_id = tasks[(i // len(self.data.user_ids)) % len(tasks)]
+        return await client.put(
+            f"/{user_id}/tasks/{task_id}",
+            headers=self.headers[user_id],
+            json={"is_completed": i % 2 == 0},
+        )
+
+    async def admin_users(self, client: AsyncClient, i: int):
+        return await client.get("/users/", headers=self.admin_headers)
+
+
+def bearer(email: str) -> dict:
+    return {"Authorization": f"Bearer {auth.create_access_token({'sub': email})}"}
+
+
+SCENARIOS = ("login_storm", "task_list", "toggle_complete", "admin_users")
@@ -0,0 +1,123 @@
+"""Synthetic data for benchmarks.
+
+Seeds ``users`` regular users with ``tasks_per_user`` tasks each, plus one
+admin, using Core bulk inserts. Deadlines and statuses follow a rough
+production shape: a quarter of tasks are done, some are overdue and the
+rest are due mostly within the next few days with a long tail.
+"""
+
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select
+
+from app.api.auth import auth
+from app.models.tasks import Task
+from app.models.users import User
+from app.schemas.tasks import TaskEnum
+from app.schemas.users import UserRoleEnum
+
+PASSWORD = "secret123"
+ADMIN_EMAIL = "admin@bench.example.com"
+INSERT_CHUNK = 5000
+
+DONE_SHARE = 0.25
+OVERDUE_SHARE = 0.15
+# mean days until deadline for open tasks; exponential gives the long tail
+OPEN_DEADLINE_MEAN_DAYS = 5
+
+
+@dataclass
+class SeededData:
+    admin_id: int
+    user_ids: list[int]
+    emails: list[str]
+    task_ids: dict[int, list[int]] = field(default_factory=dict)
+
+
+def user_email(index: int) -> str:
+    return f"user{index}@bench.example.com"
+
+
+def make_task(rnd: random.Random, user_id: int, index: int, now: datetime) -> dict:
+    roll = rnd.random()
+    if roll < DONE_SHARE:
+        deadline = now + timedelta(days=rnd.uniform(-30, 30))
+        status, is_completed = TaskEnum.DONE, True
+    elif roll < DONE_SHARE + OVERDUE_SHARE:
+        deadline = now - timedelta(days=rnd.expovariate(1 / 3))
+        status, is_completed = TaskEnum.EXPIRED, False
+    else:
+        deadline = now + timedelta(
+            days=rnd.expovariate(1 / OPEN_DEADLINE_MEAN_DAYS), minutes=5
+        )
+        status, is_completed = TaskEnum.IN_PROGRESS, False
+
+    return {
+        "user_id": user_id,
+        "title": f"Task {index}",
+        "description": "benchmark task",
+        "deadline": deadline,
+        "status": status,
+        "is_completed": is_completed,
+    }
+
+
+async def seed(
+    session_factory, users: int, tasks_per_user: int, seed: int = 0
+) -> SeededData:
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    # hashing is deliberately slow; every user shares one hash
+    password = auth.hash_password(PASSWORD)
+    emails = [user_email(i) for i in range(users)]
+
+    async with session_factory() as db:
+        await db.execute(
+            insert(User),
+            [
+                {
+                    "name": "Admin",
+                    "email": ADMIN_EMAIL,
+                    "password": password,
+                    "role": UserRoleEnum.ADMIN,
+                    "is_active": True,
+                }
+            ]
+            + [
+                {
+                    "name": f"User {i}",
+                    "email": email,
+                    "password": password,
+                    "role": UserRoleEnum.USER,
+                    "is_active": True,
+                }
+                for i, email in enumerate(emails)
+            ],
+        )
+
+        res = await db.execute(select(User.id, User.email).order_by(User.id))
+        ids = {email: user_id for user_id, email in res.all()}
+        user_ids = [ids[email] for email in emails]
+
+        rows = [
+            make_task(rnd, user_id, i, now)
+            for user_id in user_ids
+            for i in range(tasks_per_user)
+        ]
+        for start in range(0, len(rows), INSERT_CHUNK):
+            await db.execute(insert(Task), rows[start : start + INSERT_CHUNK])
+        await db.commit()
+
+        res = await db.execute(select(Task.user_id, Task.id).order_by(Task.id))
+        task_ids: dict[int, list[int]] = {}
+        for user_id, task_id in res.all():
+            task_ids.setdefault(user_id, []).append(task_id)
+
+    return SeededData(
+        admin_id=ids[ADMIN_EMAIL],
+        user_ids=user_ids,
+        emails=emails,
+        task_ids=task_ids,
+    )
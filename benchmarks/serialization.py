@@ -0,0 +1,76 @@
+"""Task-list serialisation: ORM + response_model versus rows + TypeAdapter.
+
+Times the query-to-bytes path for one user's task list. ``orm`` is what
+FastAPI did for ``response_model=List[TaskResponseSchema]``: load ``Task``
+entities, validate them ``from_attributes``, run ``jsonable_encoder`` and
+``json.dumps``. ``rows`` is the current ``get_tasks_from_user`` path:
+plain column rows, one ``TypeAdapter`` validation and ``dump_json``:
+
+    python -m benchmarks.serialization --sizes 1000 10000
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.tasks import Task
+from app.services.tasks_service import TASK_COLUMNS, task_list_adapter
+from benchmarks.seed import seed
+
+
+async def orm_path(db: AsyncSession, user_id: int) -> bytes:
+    res = await db.execute(select(Task).where(Task.user_id == user_id))
+    tasks = task_list_adapter.validate_python(res.scalars().all(), from_attributes=True)
+    return json.dumps(jsonable_encoder(tasks)).encode()
+
+
+async def rows_path(db: AsyncSession, user_id: int) -> bytes:
+    res = await db.execute(select(*TASK_COLUMNS).where(Task.user_id == user_id))
+    tasks = task_list_adapter.validate_python(res.mappings().all())
+    return task_list_adapter.dump_json(tasks)
+
+
+async def measure(session_factory, path, user_id: int, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        # fresh session each time so the ORM path pays for its identity map
+        async with session_factory() as db:
+            started = time.perf_counter()
+            await path(db, user_id)
+            samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def main(args):
+    print(f"{'tasks':>8}{'orm ms':>10}{'rows ms':>10}{'speedup':>10}")
+    for size in args.sizes:
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        session_factory = sessionmaker(
+            engine, expire_on_commit=False, class_=AsyncSession
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        data = await seed(session_factory, users=1, tasks_per_user=size)
+        user_id = data.user_ids[0]
+
+        orm_ms = await measure(session_factory, orm_path, user_id, args.repeat)
+        rows_ms = await measure(session_factory, rows_path, user_id, args.repeat)
+        print(f"{size:>8}{orm_ms:>10.2f}{rows_ms:>10.2f}{orm_ms / rows_ms:>9.1f}x")
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
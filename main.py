@@ -1,30 +1,68 @@
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 
+from app.api.auth.auth import shutdown_hash_executor, start_hash_executor
 from app.api.routers.auth import router_auth
+from app.api.routers.health import router_health
+from app.api.routers.metrics import router_metrics
 from app.api.routers.tasks import router_tasks
 from app.api.routers.users import router_users
-from app.core.database import Base, engine
+from app.core.broker import broker
+from app.core.config import settings
+from app.core.database import engine, warm_up_pool
+from app.core.metrics import MetricsMiddleware, install_db_metrics
+from app.core.migrations import run_migrations
 from app.dependencies import wait_for_db
+from app.services.expiry_service import expiry_scheduler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    # first: the hash workers must not be forked from a threaded process
+    start_hash_executor()
+
+    if engine.dialect.name == "mysql":
+        await wait_for_db()
+
+    if settings.DB_AUTO_MIGRATE:
+        await run_migrations(engine)
 
-app = FastAPI()
+    if settings.DB_POOL_WARMUP > 0:
+        await warm_up_pool(engine, settings.DB_POOL_WARMUP)
 
+    if settings.TASK_EXPIRY_ENABLED:
+        expiry_scheduler.start()
 
-async def create_tables():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
+    await broker.start()
 
+    app.state.ready = True
+    yield
+    app.state.ready = False
 
-@app.on_event("startup")
-async def startup_event():
-    await wait_for_db()
-    await create_tables()
+    await expiry_scheduler.stop()
+    await broker.stop()
+    shutdown_hash_executor()
+    await engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 app.include_router(router_users)
 app.include_router(router_tasks)
 app.include_router(router_auth)
+app.include_router(router_health)
+
+if settings.METRICS_ENABLED or settings.DB_LIMIT_ENABLED:
+    # the limiter samples each request's database time from these events
+    install_db_metrics(engine)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(router_metrics)
 
 
 if __name__ == "__main__":
@@ -3,6 +3,7 @@ from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from app.core import ratelimit
 from app.core.database import Base
 from app.dependencies import get_async_db
 from main import app
@@ -70,6 +71,11 @@ async def prepare_database():
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    ratelimit.store.clear()
+
+
 @pytest.fixture
 async def client():
     async with AsyncClient(
@@ -1,8 +1,10 @@
 from datetime import datetime, timedelta, timezone
+from typing import Callable, NamedTuple
 
 import pytest
 
 from app.models.tasks import Task
+from app.models.users import User
 from app.schemas.tasks import TaskEnum
 
 
@@ -26,3 +28,65 @@ def task_factory():
         )
 
     return _create_task
+
+
+class Seed(NamedTuple):
+    user: User
+    tasks: list[Task]
+    other: User
+    foreign: Task | None
+
+    @property
+    def task(self) -> Task:
+        return self.tasks[0]
+
+
+@pytest.fixture
+def seed_tasks(test_client, test_db, user_factory, task_factory):
+    """``await seed_tasks(3)``: a logged-in user with three tasks, and another user.
+
+    Tasks are titled ``title.format(i)`` and get ``task_kwargs`` and, if
+    given, ``each(i)`` as further ``task_factory`` arguments. ``foreign``
+    gives the other user a task too; ``db`` seeds a session other than
+    test_db.
+    """
+
+    async def _seed(
+        count: int = 1,
+        role: str = "user",
+        title: str = "T{}",
+        foreign: bool = False,
+        each: Callable[[int], dict] | None = None,
+        db=None,
+        **task_kwargs,
+    ) -> Seed:
+        db = db or test_db
+        user = user_factory(role=role)
+        other = user_factory(role="user")
+        db.add_all([user, other])
+        await db.commit()
+        await db.refresh(user)
+        await db.refresh(other)
+
+        tasks = [
+            task_factory(
+                user_id=user.id,
+                title=title.format(i),
+                **task_kwargs,
+                **(each(i) if each else {}),
+            )
+            for i in range(count)
+        ]
+        foreign_task = (
+            task_factory(user_id=other.id, title="Foreign") if foreign else None
+        )
+        seeded = [*tasks, foreign_task] if foreign else tasks
+        db.add_all(seeded)
+        await db.commit()
+        for task in seeded:
+            await db.refresh(task)
+
+        test_client.set_current_user(user)
+        return Seed(user, tasks, other, foreign_task)
+
+    return _seed
@@ -5,6 +5,7 @@ from fastapi import HTTPException, status
 
 import app.services.auth_service as auth_service
 from app.api.auth import auth
+from app.core import ratelimit
 from app.schemas.users import UserCreateSchema
 
 # ------------------------------------------------------
@@ -168,18 +169,26 @@ class TestAuthLoginCrud:
 
     def test_hash_and_verify_password_roundtrip(self):
         raw = "mypassword"
-        hashed = auth_service.hash_password(raw)
+        hashed = auth.hash_password(raw)
 
         assert hashed != raw
-        assert auth_service.verify_password(raw, hashed)
-        assert not auth_service.verify_password("wrong", hashed)
+        assert auth.verify_password(raw, hashed)
+        assert not auth.verify_password("wrong", hashed)
+
+    async def test_hash_and_verify_password_async_roundtrip(self):
+        raw = "mypassword"
+        hashed = await auth.hash_password_async(raw)
+
+        assert hashed != raw
+        assert await auth.verify_password_async(raw, hashed)
+        assert not await auth.verify_password_async("wrong", hashed)
 
     async def test_get_current_user_success(self, test_db, user_factory):
         user = user_factory(email="current@example.com")
         test_db.add(user)
         await test_db.commit()
 
-        token = auth_service.create_access_token({"sub": user.email})
+        token = auth.create_access_token({"sub": user.email})
 
         result = await auth.get_current_user(token=token, db=test_db)
         assert result.email == "current@example.com"
@@ -233,10 +242,10 @@ class TestAuthLoginErrors:
         test_db.add(user)
         await test_db.commit()
 
-        def fake_verify_password(p, h):
+        async def fake_verify_password(p, h):
             raise Exception("vp crash")
 
-        monkeypatch.setattr(auth_service, "verify_password", fake_verify_password)
+        monkeypatch.setattr(auth_service, "verify_password_async", fake_verify_password)
 
         creds = auth_service.UserAuthSchema(email=user.email, password="123")
 
@@ -255,6 +264,289 @@ class TestAuthLoginErrors:
         assert "invalid" in exc.value.detail.lower()
 
 
+# ------------------------------------------------------
+# STATELESS (claims-only access tokens)
+# ------------------------------------------------------
+
+
+@pytest.mark.asyncio
+class TestAuthStateless:
+
+    async def test_claims_token_skips_db(self, test_db, user_factory, monkeypatch):
+        monkeypatch.setattr(auth, "AUTH_STATELESS", True)
+        user = user_factory(email="claims@example.com", role="user")
+        test_db.add(user)
+        await test_db.commit()
+        await test_db.refresh(user)
+
+        token = auth.create_user_access_token(user)
+
+        result = await auth.get_current_user(token=token, db=None)
+        assert isinstance(result, auth.Principal)
+        assert result.id == user.id
+        assert result.email == "claims@example.com"
+        assert result.role == "user"
+        assert result.is_active is True
+
+    async def test_stale_claims_version_reloads_user(
+        self, test_db, user_factory, monkeypatch
+    ):
+        monkeypatch.setattr(auth, "AUTH_STATELESS", True)
+        user = user_factory(email="stale@example.com")
+        test_db.add(user)
+        await test_db.commit()
+        await test_db.refresh(user)
+
+        token = auth.create_user_access_token(user)
+        monkeypatch.setattr(auth, "TOKEN_CLAIMS_VERSION", auth.TOKEN_CLAIMS_VERSION + 1)
+
+        result = await auth.get_current_user(token=token, db=test_db)
+        assert isinstance(result, auth.User)
+        assert result.id == user.id
+
+    async def test_token_without_claims_reloads_user(
+        self, test_db, user_factory, monkeypatch
+    ):
+        monkeypatch.setattr(auth, "AUTH_STATELESS", True)
+        user = user_factory(email="noclaims@example.com")
+        test_db.add(user)
+        await test_db.commit()
+
+        token = auth.create_access_token({"sub": user.email})
+
+        result = await auth.get_current_user(token=token, db=test_db)
+        assert isinstance(result, auth.User)
+
+    async def test_inactive_claims_forbidden(self, monkeypatch):
+        monkeypatch.setattr(auth, "AUTH_STATELESS", True)
+        token = auth.create_access_token(
+            {
+                "sub": "off@example.com",
+                "uid": 1,
+                "role": "user",
+                "active": False,
+                "ver": auth.TOKEN_CLAIMS_VERSION,
+            }
+        )
+
+        with pytest.raises(HTTPException) as exc:
+            await auth.get_current_user(token=token, db=None)
+
+        assert exc.value.status_code == 403
+
+    async def test_refresh_issues_claims_token(
+        self, test_client, test_db, user_factory, monkeypatch
+    ):
+        monkeypatch.setattr(auth, "AUTH_STATELESS", True)
+        user = user_factory(email="refresh@example.com", role="admin")
+        test_db.add(user)
+        await test_db.commit()
+        await test_db.refresh(user)
+
+        resp = await test_client.post(
+            "/auth/refresh",
+            cookies={"refresh_token": auth.create_refresh_token({"sub": user.email})},
+        )
+
+        assert resp.status_code == 200
+        result = await auth.get_current_user(token=resp.json()["access_token"], db=None)
+        assert isinstance(result, auth.Principal)
+        assert (result.id, result.role) == (user.id, "admin")
+
+    async def test_refresh_rejects_blocked_user(
+        self, test_client, test_db, user_factory
+    ):
+        user = user_factory(email="blocked-refresh@example.com", is_active=False)
+        test_db.add(user)
+        await test_db.commit()
+
+        resp = await test_client.post(
+            "/auth/refresh",
+            cookies={"refresh_token": auth.create_refresh_token({"sub": user.email})},
+        )
+
+        assert resp.status_code == 401
+
+    async def test_claims_ignored_when_disabled(self, test_db, user_factory):
+        user = user_factory(email="stateful@example.com")
+        test_db.add(user)
+        await test_db.commit()
+
+        token = auth.create_user_access_token(user)
+
+        result = await auth.get_current_user(token=token, db=test_db)
+        assert isinstance(result, auth.User)
+
+    async def test_get_fresh_user_reloads_principal(self, test_db, user_factory):
+        user = user_factory(email="fresh@example.com", role="user")
+        test_db.add(user)
+        await test_db.commit()
+        await test_db.refresh(user)
+
+        principal = auth.Principal(
+            id=user.id, email=user.email, role="admin", is_active=True
+        )
+
+        result = await auth.get_fresh_user(current_user=principal, db=test_db)
+        assert isinstance(result, auth.User)
+        assert result.role == "user"
+
+    async def test_get_fresh_user_deleted(self, test_db):
+        principal = auth.Principal(
+            id=9999, email="gone@example.com", role="user", is_active=True
+        )
+
+        with pytest.raises(HTTPException) as exc:
+            await auth.get_fresh_user(current_user=principal, db=test_db)
+
+        assert exc.value.status_code == 401
+
+
+# ------------------------------------------------------
+# USER CACHE
+# ------------------------------------------------------
+
+
+@pytest.mark.asyncio
+class TestAuthUserCache:
+
+    @pytest.fixture(autouse=True)
+    def enable_cache(self, monkeypatch):
+        monkeypatch.setattr(auth, "USER_CACHE_ENABLED", True)
+        auth.user_cache.clear()
+        auth.bus.versions.clear()
+        yield
+        auth.user_cache.clear()
+        auth.bus.versions.clear()
+
+    async def test_second_lookup_served_from_cache(self, test_db, user_factory):
+        user = user_factory(email="cached@example.com")
+        test_db.add(user)
+        await test_db.commit()
+
+        token = auth.create_access_token({"sub": user.email})
+
+        first = await auth.get_current_user(token=token, db=test_db)
+        second = await auth.get_current_user(token=token, db=None)
+
+        assert isinstance(first, auth.User)
+        assert isinstance(second, auth.Principal)
+        assert second.id == first.id
+        assert auth.user_cache.stats()["hits"] == 1
+
+    async def test_update_user_invalidates_cache(
+        self, test_db, test_client, user_factory
+    ):
+        admin = user_factory(email="cacheadmin@example.com", role="admin")
+        test_db.add(admin)
+        await test_db.commit()
+        await test_db.refresh(admin)
+
+        token = auth.create_access_token({"sub": admin.email})
+        await auth.get_current_user(token=token, db=test_db)
+        assert len(auth.user_cache) == 1
+
+        test_client.set_current_user(admin)
+        resp = await test_client.put(f"/users/{admin.id}", json={"role": "user"})
+        assert resp.status_code == 200
+        assert len(auth.user_cache) == 0
+
+        result = await auth.get_current_user(token=token, db=test_db)
+        assert result.role == "user"
+
+    async def test_delete_user_invalidates_cache(
+        self, test_db, test_client, user_factory
+    ):
+        user = user_factory(email="cachedel@example.com")
+        test_db.add(user)
+        await test_db.commit()
+        await test_db.refresh(user)
+
+        token = auth.create_access_token({"sub": user.email})
+        await auth.get_current_user(token=token, db=test_db)
+
+        test_client.set_current_user(user)
+        resp = await test_client.delete(f"/users/{user.id}")
+        assert resp.status_code == 204
+
+        with pytest.raises(HTTPException) as exc:
+            await auth.get_current_user(token=token, db=test_db)
+
+        assert exc.value.status_code == 401
+
+    async def test_read_racing_a_write_is_not_cached(self, test_db, user_factory):
+        user = user_factory(email="cacherace@example.com")
+        test_db.add(user)
+        await test_db.commit()
+
+        # another worker committed version 2 while this one read version 1
+        await auth.invalidate_cached_user(user.email, version=user.version + 1)
+
+        token = auth.create_access_token({"sub": user.email})
+        await auth.get_current_user(token=token, db=test_db)
+
+        assert len(auth.user_cache) == 0
+
+
+# ------------------------------------------------------
+# PASSWORD HASH EXECUTOR
+# ------------------------------------------------------
+
+
+@pytest.mark.asyncio
+class TestPasswordHashExecutor:
+
+    @pytest.fixture(autouse=True)
+    def reset_executor(self):
+        auth.shutdown_hash_executor()
+        yield
+        auth.shutdown_hash_executor()
+
+    async def test_inline_mode_has_no_executor(self, monkeypatch):
+        monkeypatch.setattr(auth, "PASSWORD_HASH_EXECUTOR", "inline")
+
+        assert auth.get_hash_executor() is None
+        hashed = await auth.hash_password_async("pw")
+        assert auth.verify_password("pw", hashed)
+
+    async def test_thread_mode(self, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+
+        monkeypatch.setattr(auth, "PASSWORD_HASH_EXECUTOR", "thread")
+
+        hashed = await auth.hash_password_async("pw")
+        assert isinstance(auth.get_hash_executor(), ThreadPoolExecutor)
+        assert await auth.verify_password_async("pw", hashed)
+
+    async def test_process_mode_does_not_fork(self, monkeypatch):
+        from concurrent.futures import ProcessPoolExecutor
+
+        monkeypatch.setattr(auth, "PASSWORD_HASH_EXECUTOR", "process")
+
+        auth.start_hash_executor()
+        executor = auth.get_hash_executor()
+        assert isinstance(executor, ProcessPoolExecutor)
+        assert executor._mp_context.get_start_method() in ("forkserver", "spawn")
+
+        hashed = await auth.hash_password_async("pw")
+        assert await auth.verify_password_async("pw", hashed)
+
+    async def test_broken_process_pool_falls_back_to_threads(self, monkeypatch):
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+
+        class BrokenPool(ProcessPoolExecutor):
+            def submit(self, *args, **kwargs):
+                raise BrokenProcessPool("no workers")
+
+        monkeypatch.setattr(auth, "PASSWORD_HASH_EXECUTOR", "process")
+        monkeypatch.setattr(auth, "_hash_executor", BrokenPool(max_workers=1))
+
+        hashed = await auth.hash_password_async("pw")
+        assert auth.verify_password("pw", hashed)
+        assert isinstance(auth.get_hash_executor(), ThreadPoolExecutor)
+
+
 # ------------------------------------------------------
 # LOGIN (FORM/token)
 # ------------------------------------------------------
@@ -279,7 +571,7 @@ class TestAuthLoginTokenCrud:
     async def test_login_token_sets_cookies(self, test_client, user_factory, test_db):
         user = user_factory(
             email="cookie@example.com",
-            password=auth_service.hash_password("pw"),
+            password=auth.hash_password("pw"),
         )
         test_db.add(user)
         await test_db.commit()
@@ -398,3 +690,38 @@ class TestAuthRefreshErrors:
             )
             assert resp.status_code == 401
             assert resp.json()["detail"] == "Invalid refresh token"
+
+
+# ------------------------------------------------------
+# RATE LIMITS
+# ------------------------------------------------------
+
+
+@pytest.mark.asyncio
+class TestAuthRateLimit:
+
+    async def test_password_routes_share_a_per_ip_budget(self, test_client):
+        creds = {"email": "throttled@example.com", "password": "bad"}
+
+        for _ in range(5):
+            resp = await test_client.post("/auth/login", json=creds)
+            assert resp.status_code == 401
+        for _ in range(5):
+            resp = await test_client.post(
+                "/auth/token", data={"username": creds["email"], "password": "bad"}
+            )
+            assert resp.status_code == 401
+
+        resp = await test_client.post("/auth/login", json=creds)
+
+        assert resp.status_code == 429
+        assert resp.json()["detail"] == "Too many requests"
+        assert int(resp.headers["Retry-After"]) >= 1
+
+    async def test_disabled(self, test_client, monkeypatch):
+        monkeypatch.setattr(ratelimit, "RATE_LIMIT_ENABLED", False)
+        creds = {"email": "unthrottled@example.com", "password": "bad"}
+
+        for _ in range(11):
+            resp = await test_client.post("/auth/login", json=creds)
+            assert resp.status_code == 401
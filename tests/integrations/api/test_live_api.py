@@ -0,0 +1,145 @@
+import asyncio
+import json
+
+import pytest
+
+from app.api.auth.auth import get_websocket_user
+from main import app
+
+# httpx's ASGITransport buffers whole responses, so long-lived SSE and
+# WebSocket connections are driven through the ASGI interface directly
+
+
+class ASGIConnection:
+    def __init__(self, scope: dict, first_message: dict):
+        self.scope = {
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "scheme": "http",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"test")],
+            "server": ("test", 80),
+            "client": ("127.0.0.1", 1234),
+            **scope,
+        }
+        self.incoming = asyncio.Queue()
+        self.incoming.put_nowait(first_message)
+        self.sent = asyncio.Queue()
+        self.task = None
+
+    async def receive(self):
+        return await self.incoming.get()
+
+    async def send(self, message):
+        await self.sent.put(message)
+
+    def start(self):
+        self.task = asyncio.create_task(app(self.scope, self.receive, self.send))
+        return self
+
+    async def next_message(self) -> dict:
+        return await asyncio.wait_for(self.sent.get(), 2)
+
+    async def close(self, message: dict):
+        self.incoming.put_nowait(message)
+        await asyncio.wait_for(self.task, 2)
+
+
+def open_sse(path: str) -> ASGIConnection:
+    return ASGIConnection(
+        {"type": "http", "method": "GET", "path": path, "raw_path": path.encode()},
+        {"type": "http.request", "body": b"", "more_body": False},
+    ).start()
+
+
+def open_websocket(path: str) -> ASGIConnection:
+    return ASGIConnection(
+        {"type": "websocket", "path": path, "raw_path": path.encode()},
+        {"type": "websocket.connect"},
+    ).start()
+
+
+async def next_frame(conn: ASGIConnection) -> str:
+    while True:
+        message = await conn.next_message()
+        if message["type"] == "http.response.body" and message["body"]:
+            return message["body"].decode()
+
+
+@pytest.mark.asyncio
+class TestTasksStream:
+
+    async def test_sse_receives_committed_writes(self, test_client, seed_tasks):
+        seed = await seed_tasks()
+        user, task = seed.user, seed.task
+        url = f"/{user.id}/tasks/"
+        conn = open_sse(f"{url}stream")
+
+        start = await conn.next_message()
+        assert start["status"] == 200
+        assert (b"content-type", b"text/event-stream; charset=utf-8") in start[
+            "headers"
+        ]
+        assert await next_frame(conn) == ": connected\n\n"
+
+        await test_client.put(f"{url}{task.id}", json={"title": "Live"})
+        await test_client.delete(f"{url}{task.id}")
+
+        updated = await next_frame(conn)
+        assert updated.startswith("event: updated\ndata: ")
+        data = json.loads(updated.split("data: ", 1)[1])
+        assert data["task"]["title"] == "Live"
+        assert (await next_frame(conn)).startswith("event: deleted\n")
+
+        await conn.close({"type": "http.disconnect"})
+
+    async def test_sse_heartbeat(self, seed_tasks, monkeypatch):
+        from app.services import tasks_service
+
+        monkeypatch.setattr(tasks_service, "LIVE_HEARTBEAT_SECONDS", 0.01)
+        user = (await seed_tasks()).user
+        conn = open_sse(f"/{user.id}/tasks/stream")
+
+        await conn.next_message()
+        assert await next_frame(conn) == ": connected\n\n"
+        assert await next_frame(conn) == ": keepalive\n\n"
+
+        await conn.close({"type": "http.disconnect"})
+
+    async def test_sse_other_user_forbidden(self, test_client, seed_tasks):
+        seed = await seed_tasks()
+        user, other = seed.user, seed.other
+        test_client.set_current_user(other)
+
+        resp = await test_client.get(f"/{user.id}/tasks/stream")
+        assert resp.status_code == 403
+
+    async def test_websocket_receives_committed_writes(self, test_client, seed_tasks):
+        seed = await seed_tasks()
+        user, task = seed.user, seed.task
+        app.dependency_overrides[get_websocket_user] = lambda: user
+        conn = open_websocket(f"/{user.id}/tasks/ws")
+
+        assert (await conn.next_message())["type"] == "websocket.accept"
+
+        await test_client.put(f"/{user.id}/tasks/{task.id}", json={"title": "WS"})
+
+        message = await conn.next_message()
+        data = json.loads(message["text"])
+        assert data["event"] == "updated"
+        assert data["task"]["title"] == "WS"
+
+        await conn.close({"type": "websocket.disconnect", "code": 1000})
+
+    async def test_websocket_other_user_rejected(self, seed_tasks):
+        seed = await seed_tasks()
+        user, other = seed.user, seed.other
+        app.dependency_overrides[get_websocket_user] = lambda: other
+
+        conn = open_websocket(f"/{user.id}/tasks/ws")
+
+        message = await conn.next_message()
+        assert message["type"] == "websocket.close"
+        assert message["code"] == 1008
+        await asyncio.wait_for(conn.task, 2)
@@ -0,0 +1,59 @@
+import pytest
+
+from app.core.metrics import install_db_metrics, metrics
+
+
+@pytest.fixture
+def fresh_metrics(async_engine):
+    install_db_metrics(async_engine)
+    metrics.reset()
+    yield metrics
+    metrics.reset()
+
+
+@pytest.mark.asyncio
+class TestMetrics:
+
+    async def test_requests_labelled_by_route_template(
+        self, test_client, test_db, user_factory, task_factory, fresh_metrics
+    ):
+        user = user_factory(role="user")
+        test_db.add(user)
+        await test_db.commit()
+        test_client.set_current_user(user)
+
+        await test_client.get(f"/{user.id}/tasks/")
+        await test_client.get(f"/{user.id}/tasks/")
+
+        text = (await test_client.get("/metrics")).text
+        labels = 'method="GET",route="/{user_id}/tasks/"'
+
+        assert f'http_requests_total{{{labels},status="200"}} 2' in text
+        assert f"http_request_duration_seconds_count{{{labels}}} 2" in text
+
+    async def test_db_queries_counted_per_request(
+        self, test_client, test_db, user_factory, fresh_metrics
+    ):
+        user = user_factory(role="user")
+        test_db.add(user)
+        await test_db.commit()
+        test_client.set_current_user(user)
+
+        await test_client.get(f"/{user.id}/tasks/")
+
+        route = fresh_metrics.route("GET", "/{user_id}/tasks/")
+        assert route.db_queries.count == 1
+        assert route.db_queries.sum >= 1
+        assert fresh_metrics.db_query_seconds.count >= 1
+
+    async def test_unmatched_route(self, test_client, fresh_metrics):
+        await test_client.get("/no-such-path")
+
+        text = (await test_client.get("/metrics")).text
+        assert 'route="<unmatched>",status="404"' in text
+
+    async def test_gauges_exposed(self, test_client, fresh_metrics):
+        text = (await test_client.get("/metrics")).text
+
+        assert "auth_user_cache_hits" in text
+        assert "db_pool_" in text
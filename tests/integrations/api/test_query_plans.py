@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.api.auth import auth
+from app.core.pagination import encode_cursor
+from app.models.users import User
+from app.services.expiry_service import expire_overdue_tasks, next_deadline
+
+# ------------------------------------------------------
+# INDEX ADVISOR: no service query may full-scan Tasks/Users
+# ------------------------------------------------------
+
+
+@pytest.mark.asyncio
+class TestQueryPlans:
+
+    async def test_task_endpoints(self, test_client, seed_tasks, query_plans):
+        seed = await seed_tasks(3, foreign=True)
+        user, task = seed.user, seed.task
+        url = f"/{user.id}/tasks/"
+        deadline = (datetime.now(timezone.utc) + timedelta(days=2)).isoformat()
+
+        await test_client.post(
+            url, json={"title": "New", "description": "d", "deadline": deadline}
+        )
+        await test_client.get(url)
+        await test_client.get(url, params={"order_by": "deadline", "limit": 1})
+        await test_client.get(url, params={"status": "In progress"})
+        await test_client.get(url, params={"is_completed": "false"})
+        await test_client.get(url, params={"deadline_to": deadline})
+        await test_client.get(f"{url}{task.id}")
+        await test_client.put(f"{url}{task.id}", json={"is_completed": True})
+        await test_client.delete(f"{url}{task.id}")
+        await test_client.get(f"{url}changes", params={"since": "eyJ2IjoxfQ"})
+
+        assert query_plans.statements
+        await query_plans.assert_no_full_scans()
+
+    async def test_bulk_and_sync_endpoints(self, test_client, seed_tasks, query_plans):
+        seed = await seed_tasks(3, foreign=True)
+        user, tasks = seed.user, seed.tasks
+        url = f"/{user.id}/tasks/"
+        deadline = (datetime.now(timezone.utc) + timedelta(days=2)).isoformat()
+
+        resp = await test_client.post(
+            f"{url}bulk",
+            json={
+                "create": [{"title": "New", "description": "d", "deadline": deadline}],
+                "update": [
+                    {"id": tasks[0].id, "title": "Bulk"},
+                    {"id": tasks[1].id, "is_completed": True, "version": 1},
+                ],
+                "delete": [tasks[2].id],
+            },
+        )
+        assert resp.status_code == 200
+        await test_client.get(f"{url}changes")
+        await test_client.get(f"{url}export")
+        await test_client.get(f"{url}export", params={"format": "json"})
+
+        await query_plans.assert_no_full_scans()
+
+    async def test_export_all_users_scans_by_design(
+        self, test_client, seed_tasks, query_plans
+    ):
+        admin = (await seed_tasks(3, role="admin", foreign=True)).user
+
+        resp = await test_client.get(
+            f"/{admin.id}/tasks/export", params={"all_users": True}
+        )
+        assert resp.status_code == 200
+
+        # every task of every user, in primary key order
+        query_plans.allow_scan("Tasks")
+        await query_plans.assert_no_full_scans()
+
+    async def test_expiry_service(self, test_db, seed_tasks, query_plans):
+        await seed_tasks(3, deadline=datetime.now(timezone.utc) - timedelta(hours=1))
+        now = datetime.now(timezone.utc)
+
+        assert await expire_overdue_tasks(test_db, now, chunk_size=2) == 3
+        await next_deadline(test_db, now)
+
+        await query_plans.assert_no_full_scans()
+
+    async def test_user_endpoints(self, test_client, seed_tasks, query_plans):
+        user = (await seed_tasks(3, foreign=True)).user
+
+        await test_client.get(f"/users/{user.id}")
+        await test_client.put(f"/users/{user.id}", json={"name": "Renamed"})
+        await test_client.delete(f"/users/{user.id}")
+
+        await query_plans.assert_no_full_scans()
+
+    async def test_admin_user_search(
+        self, test_client, test_db, user_factory, query_plans
+    ):
+        admin = user_factory(role="admin")
+        test_db.add_all([admin, user_factory(role="user")])
+        await test_db.commit()
+        test_client.set_current_user(admin)
+
+        cursor = encode_cursor({"id": admin.id})
+        await test_client.get("/users/", params={"limit": 1, "cursor": cursor})
+        await test_client.get("/users/", params={"q": "ab"})
+        await test_client.get("/users/", params={"q": "ab", "cursor": cursor})
+        await test_client.get("/users/", params={"is_active": True, "role": "user"})
+
+        await query_plans.assert_no_full_scans()
+
+    async def test_admin_user_listing_reads_primary_key_order(
+        self, test_client, test_db, user_factory, query_plans
+    ):
+        admin = user_factory(role="admin")
+        test_db.add_all([admin, user_factory(role="user")])
+        await test_db.commit()
+        test_client.set_current_user(admin)
+
+        await test_client.get("/users/", params={"limit": 1})
+        await test_client.get("/users/", params={"with_total": True})
+
+        # the unfiltered first page walks the primary key and stops at the limit
+        query_plans.allow_scan("Users")
+        await query_plans.assert_no_full_scans()
+
+    async def test_auth_endpoints(
+        self, test_client, test_db, user_factory, query_plans
+    ):
+        user = user_factory(email="plan@example.com", password=auth.hash_password("pw"))
+        test_db.add(user)
+        await test_db.commit()
+
+        resp = await test_client.post(
+            "/auth/login", json={"email": "plan@example.com", "password": "pw"}
+        )
+        assert resp.status_code == 200
+
+        token = auth.create_access_token({"sub": user.email})
+        await auth.get_current_user(token=token, db=test_db)
+
+        await query_plans.assert_no_full_scans()
+
+    async def test_guard_detects_full_scan(self, test_db, query_plans):
+        # password has no index
+        await test_db.execute(select(User).where(User.password == "x"))
+
+        scans = await query_plans.full_scans()
+        assert "Users" in {table for table, _ in scans}
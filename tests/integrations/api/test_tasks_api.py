@@ -1,11 +1,21 @@
+import asyncio
+import json
 from datetime import datetime, timedelta, timezone
 
 import pytest
 from fastapi import HTTPException
-from sqlalchemy import select
-
-from app.models.tasks import Task
-from app.schemas.tasks import TaskEnum
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.auth.auth import create_access_token
+from app.api.routers.tasks import tasks_limit
+from app.core.database import Base
+from app.core.ratelimit import Rate
+from app.core.singleflight import SingleFlight
+from app.models.tasks import Task, TaskTombstone
+from app.schemas.tasks import TaskEnum, TaskListParamsSchema, TaskResponseSchema
+from app.services import tasks_service
 
 # ------------------------------------------------------
 # CRUD
@@ -124,6 +134,209 @@ class TestTasksRead:
         assert resp.json()["detail"] == "Task does not belong to this user"
 
 
+@pytest.mark.asyncio
+class TestTasksList:
+
+    @staticmethod
+    def _schedule(count):
+        # deadlines falling with the index, every other task done
+        now = datetime.now(timezone.utc)
+        return lambda i: {
+            "deadline": now + timedelta(days=count - i),
+            "is_completed": i % 2 == 0,
+            "status": TaskEnum.DONE if i % 2 == 0 else TaskEnum.IN_PROGRESS,
+        }
+
+    async def test_fast_path_matches_response_model(
+        self, test_client, test_db, seed_tasks
+    ):
+        user = (await seed_tasks(3, title="Task {}", each=self._schedule(3))).user
+
+        resp = await test_client.get(f"/{user.id}/tasks/")
+        assert resp.headers["content-type"] == "application/json"
+
+        res = await test_db.execute(
+            select(Task).where(Task.user_id == user.id).order_by(Task.id)
+        )
+        expected = [
+            TaskResponseSchema.model_validate(task).model_dump(mode="json")
+            for task in res.scalars().all()
+        ]
+        assert resp.json() == expected
+
+    async def test_keyset_pages_by_id(self, test_client, seed_tasks):
+        user = (await seed_tasks(5, title="Task {}", each=self._schedule(5))).user
+
+        resp = await test_client.get(f"/{user.id}/tasks/", params={"limit": 2})
+        assert resp.status_code == 200
+        first = resp.json()
+        cursor = resp.headers["X-Next-Cursor"]
+
+        seen = [t["id"] for t in first]
+        while cursor:
+            resp = await test_client.get(
+                f"/{user.id}/tasks/", params={"limit": 2, "cursor": cursor}
+            )
+            seen += [t["id"] for t in resp.json()]
+            cursor = resp.headers.get("X-Next-Cursor")
+
+        assert len(seen) == 5
+        assert seen == sorted(seen)
+
+    async def test_keyset_pages_by_deadline_desc(self, test_client, seed_tasks):
+        user = (await seed_tasks(4, title="Task {}", each=self._schedule(4))).user
+        params = {"limit": 3, "order_by": "deadline", "direction": "desc"}
+
+        resp = await test_client.get(f"/{user.id}/tasks/", params=params)
+        page1 = resp.json()
+        resp = await test_client.get(
+            f"/{user.id}/tasks/",
+            params={**params, "cursor": resp.headers["X-Next-Cursor"]},
+        )
+        page2 = resp.json()
+
+        assert "X-Next-Cursor" not in resp.headers
+        titles = [t["title"] for t in page1 + page2]
+        assert titles == ["Task 0", "Task 1", "Task 2", "Task 3"]
+
+    @pytest.mark.parametrize("direction", ["asc", "desc"])
+    async def test_deadline_order_lists_undated_tasks_last(
+        self, test_client, test_db, seed_tasks, direction
+    ):
+        seed = await seed_tasks(5, title="Task {}", each=self._schedule(5))
+        undated = [seed.tasks[1].id, seed.tasks[3].id]
+        await test_db.execute(
+            update(Task).where(Task.id.in_(undated)).values(deadline=None)
+        )
+        await test_db.commit()
+
+        seen = []
+        params = {"limit": 2, "order_by": "deadline", "direction": direction}
+        while True:
+            resp = await test_client.get(f"/{seed.user.id}/tasks/", params=params)
+            assert resp.status_code == 200
+            seen += [t["title"] for t in resp.json()]
+            if "X-Next-Cursor" not in resp.headers:
+                break
+            params["cursor"] = resp.headers["X-Next-Cursor"]
+
+        # deadlines fall with the index
+        if direction == "asc":
+            assert seen == ["Task 4", "Task 2", "Task 0", "Task 1", "Task 3"]
+        else:
+            assert seen == ["Task 0", "Task 2", "Task 4", "Task 3", "Task 1"]
+
+    async def test_filters(self, test_client, seed_tasks):
+        user = (await seed_tasks(4, title="Task {}", each=self._schedule(4))).user
+
+        resp = await test_client.get(
+            f"/{user.id}/tasks/", params={"is_completed": "false"}
+        )
+        assert {t["title"] for t in resp.json()} == {"Task 1", "Task 3"}
+
+        resp = await test_client.get(f"/{user.id}/tasks/", params={"status": "Done"})
+        assert {t["title"] for t in resp.json()} == {"Task 0", "Task 2"}
+
+        deadline_to = datetime.now(timezone.utc) + timedelta(days=2, hours=12)
+        resp = await test_client.get(
+            f"/{user.id}/tasks/", params={"deadline_to": deadline_to.isoformat()}
+        )
+        assert {t["title"] for t in resp.json()} == {"Task 2", "Task 3"}
+
+    async def test_invalid_cursor(self, test_client, seed_tasks):
+        user = (await seed_tasks(0)).user
+
+        resp = await test_client.get(f"/{user.id}/tasks/", params={"cursor": "nope"})
+        assert resp.status_code == 400
+        assert resp.json()["detail"] == "Invalid cursor"
+
+    async def test_limit_out_of_range(self, test_client, seed_tasks):
+        user = (await seed_tasks(0)).user
+
+        resp = await test_client.get(f"/{user.id}/tasks/", params={"limit": 0})
+        assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+class TestTasksAccess:
+
+    async def test_self_access_skips_user_lookup(
+        self, test_client, test_db, user_factory, task_factory, query_plans
+    ):
+        user = user_factory(role="user")
+        test_db.add(user)
+        await test_db.commit()
+        await test_db.refresh(user)
+        task = task_factory(user_id=user.id)
+        test_db.add(task)
+        await test_db.commit()
+        test_db.expunge_all()
+        test_client.set_current_user(user)
+        query_plans.statements.clear()
+
+        resp = await test_client.get(f"/{user.id}/tasks/{task.id}")
+
+        assert resp.status_code == 200
+        assert len(query_plans.statements) == 1
+        assert 'FROM "Tasks"' in query_plans.statements[0][0]
+
+    async def test_list_reads_only_version_column_of_user(
+        self, test_client, test_db, user_factory, task_factory, query_plans
+    ):
+        user = user_factory(role="user")
+        test_db.add(user)
+        await test_db.commit()
+        await test_db.refresh(user)
+        test_db.add(task_factory(user_id=user.id))
+        await test_db.commit()
+        test_client.set_current_user(user)
+        query_plans.statements.clear()
+
+        resp = await test_client.get(f"/{user.id}/tasks/")
+
+        assert resp.status_code == 200
+        version_read, task_read = [stmt for stmt, _ in query_plans.statements]
+        assert '"Users".tasks_version' in version_read
+        assert '"Users".password' not in version_read
+        assert 'FROM "Tasks"' in task_read
+
+    async def test_admin_access_checks_existence(
+        self, test_client, test_db, user_factory, task_factory, query_plans
+    ):
+        admin = user_factory(role="admin")
+        user = user_factory(role="user")
+        test_db.add_all([admin, user])
+        await test_db.commit()
+        await test_db.refresh(user)
+        test_db.add(task_factory(user_id=user.id))
+        await test_db.commit()
+        test_client.set_current_user(admin)
+        query_plans.statements.clear()
+
+        resp = await test_client.get(f"/{user.id}/tasks/")
+
+        assert resp.status_code == 200
+        assert len(resp.json()) == 1
+        assert '"Users".tasks_version' in query_plans.statements[0][0]
+        assert '"Users".password' not in query_plans.statements[0][0]
+
+    async def test_user_cannot_access_other_user(
+        self, test_client, test_db, user_factory
+    ):
+        user = user_factory(role="user")
+        other = user_factory(role="user")
+        test_db.add_all([user, other])
+        await test_db.commit()
+        await test_db.refresh(other)
+        test_client.set_current_user(user)
+
+        resp = await test_client.get(f"/{other.id}/tasks/")
+        assert resp.status_code == 403
+
+        resp = await test_client.get("/9999/tasks/")
+        assert resp.status_code == 404
+
+
 @pytest.mark.asyncio
 class TestTasksUpdate:
 
@@ -439,6 +652,8 @@ class TestTasksErrors:
 
         from app.services import tasks_service
 
+        monkeypatch.setattr(tasks_service, "TASK_SINGLE_STATEMENT_WRITES", False)
+
         with pytest.raises(HTTPException) as exc:
             await tasks_service.delete_task_from_user(
                 user.id, task.id, db=test_db, current_user=user
@@ -457,3 +672,898 @@ class TestTasksErrors:
         resp = await test_client.delete(f"/{user.id}/tasks/999")
         assert resp.status_code == 404
         assert resp.json()["detail"] == "Task is not found"
+
+
+# ------------------------------------------------------
+# SINGLE-STATEMENT WRITES
+# ------------------------------------------------------
+
+
+@pytest.mark.asyncio
+class TestTasksSingleStatement:
+
+    async def test_update_is_one_statement(self, test_client, seed_tasks, query_plans):
+        seed = await seed_tasks()
+        owner, task = seed.user, seed.task
+        query_plans.statements.clear()
+
+        resp = await test_client.put(
+            f"/{owner.id}/tasks/{task.id}", json={"is_completed": True}
+        )
+
+        assert resp.status_code == 200
+        assert resp.json()["status"] == TaskEnum.DONE
+        assert resp.json()["title"] == task.title
+        # the collection version bump, then the task write stamped with it
+        version_bump, task_write = [stmt for stmt, _ in query_plans.statements]
+        assert version_bump.startswith('UPDATE "Users" SET tasks_version')
+        assert task_write.startswith('UPDATE "Tasks"')
+
+    async def test_update_recomputes_expired_status(self, test_client, seed_tasks):
+        seed = await seed_tasks(is_completed=True)
+        owner, task = seed.user, seed.task
+
+        past = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+        resp = await test_client.put(
+            f"/{owner.id}/tasks/{task.id}",
+            json={"is_completed": False, "deadline": past},
+        )
+
+        assert resp.status_code == 200
+        assert resp.json()["status"] == TaskEnum.EXPIRED
+
+    async def test_update_without_returning_support(
+        self, test_client, test_db, seed_tasks, monkeypatch
+    ):
+        seed = await seed_tasks()
+        owner, task = seed.user, seed.task
+        monkeypatch.setattr(test_db.get_bind().dialect, "update_returning", False)
+
+        resp = await test_client.put(
+            f"/{owner.id}/tasks/{task.id}", json={"title": "No returning"}
+        )
+
+        assert resp.status_code == 200
+        assert resp.json()["title"] == "No returning"
+        assert resp.json()["status"] == TaskEnum.IN_PROGRESS
+
+    async def test_delete_is_one_statement(
+        self, test_client, test_db, seed_tasks, query_plans
+    ):
+        seed = await seed_tasks()
+        owner, task = seed.user, seed.task
+        query_plans.statements.clear()
+
+        resp = await test_client.delete(f"/{owner.id}/tasks/{task.id}")
+
+        assert resp.status_code == 204
+        # the plan guard records no INSERT, so the tombstone is checked below
+        version_bump, task_write = [stmt for stmt, _ in query_plans.statements]
+        assert version_bump.startswith('UPDATE "Users" SET tasks_version')
+        assert task_write.startswith('DELETE FROM "Tasks"')
+        assert await test_db.get(Task, task.id) is None
+
+        tombstone = await test_db.scalar(select(TaskTombstone))
+        assert (tombstone.task_id, tombstone.user_id) == (task.id, owner.id)
+
+    async def test_foreign_task_keeps_403(self, test_client, seed_tasks):
+        seed = await seed_tasks()
+        other, task = seed.other, seed.task
+        test_client.set_current_user(other)
+
+        resp = await test_client.put(
+            f"/{other.id}/tasks/{task.id}", json={"title": "Hack"}
+        )
+        assert resp.status_code == 403
+        assert resp.json()["detail"] == "You are not admin"
+
+        resp = await test_client.delete(f"/{other.id}/tasks/{task.id}")
+        assert resp.status_code == 403
+        assert resp.json()["detail"] == "Not enough permissions"
+
+    async def test_other_users_path_keeps_403(self, test_client, test_db, seed_tasks):
+        seed = await seed_tasks()
+        owner, other, task = seed.user, seed.other, seed.task
+        test_client.set_current_user(other)
+
+        resp = await test_client.put(
+            f"/{owner.id}/tasks/{task.id}", json={"title": "Hack"}
+        )
+        assert resp.status_code == 403
+        assert resp.json()["detail"] == "Not enough permissions"
+
+        await test_db.refresh(task)
+        assert task.title != "Hack"
+
+    async def test_missing_user_keeps_404(self, test_client, test_db, user_factory):
+        admin = user_factory(role="admin")
+        test_db.add(admin)
+        await test_db.commit()
+        test_client.set_current_user(admin)
+
+        resp = await test_client.delete("/9999/tasks/1")
+        assert resp.status_code == 404
+        assert resp.json()["detail"] == "User is not found"
+
+    async def test_legacy_update_path(self, test_client, seed_tasks, monkeypatch):
+        from app.services import tasks_service
+
+        monkeypatch.setattr(tasks_service, "TASK_SINGLE_STATEMENT_WRITES", False)
+        seed = await seed_tasks()
+        owner, task = seed.user, seed.task
+
+        resp = await test_client.put(
+            f"/{owner.id}/tasks/{task.id}",
+            json={"title": "Legacy", "is_completed": True},
+        )
+        assert resp.status_code == 200
+        assert resp.json()["title"] == "Legacy"
+        assert resp.json()["status"] == TaskEnum.DONE
+
+
+# ------------------------------------------------------
+# BULK
+# ------------------------------------------------------
+
+
+@pytest.mark.asyncio
+class TestTasksBulk:
+
+    def _create(self, title):
+        deadline = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+        return {"title": title, "description": "bulk", "deadline": deadline}
+
+    async def test_bulk_mixed_batch(
+        self, test_client, test_db, seed_tasks, query_plans
+    ):
+        seed = await seed_tasks(2, title="Mine {}", foreign=True)
+        owner, mine = seed.user, seed.tasks
+        query_plans.statements.clear()
+
+        resp = await test_client.post(
+            f"/{owner.id}/tasks/bulk",
+            json={
+                "create": [self._create(f"New {i}") for i in range(10)],
+                "update": [{"id": mine[0].id, "is_completed": True}],
+                "delete": [mine[1].id],
+            },
+        )
+
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["applied"] is True
+        assert [r["op"] for r in data["results"]] == ["create"] * 10 + [
+            "update",
+            "delete",
+        ]
+        assert data["results"][0]["task"]["title"] == "New 0"
+        assert data["results"][10]["task"]["status"] == TaskEnum.DONE
+        assert data["results"][11]["status_code"] == 204
+
+        # statement count does not grow with the batch size
+        assert len(query_plans.statements) <= 5
+
+        res = await test_db.execute(select(Task).where(Task.user_id == owner.id))
+        titles = {task.title for task in res.scalars()}
+        assert "Mine 1" not in titles
+        assert len(titles) == 11
+
+    async def test_bulk_update_writes_only_given_fields(
+        self, test_client, seed_tasks, query_plans
+    ):
+        seed = await seed_tasks(2, title="Mine {}", foreign=True)
+        owner, mine = seed.user, seed.tasks
+        query_plans.statements.clear()
+
+        resp = await test_client.post(
+            f"/{owner.id}/tasks/bulk",
+            json={
+                "update": [
+                    {"id": mine[0].id, "title": "Renamed"},
+                    {"id": mine[1].id, "is_completed": True},
+                ]
+            },
+        )
+
+        assert resp.status_code == 200
+        first, second = (r["task"] for r in resp.json()["results"])
+        assert (first["title"], first["is_completed"]) == ("Renamed", False)
+        assert (second["title"], second["is_completed"]) == ("Mine 1", True)
+        assert second["status"] == TaskEnum.DONE
+        # both items share one UPDATE statement
+        statements = [statement for statement, _ in query_plans.statements]
+        assert sum(s.startswith('UPDATE "Tasks"') for s in statements) == 1
+
+    async def test_bulk_atomic_rejects_whole_batch(
+        self, test_client, test_db, seed_tasks
+    ):
+        seed = await seed_tasks(2, title="Mine {}", foreign=True)
+        owner, foreign = seed.user, seed.foreign
+
+        resp = await test_client.post(
+            f"/{owner.id}/tasks/bulk",
+            json={
+                "create": [self._create("Never")],
+                "update": [{"id": foreign.id, "title": "Hack"}],
+                "delete": [99999],
+            },
+        )
+
+        assert resp.status_code == 422
+        data = resp.json()
+        assert data["applied"] is False
+        assert [(r["op"], r["status_code"]) for r in data["results"]] == [
+            ("update", 403),
+            ("delete", 404),
+        ]
+
+        res = await test_db.execute(select(Task).where(Task.title == "Never"))
+        assert res.scalar_one_or_none() is None
+
+    async def test_bulk_best_effort(self, test_client, test_db, seed_tasks):
+        seed = await seed_tasks(2, title="Mine {}", foreign=True)
+        owner, foreign = seed.user, seed.foreign
+
+        resp = await test_client.post(
+            f"/{owner.id}/tasks/bulk",
+            json={
+                "create": [self._create("Kept"), {"title": "No deadline"}],
+                "delete": [foreign.id],
+                "atomic": False,
+            },
+        )
+
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["applied"] is True
+        assert [(r["op"], r["status_code"]) for r in data["results"]] == [
+            ("create", 200),
+            ("create", 422),
+            ("delete", 403),
+        ]
+
+        await test_db.refresh(foreign)
+        assert foreign.title == "Foreign"
+
+    async def test_bulk_other_user_forbidden(self, test_client, seed_tasks):
+        foreign = (await seed_tasks(2, title="Mine {}", foreign=True)).foreign
+
+        resp = await test_client.post(
+            f"/{foreign.user_id}/tasks/bulk", json={"delete": [foreign.id]}
+        )
+        assert resp.status_code == 403
+
+
+# ------------------------------------------------------
+# CONDITIONAL REQUESTS
+# ------------------------------------------------------
+
+
+@pytest.mark.asyncio
+class TestTasksConditional:
+
+    async def test_list_not_modified(self, test_client, seed_tasks, query_budget):
+        user = (await seed_tasks()).user
+        url = f"/{user.id}/tasks/"
+
+        resp = await test_client.get(url)
+        etag = resp.headers["ETag"]
+        assert etag.startswith('W/"')
+
+        # answered from the version marker alone
+        with query_budget(1):
+            resp = await test_client.get(url, headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.headers["ETag"] == etag
+        assert resp.content == b""
+
+    async def test_list_etag_differs_per_query(self, test_client, seed_tasks):
+        user = (await seed_tasks()).user
+        url = f"/{user.id}/tasks/"
+
+        first = (await test_client.get(url)).headers["ETag"]
+        other = (await test_client.get(url, params={"limit": 5})).headers["ETag"]
+        assert first != other
+
+        resp = await test_client.get(
+            url, params={"limit": 5}, headers={"If-None-Match": first}
+        )
+        assert resp.status_code == 200
+
+    async def test_writes_change_list_etag(self, test_client, seed_tasks):
+        seed = await seed_tasks()
+        user, task = seed.user, seed.task
+        url = f"/{user.id}/tasks/"
+        deadline = (datetime.now(timezone.utc) + timedelta(days=2)).isoformat()
+
+        writes = [
+            lambda: test_client.post(
+                url, json={"title": "New", "description": "d", "deadline": deadline}
+            ),
+            lambda: test_client.put(f"{url}{task.id}", json={"title": "Renamed"}),
+            lambda: test_client.post(f"{url}bulk", json={"delete": [task.id]}),
+        ]
+        for write in writes:
+            etag = (await test_client.get(url)).headers["ETag"]
+            assert (await write()).status_code < 300
+
+            resp = await test_client.get(url, headers={"If-None-Match": etag})
+            assert resp.status_code == 200
+            assert resp.headers["ETag"] != etag
+
+    async def test_delete_changes_list_etag(self, test_client, seed_tasks):
+        seed = await seed_tasks()
+        user, task = seed.user, seed.task
+        url = f"/{user.id}/tasks/"
+        etag = (await test_client.get(url)).headers["ETag"]
+
+        await test_client.delete(f"{url}{task.id}")
+
+        resp = await test_client.get(url, headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+
+    async def test_single_task_not_modified(self, test_client, seed_tasks):
+        seed = await seed_tasks()
+        user, task = seed.user, seed.task
+        url = f"/{user.id}/tasks/{task.id}"
+
+        resp = await test_client.get(url)
+        etag = resp.headers["ETag"]
+        assert not etag.startswith("W/")
+
+        resp = await test_client.get(url, headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+
+    async def test_put_if_match(self, test_client, seed_tasks):
+        seed = await seed_tasks()
+        user, task = seed.user, seed.task
+        url = f"/{user.id}/tasks/{task.id}"
+        etag = (await test_client.get(url)).headers["ETag"]
+
+        resp = await test_client.put(
+            url, json={"title": "First"}, headers={"If-Match": etag}
+        )
+        assert resp.status_code == 200
+        assert resp.headers["ETag"] != etag
+
+        # a second writer still holding the old ETag loses
+        resp = await test_client.put(
+            url, json={"title": "Second"}, headers={"If-Match": etag}
+        )
+        assert resp.status_code == 412
+
+        resp = await test_client.get(url)
+        assert resp.json()["title"] == "First"
+
+    async def test_put_if_match_rejects_weak_etag(self, test_client, seed_tasks):
+        seed = await seed_tasks()
+        user, task = seed.user, seed.task
+        url = f"/{user.id}/tasks/{task.id}"
+        etag = (await test_client.get(url)).headers["ETag"]
+
+        resp = await test_client.put(
+            url, json={"title": "X"}, headers={"If-Match": f"W/{etag}"}
+        )
+        assert resp.status_code == 412
+
+
+# ------------------------------------------------------
+# OPTIMISTIC CONCURRENCY
+# ------------------------------------------------------
+
+
+@pytest.mark.asyncio
+class TestTasksVersioning:
+
+    async def test_update_bumps_version_and_etag(self, test_client, seed_tasks):
+        seed = await seed_tasks()
+        user, task = seed.user, seed.task
+        url = f"/{user.id}/tasks/{task.id}"
+
+        resp = await test_client.get(url)
+        assert resp.json()["version"] == 1
+        assert resp.headers["ETag"] == '"1"'
+
+        resp = await test_client.put(url, json={"title": "Renamed"})
+        assert resp.json()["version"] == 2
+        assert resp.headers["ETag"] == '"2"'
+
+    async def test_stale_body_version_conflicts(self, test_client, seed_tasks):
+        seed = await seed_tasks()
+        user, task = seed.user, seed.task
+        url = f"/{user.id}/tasks/{task.id}"
+
+        resp = await test_client.put(url, json={"title": "First", "version": 1})
+        assert resp.status_code == 200
+
+        # the second device still holds version 1
+        resp = await test_client.put(url, json={"title": "Second", "version": 1})
+        assert resp.status_code == 409
+        assert resp.json()["detail"] == "Task has been modified by another request"
+
+        resp = await test_client.get(url)
+        assert resp.json()["title"] == "First"
+        assert resp.json()["version"] == 2
+
+    async def test_versioned_update_needs_no_extra_read(
+        self, test_client, seed_tasks, query_budget
+    ):
+        seed = await seed_tasks()
+        user, task = seed.user, seed.task
+        url = f"/{user.id}/tasks/{task.id}"
+
+        # the UPDATE and the collection version bump, nothing else
+        with query_budget(2):
+            resp = await test_client.put(
+                url, json={"title": "X"}, headers={"If-Match": '"1"'}
+            )
+        assert resp.status_code == 200
+
+        with query_budget(2):
+            resp = await test_client.put(url, json={"title": "Y", "version": 2})
+        assert resp.status_code == 200
+
+    async def test_version_mismatch_on_foreign_task_is_forbidden(
+        self, test_client, seed_tasks
+    ):
+        seed = await seed_tasks(foreign=True)
+        user, foreign = seed.user, seed.foreign
+
+        resp = await test_client.put(
+            f"/{user.id}/tasks/{foreign.id}", json={"title": "X", "version": 7}
+        )
+        assert resp.status_code == 403
+
+    async def test_legacy_path_checks_version(
+        self, test_client, seed_tasks, monkeypatch
+    ):
+        monkeypatch.setattr(tasks_service, "TASK_SINGLE_STATEMENT_WRITES", False)
+        seed = await seed_tasks()
+        user, task = seed.user, seed.task
+        url = f"/{user.id}/tasks/{task.id}"
+
+        resp = await test_client.put(url, json={"is_completed": True, "version": 1})
+        assert resp.status_code == 200
+        assert resp.json()["version"] == 2
+
+        resp = await test_client.put(url, json={"is_completed": True, "version": 1})
+        assert resp.status_code == 409
+
+        resp = await test_client.put(
+            url, json={"is_completed": True}, headers={"If-Match": '"1"'}
+        )
+        assert resp.status_code == 412
+
+    async def test_bulk_update_checks_version(self, test_client, seed_tasks):
+        seed = await seed_tasks()
+        user, task = seed.user, seed.task
+        url = f"/{user.id}/tasks/bulk"
+
+        resp = await test_client.post(
+            url, json={"update": [{"id": task.id, "title": "A", "version": 1}]}
+        )
+        result = resp.json()["results"][0]
+        assert result["status_code"] == 200
+        assert result["task"]["version"] == 2
+
+        resp = await test_client.post(
+            url, json={"update": [{"id": task.id, "title": "B", "version": 1}]}
+        )
+        result = resp.json()["results"][0]
+        assert result["status_code"] == 409
+        assert result["id"] == task.id
+
+    @pytest.fixture
+    def racing_write(self, monkeypatch):
+        bump_tasks_version = tasks_service.bump_tasks_version
+
+        def arm(task_id: int):
+            async def concurrent_write(db, *user_ids):
+                # another writer commits between the batch's read and its UPDATE
+                await db.execute(
+                    update(Task)
+                    .where(Task.id == task_id)
+                    .values(version=Task.version + 1)
+                )
+                await bump_tasks_version(db, *user_ids)
+
+            monkeypatch.setattr(tasks_service, "bump_tasks_version", concurrent_write)
+
+        return arm
+
+    @pytest.mark.parametrize("atomic", [False, True])
+    async def test_bulk_update_loses_race(
+        self, test_client, test_db, seed_tasks, racing_write, atomic
+    ):
+        seed = await seed_tasks()
+        user, task_id = seed.user, seed.task.id
+        racing_write(task_id)
+
+        resp = await test_client.post(
+            f"/{user.id}/tasks/bulk",
+            json={
+                "update": [{"id": task_id, "title": "Late", "version": 1}],
+                "atomic": atomic,
+            },
+        )
+
+        assert resp.status_code == (422 if atomic else 200)
+        assert resp.json()["applied"] is not atomic
+        result = resp.json()["results"][0]
+        assert result["status_code"] == 409
+        assert result["id"] == task_id
+        title = await test_db.scalar(select(Task.title).where(Task.id == task_id))
+        assert title != "Late"
+
+    async def test_unconditional_bulk_update_ignores_race(
+        self, test_client, seed_tasks, racing_write
+    ):
+        seed = await seed_tasks()
+        user, task_id = seed.user, seed.task.id
+        racing_write(task_id)
+
+        resp = await test_client.post(
+            f"/{user.id}/tasks/bulk",
+            json={"update": [{"id": task_id, "title": "Late"}]},
+        )
+
+        assert resp.status_code == 200
+        result = resp.json()["results"][0]
+        assert result["status_code"] == 200
+        assert result["task"]["title"] == "Late"
+        assert result["task"]["version"] == 3
+
+
+# ------------------------------------------------------
+# DELTA SYNC
+# ------------------------------------------------------
+
+
+@pytest.mark.asyncio
+class TestTasksChanges:
+
+    async def test_initial_sync_returns_everything(self, test_client, seed_tasks):
+        seed = await seed_tasks(3)
+        user, tasks = seed.user, seed.tasks
+
+        resp = await test_client.get(f"/{user.id}/tasks/changes")
+
+        assert resp.status_code == 200
+        data = resp.json()
+        assert sorted(t["id"] for t in data["changed"]) == [t.id for t in tasks]
+        assert data["deleted"] == []
+        assert data["cursor"]
+
+    async def test_changes_since_cursor(self, test_client, seed_tasks):
+        seed = await seed_tasks(3)
+        user, (kept, renamed, removed) = seed.user, seed.tasks
+        url = f"/{user.id}/tasks/"
+        cursor = (await test_client.get(f"{url}changes")).json()["cursor"]
+        deadline = (datetime.now(timezone.utc) + timedelta(days=2)).isoformat()
+
+        created = await test_client.post(
+            url, json={"title": "New", "description": "d", "deadline": deadline}
+        )
+        await test_client.put(f"{url}{renamed.id}", json={"title": "Renamed"})
+        await test_client.delete(f"{url}{removed.id}")
+
+        resp = await test_client.get(f"{url}changes", params={"since": cursor})
+
+        data = resp.json()
+        # in write order
+        assert [t["id"] for t in data["changed"]] == [
+            created.json()["id"],
+            renamed.id,
+        ]
+        assert data["changed"][1]["title"] == "Renamed"
+        assert data["deleted"] == [removed.id]
+        assert kept.id not in {t["id"] for t in data["changed"]}
+
+        # the new cursor picks up from here
+        resp = await test_client.get(f"{url}changes", params={"since": data["cursor"]})
+        assert resp.json() == {
+            "changed": [],
+            "deleted": [],
+            "cursor": data["cursor"],
+        }
+
+    async def test_unchanged_cursor_reads_only_version(
+        self, test_client, seed_tasks, query_budget
+    ):
+        user = (await seed_tasks(3)).user
+        url = f"/{user.id}/tasks/changes"
+        cursor = (await test_client.get(url)).json()["cursor"]
+
+        with query_budget(1):
+            resp = await test_client.get(url, params={"since": cursor})
+        assert resp.json()["changed"] == []
+
+    async def test_bulk_and_legacy_writes_are_tracked(
+        self, test_client, seed_tasks, monkeypatch
+    ):
+        seed = await seed_tasks(3)
+        user, (first, second, third) = seed.user, seed.tasks
+        url = f"/{user.id}/tasks/"
+        cursor = (await test_client.get(f"{url}changes")).json()["cursor"]
+
+        await test_client.post(
+            f"{url}bulk",
+            json={"update": [{"id": first.id, "title": "Bulk"}], "delete": [second.id]},
+        )
+        monkeypatch.setattr(tasks_service, "TASK_SINGLE_STATEMENT_WRITES", False)
+        await test_client.delete(f"{url}{third.id}")
+
+        data = (await test_client.get(f"{url}changes", params={"since": cursor})).json()
+        assert [t["id"] for t in data["changed"]] == [first.id]
+        assert sorted(data["deleted"]) == [second.id, third.id]
+
+    async def test_invalid_cursor(self, test_client, seed_tasks):
+        user = (await seed_tasks(3)).user
+
+        resp = await test_client.get(
+            f"/{user.id}/tasks/changes", params={"since": "not-a-cursor"}
+        )
+        assert resp.status_code == 400
+
+    async def test_other_user_forbidden(self, test_client, seed_tasks):
+        seed = await seed_tasks(3)
+        user, other = seed.user, seed.other
+        test_client.set_current_user(other)
+
+        resp = await test_client.get(f"/{user.id}/tasks/changes")
+        assert resp.status_code == 403
+
+
+# ------------------------------------------------------
+# EXPORT
+# ------------------------------------------------------
+
+
+@pytest.mark.asyncio
+class TestTasksExport:
+
+    async def test_ndjson(self, test_client, seed_tasks, monkeypatch):
+        monkeypatch.setattr(tasks_service, "TASK_EXPORT_BATCH_SIZE", 2)
+        user = (await seed_tasks(5, title="Mine {}", foreign=True)).user
+
+        resp = await test_client.get(f"/{user.id}/tasks/export")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/x-ndjson"
+        assert "tasks-" in resp.headers["content-disposition"]
+
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        assert [task["title"] for task in lines] == [f"Mine {i}" for i in range(5)]
+        assert all(task["user_id"] == user.id for task in lines)
+
+    async def test_json_array(self, test_client, seed_tasks, monkeypatch):
+        monkeypatch.setattr(tasks_service, "TASK_EXPORT_BATCH_SIZE", 2)
+        user = (await seed_tasks(5, title="Mine {}", foreign=True)).user
+
+        resp = await test_client.get(
+            f"/{user.id}/tasks/export", params={"format": "json"}
+        )
+        assert resp.status_code == 200
+        assert len(resp.json()) == 5
+
+    async def test_empty_json_array(self, test_client, seed_tasks):
+        user = (await seed_tasks(0)).user
+
+        resp = await test_client.get(
+            f"/{user.id}/tasks/export", params={"format": "json"}
+        )
+        assert resp.json() == []
+
+    async def test_admin_exports_all_users(self, test_client, seed_tasks):
+        admin = (await seed_tasks(5, title="Mine {}", foreign=True, role="admin")).user
+
+        resp = await test_client.get(
+            f"/{admin.id}/tasks/export", params={"all_users": True}
+        )
+        assert len(resp.text.splitlines()) == 6
+
+    async def test_all_users_requires_admin(self, test_client, seed_tasks):
+        user = (await seed_tasks(5, title="Mine {}", foreign=True)).user
+
+        resp = await test_client.get(
+            f"/{user.id}/tasks/export", params={"all_users": True}
+        )
+        assert resp.status_code == 403
+
+    async def test_other_user_forbidden(self, test_client, seed_tasks):
+        other = (await seed_tasks(5, title="Mine {}", foreign=True)).other
+
+        resp = await test_client.get(f"/{other.id}/tasks/export")
+        assert resp.status_code == 403
+
+
+# ------------------------------------------------------
+# QUERY BUDGETS
+# ------------------------------------------------------
+
+
+@pytest.mark.asyncio
+class TestTasksQueryBudget:
+
+    async def test_list(self, test_client, seed_tasks, query_budget):
+        user = (await seed_tasks(20)).user
+
+        with query_budget(2):
+            resp = await test_client.get(f"/{user.id}/tasks/")
+        assert len(resp.json()) == 20
+
+    async def test_list_other_user_as_admin(
+        self, test_client, test_db, seed_tasks, user_factory, query_budget
+    ):
+        user = (await seed_tasks(5)).user
+        admin = user_factory(role="admin")
+        test_db.add(admin)
+        await test_db.commit()
+        test_client.set_current_user(admin)
+
+        with query_budget(2):
+            resp = await test_client.get(f"/{user.id}/tasks/")
+        assert resp.status_code == 200
+
+    async def test_get_one(self, test_client, seed_tasks, query_budget):
+        seed = await seed_tasks(5)
+        user, task = seed.user, seed.task
+
+        with query_budget(1):
+            resp = await test_client.get(f"/{user.id}/tasks/{task.id}")
+        assert resp.status_code == 200
+
+    async def test_update(self, test_client, seed_tasks, query_budget):
+        seed = await seed_tasks(5)
+        user, task = seed.user, seed.task
+
+        with query_budget(2):
+            resp = await test_client.put(
+                f"/{user.id}/tasks/{task.id}", json={"title": "Renamed"}
+            )
+        assert resp.status_code == 200
+
+    async def test_delete(self, test_client, seed_tasks, query_budget):
+        seed = await seed_tasks(5)
+        user, task = seed.user, seed.task
+
+        # DELETE, its tombstone and the tasks_version bump
+        with query_budget(3):
+            resp = await test_client.delete(f"/{user.id}/tasks/{task.id}")
+        assert resp.status_code == 204
+
+    async def test_bulk_update_does_not_scale_with_items(
+        self, test_client, test_db, seed_tasks, query_budget
+    ):
+        user = (await seed_tasks(10)).user
+        res = await test_db.execute(select(Task.id).where(Task.user_id == user.id))
+        ids = res.scalars().all()
+
+        with query_budget(4) as stats:
+            resp = await test_client.post(
+                f"/{user.id}/tasks/bulk",
+                json={"update": [{"id": i, "title": "Bulk"} for i in ids]},
+            )
+        assert resp.status_code == 200
+        assert not stats.repeated(3)
+
+    async def test_bulk_create_does_not_scale_with_items(
+        self, test_client, seed_tasks, query_budget
+    ):
+        user = (await seed_tasks(1)).user
+        deadline = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+        items = [
+            {"title": f"T{i}", "description": "bulk", "deadline": deadline}
+            for i in range(10)
+        ]
+
+        # the bump, one INSERT for every item and the re-select
+        with query_budget(4):
+            resp = await test_client.post(
+                f"/{user.id}/tasks/bulk", json={"create": items}
+            )
+        assert resp.status_code == 200
+        titles = [r["task"]["title"] for r in resp.json()["results"]]
+        assert titles == [item["title"] for item in items]
+
+
+# ------------------------------------------------------
+# COALESCING
+# ------------------------------------------------------
+
+
+@pytest.mark.asyncio
+class TestTasksCoalescing:
+
+    @pytest.fixture
+    def flights(self, monkeypatch):
+        flights = SingleFlight()
+        monkeypatch.setattr(tasks_service, "task_list_flights", flights)
+
+        # hold the leader's query so the other reads arrive while it runs
+        read_task_page = tasks_service.read_task_page
+
+        async def slow_read_task_page(*args):
+            await asyncio.sleep(0.02)
+            return await read_task_page(*args)
+
+        monkeypatch.setattr(tasks_service, "read_task_page", slow_read_task_page)
+        return flights
+
+    @pytest.fixture
+    async def sessions(self, tmp_path):
+        # concurrent sessions need their own connections, not the shared one
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/tasks.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        await engine.dispose()
+
+    async def _read(self, sessions, user, *params):
+        async with sessions() as first, sessions() as second:
+            return await asyncio.gather(
+                tasks_service.get_tasks_from_user(user.id, first, user, params[0]),
+                tasks_service.get_tasks_from_user(user.id, second, user, params[1]),
+            )
+
+    async def test_identical_reads_share_one_body(self, sessions, seed_tasks, flights):
+        async with sessions() as db:
+            user = (await seed_tasks(3, db=db)).user
+        params = TaskListParamsSchema(limit=2)
+
+        first, second = await self._read(sessions, user, params, params)
+
+        assert first.body is second.body
+        assert len(json.loads(first.body)) == 2
+        assert first.headers["X-Next-Cursor"] == second.headers["X-Next-Cursor"]
+        assert flights.stats() == {"inflight": 0, "leaders": 1, "coalesced": 1}
+
+    async def test_different_filters_run_separately(
+        self, sessions, seed_tasks, flights
+    ):
+        async with sessions() as db:
+            user = (await seed_tasks(3, db=db)).user
+
+        first, second = await self._read(
+            sessions,
+            user,
+            TaskListParamsSchema(limit=2),
+            TaskListParamsSchema(limit=3),
+        )
+
+        assert len(json.loads(first.body)) == 2
+        assert len(json.loads(second.body)) == 3
+        assert flights.stats()["coalesced"] == 0
+
+
+# ------------------------------------------------------
+# RATE LIMITS
+# ------------------------------------------------------
+
+
+@pytest.mark.asyncio
+class TestTasksRateLimit:
+
+    async def test_per_user_budget_before_any_query(
+        self, test_client, test_db, user_factory, monkeypatch, query_budget
+    ):
+        user = user_factory(email="busy@example.com")
+        test_db.add(user)
+        await test_db.commit()
+        test_client.set_current_user(user)
+        monkeypatch.setattr(tasks_limit, "per_user", Rate(2, 60))
+
+        headers = {
+            "Authorization": f"Bearer {create_access_token({'sub': user.email})}"
+        }
+        for _ in range(2):
+            resp = await test_client.get(f"/{user.id}/tasks/", headers=headers)
+            assert resp.status_code == 200
+
+        with query_budget(0):
+            resp = await test_client.get(f"/{user.id}/tasks/", headers=headers)
+        assert resp.status_code == 429
+        assert resp.headers["Retry-After"] == "30"
+
+        # other callers have their own bucket
+        resp = await test_client.get(f"/{user.id}/tasks/")
+        assert resp.status_code == 200
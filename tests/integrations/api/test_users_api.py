@@ -60,6 +60,28 @@ class TestUsersCRUD:
         assert data["name"] == "New Name"
         assert data["email"] == "new@example.com"
 
+    async def test_update_user_with_stale_version(
+        self, test_client, test_db, user_factory
+    ):
+        user = user_factory(role="user", name="Old Name")
+        test_db.add(user)
+        await test_db.commit()
+        await test_db.refresh(user)
+
+        test_client.set_current_user(user)
+
+        resp = await test_client.put(
+            f"/users/{user.id}", json={"name": "First", "version": 1}
+        )
+        assert resp.status_code == 200
+        assert resp.json()["version"] == 2
+
+        resp = await test_client.put(
+            f"/users/{user.id}", json={"name": "Second", "version": 1}
+        )
+        assert resp.status_code == 409
+        assert resp.json()["detail"] == "User has been modified by another request"
+
     async def test_delete_user(self, test_client, test_db, user_factory):
         admin = user_factory(role="admin")
         user = user_factory(role="user")
@@ -209,3 +231,105 @@ class TestUsersErrors:
         payload = {"name": "BadEmail", "email": "invalid-email"}
         resp = await test_client.put(f"/users/{user.id}", json=payload)
         assert resp.status_code == 422
+
+
+# ------------------------------------------------------
+# LISTING
+# ------------------------------------------------------
+
+
+@pytest.mark.asyncio
+class TestUsersList:
+
+    async def _seed(self, test_client, test_db, user_factory):
+        admin = user_factory(role="admin", name="Root", email="root@example.com")
+        users = [
+            user_factory(role="user", name="Alice", email="alice@example.com"),
+            user_factory(role="user", name="Albert", email="bert@example.com"),
+            user_factory(role="user", name="Bob", email="bob@example.com"),
+            user_factory(
+                role="user", name="Carol", email="carol@example.com", is_active=False
+            ),
+        ]
+        test_db.add_all([admin, *users])
+        await test_db.commit()
+        test_client.set_current_user(admin)
+        return admin
+
+    async def test_keyset_pages(self, test_client, test_db, user_factory):
+        await self._seed(test_client, test_db, user_factory)
+
+        seen = []
+        params = {"limit": 2}
+        while True:
+            resp = await test_client.get("/users/", params=params)
+            assert resp.status_code == 200
+            seen += [user["id"] for user in resp.json()]
+            if "X-Next-Cursor" not in resp.headers:
+                break
+            params["cursor"] = resp.headers["X-Next-Cursor"]
+
+        assert len(seen) == 5
+        assert seen == sorted(seen)
+
+    async def test_prefix_search_on_name_and_email(
+        self, test_client, test_db, user_factory
+    ):
+        await self._seed(test_client, test_db, user_factory)
+
+        resp = await test_client.get("/users/", params={"q": "Al"})
+        assert {user["name"] for user in resp.json()} == {"Alice", "Albert"}
+
+        resp = await test_client.get("/users/", params={"q": "bo"})
+        assert [user["name"] for user in resp.json()] == ["Bob"]
+
+    async def test_prefix_search_pages(self, test_client, test_db, user_factory):
+        await self._seed(test_client, test_db, user_factory)
+
+        # "b" matches Bob by name and Albert by email, once each
+        params = {"q": "b", "limit": 1}
+        names = []
+        while True:
+            resp = await test_client.get("/users/", params=params)
+            names += [user["name"] for user in resp.json()]
+            if "X-Next-Cursor" not in resp.headers:
+                break
+            params["cursor"] = resp.headers["X-Next-Cursor"]
+
+        assert names == ["Albert", "Bob"]
+
+    async def test_prefix_search_escapes_wildcards(
+        self, test_client, test_db, user_factory
+    ):
+        await self._seed(test_client, test_db, user_factory)
+
+        for q in ("%", "_lice", "A%t"):
+            resp = await test_client.get("/users/", params={"q": q})
+            assert resp.json() == {"message": "User list is empty"}
+
+        resp = await test_client.get("/users/", params={"q": "al"})
+        assert {user["name"] for user in resp.json()} == {"Alice", "Albert"}
+
+    async def test_filters(self, test_client, test_db, user_factory):
+        await self._seed(test_client, test_db, user_factory)
+
+        resp = await test_client.get("/users/", params={"is_active": False})
+        assert [user["name"] for user in resp.json()] == ["Carol"]
+
+        resp = await test_client.get("/users/", params={"role": "admin"})
+        assert [user["name"] for user in resp.json()] == ["Root"]
+
+    async def test_total_estimate(self, test_client, test_db, user_factory):
+        await self._seed(test_client, test_db, user_factory)
+
+        resp = await test_client.get("/users/", params={"with_total": True})
+        assert int(resp.headers["X-Total-Estimate"]) >= 5
+
+        resp = await test_client.get("/users/")
+        assert "X-Total-Estimate" not in resp.headers
+
+    async def test_invalid_cursor(self, test_client, test_db, user_factory):
+        await self._seed(test_client, test_db, user_factory)
+
+        resp = await test_client.get("/users/", params={"cursor": "%%%"})
+        assert resp.status_code == 400
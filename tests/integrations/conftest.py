@@ -1,10 +1,15 @@
+from contextlib import contextmanager
+
 import pytest
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.api.auth.auth import get_current_user
+from app.core import ratelimit
 from app.core.database import Base
+from app.core.metrics import RequestStats
 from app.models.users import User
 from main import app
 
@@ -111,6 +116,113 @@ async def clean_db(test_db):
     await test_db.commit()
 
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    ratelimit.store.clear()
+
+
+# ---------------------------
+# QUERY PLAN GUARD
+# ---------------------------
+
+
+class QueryPlanGuard:
+    """Records statements sent to the engine and EXPLAINs them afterwards."""
+
+    tables = ("Tasks", "Users")
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+        self.allowed = set()
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            # one parameter set stands for an executemany
+            self.statements.append(
+                (statement, parameters[0] if executemany else parameters)
+            )
+
+    def allow_scan(self, table: str):
+        self.allowed.add(table)
+
+    async def explain(self, conn, statement, parameters):
+        if conn.dialect.name == "sqlite":
+            res = await conn.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            )
+            details = [row[-1] for row in res]
+            # full index scans too: "SCAN Tasks USING [COVERING] INDEX ..."
+            return [
+                table
+                for table in self.tables
+                for detail in details
+                if detail == f"SCAN {table}" or detail.startswith(f"SCAN {table} ")
+            ]
+
+        res = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        return [
+            row.table
+            for row in res
+            if row.table in self.tables and row.type in ("ALL", "index")
+        ]
+
+    async def full_scans(self):
+        event.remove(self.engine.sync_engine, "before_cursor_execute", self.record)
+
+        scans = []
+        async with self.engine.connect() as conn:
+            for statement, parameters in self.statements:
+                for table in await self.explain(conn, statement, parameters):
+                    if table not in self.allowed:
+                        scans.append((table, statement))
+        return scans
+
+    async def assert_no_full_scans(self):
+        scans = await self.full_scans()
+        assert not scans, "Full table scans:\n" + "\n".join(
+            f"{table}: {statement}" for table, statement in scans
+        )
+
+
+@pytest.fixture
+def query_plans(async_engine):
+    guard = QueryPlanGuard(async_engine)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", guard.record)
+    yield guard
+    if event.contains(async_engine.sync_engine, "before_cursor_execute", guard.record):
+        event.remove(async_engine.sync_engine, "before_cursor_execute", guard.record)
+
+
+# ---------------------------
+# QUERY BUDGET
+# ---------------------------
+
+
+@pytest.fixture
+def query_budget(async_engine):
+    """``with query_budget(2): ...`` fails if the block issues more statements."""
+
+    @contextmanager
+    def _budget(max_queries: int):
+        stats = RequestStats()
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            stats.record(statement)
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            yield stats
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+        assert (
+            stats.queries <= max_queries
+        ), f"{stats.queries} queries, budget {max_queries}:\n{stats.report()}"
+
+    return _budget
+
+
 # ---------------------------
 # CLIENT FIXTURE
 # ---------------------------
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from app.core.broker import SocketBroker
+
+
+@pytest.fixture
+async def socket_brokers(tmp_path):
+    brokers = []
+
+    async def _make(count: int):
+        for _ in range(count):
+            broker = SocketBroker(str(tmp_path / "bus.sock"), reconnect_delay=0.02)
+            await broker.start()
+            await asyncio.wait_for(broker.connected.wait(), 2)
+            brokers.append(broker)
+        return brokers
+
+    yield _make
+
+    for broker in brokers:
+        await broker.stop()
+
+
+def collect(broker: SocketBroker, channel: str = "tasks") -> asyncio.Queue:
+    received = asyncio.Queue()
+    broker.subscribe(channel, received.put_nowait)
+    return received
+
+
+@pytest.mark.asyncio
+class TestSocketBroker:
+
+    async def test_messages_reach_other_workers_only(self, socket_brokers):
+        first, second = await socket_brokers(2)
+        first_received, second_received = collect(first), collect(second)
+
+        await first.publish("tasks", {"user_id": 1})
+
+        assert await asyncio.wait_for(second_received.get(), 2) == {"user_id": 1}
+        await asyncio.sleep(0.05)
+        assert first_received.empty()
+
+    async def test_channels_are_separate(self, socket_brokers):
+        first, second = await socket_brokers(2)
+        other = collect(second, "other")
+        tasks = collect(second)
+
+        await first.publish("other", {"n": 1})
+
+        assert await asyncio.wait_for(other.get(), 2) == {"n": 1}
+        assert tasks.empty()
+
+    async def test_relay_fails_over(self, socket_brokers):
+        relay, second, third = await socket_brokers(3)
+        assert relay._relay is not None
+
+        await relay.stop()
+        received = collect(third)
+
+        # the survivors elect a new relay and reconnect to it
+        async def delivered():
+            while received.empty():
+                await second.publish("tasks", {"n": 2})
+                await asyncio.sleep(0.05)
+            return await received.get()
+
+        assert await asyncio.wait_for(delivered(), 5) == {"n": 2}
+        assert (second._relay is None) != (third._relay is None)
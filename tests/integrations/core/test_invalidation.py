@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from app.core.broker import SocketBroker
+from app.core.cache import TTLCache
+from app.core.invalidation import InvalidationBus
+
+
+@pytest.fixture
+async def socket_buses(tmp_path):
+    brokers = []
+
+    async def _make(count: int) -> list[tuple[InvalidationBus, TTLCache]]:
+        buses = []
+        for _ in range(count):
+            broker = SocketBroker(str(tmp_path / "bus.sock"), reconnect_delay=0.02)
+            bus = InvalidationBus(broker)
+            cache = TTLCache(maxsize=10, ttl=60)
+            bus.register("user", cache.invalidate, cache.clear)
+            await broker.start()
+            await asyncio.wait_for(broker.connected.wait(), 2)
+            brokers.append(broker)
+            buses.append((bus, cache))
+        return buses
+
+    yield _make
+
+    for broker in brokers:
+        await broker.stop()
+
+
+async def evicted(cache: TTLCache, key: str):
+    while key in cache._data:
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+class TestInvalidationOverSocket:
+
+    async def test_invalidation_reaches_every_worker(self, socket_buses):
+        (writer, _), *others = await socket_buses(3)
+        for _, cache in others:
+            cache.set("a@example.com", 1)
+            cache.set("b@example.com", 2)
+
+        await writer.invalidate("user", "a@example.com", version=7)
+
+        for bus, cache in others:
+            await asyncio.wait_for(evicted(cache, "a@example.com"), 2)
+            assert cache.get("b@example.com") == 2
+            assert bus.version_of("user", "a@example.com") == 7
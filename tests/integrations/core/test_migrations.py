@@ -0,0 +1,145 @@
+from datetime import datetime
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import inspect, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.api.routers.health import router_health
+from app.core.database import Base, warm_up_pool
+from app.core.migrations import (
+    BASELINE_REVISION,
+    alembic_config,
+    run_migrations,
+    schema_is_current,
+)
+from app.models.tasks import Task
+from app.models.users import User
+from app.schemas.tasks import TaskEnum
+from app.schemas.users import UserRoleEnum
+
+
+@pytest.fixture
+async def file_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'migrate.db'}")
+    yield engine
+    await engine.dispose()
+
+
+def schema_diff(connection):
+    context = MigrationContext.configure(connection)
+    return compare_metadata(context, Base.metadata)
+
+
+def build_legacy_schema(connection):
+    config = alembic_config()
+    config.attributes["connection"] = connection
+    command.upgrade(config, BASELINE_REVISION)
+    connection.execute(text("DROP TABLE alembic_version"))
+
+
+@pytest.mark.asyncio
+class TestMigrations:
+
+    async def test_fresh_database_upgrades_to_head(self, file_engine):
+        assert await run_migrations(file_engine) is True
+
+        async with file_engine.connect() as conn:
+            assert await conn.run_sync(schema_is_current, alembic_config())
+            tables = await conn.run_sync(lambda c: inspect(c).get_table_names())
+        assert {"Users", "Tasks", "alembic_version"} <= set(tables)
+
+    async def test_second_run_is_noop(self, file_engine):
+        await run_migrations(file_engine)
+        assert await run_migrations(file_engine) is False
+
+    async def test_migrated_schema_matches_models(self, file_engine):
+        await run_migrations(file_engine)
+
+        async with file_engine.connect() as conn:
+            assert await conn.run_sync(schema_diff) == []
+
+    async def test_legacy_database_is_migrated_with_its_data(self, file_engine):
+        # the old create_all startup built the 0001 schema and never stamped it
+        async with file_engine.begin() as conn:
+            await conn.run_sync(build_legacy_schema)
+            await conn.execute(
+                text(
+                    "INSERT INTO Users (id, name, email, password, role, is_active) "
+                    "VALUES (1, 'Old', 'old@example.com', 'hash', 'USER', 1)"
+                )
+            )
+            await conn.execute(
+                text(
+                    "INSERT INTO Tasks "
+                    "(id, title, description, status, deadline, is_completed, user_id) "
+                    "VALUES (1, 'Kept', 'd', 'IN_PROGRESS', '2026-01-01', 0, 1)"
+                )
+            )
+
+        assert await run_migrations(file_engine) is True
+
+        async with file_engine.connect() as conn:
+            assert await conn.run_sync(schema_is_current, alembic_config())
+            assert await conn.run_sync(schema_diff) == []
+
+            user = (await conn.execute(select(User))).one()
+            task = (await conn.execute(select(Task))).one()
+        assert (user.name, user.email, user.role) == (
+            "Old",
+            "old@example.com",
+            UserRoleEnum.USER,
+        )
+        assert (user.tasks_version, user.version) == (0, 1)
+        assert (task.title, task.status, task.user_id) == (
+            "Kept",
+            TaskEnum.IN_PROGRESS,
+            1,
+        )
+        assert task.deadline == datetime(2026, 1, 1)
+        assert (task.version, task.sync_version) == (1, 0)
+
+    async def test_create_all_database_is_stamped(self, file_engine):
+        # create_all on the current models: every migration finds its work done
+        async with file_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        assert await run_migrations(file_engine) is True
+
+        async with file_engine.connect() as conn:
+            assert await conn.run_sync(schema_is_current, alembic_config())
+            assert await conn.run_sync(schema_diff) == []
+
+    async def test_warm_up_pool(self, file_engine):
+        await warm_up_pool(file_engine, 3)
+        assert file_engine.pool.checkedin() == 3
+
+
+@pytest.mark.asyncio
+class TestHealth:
+
+    async def _client(self, ready: bool):
+        app = FastAPI()
+        app.include_router(router_health)
+        app.state.ready = ready
+        return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+    async def test_live(self):
+        async with await self._client(ready=False) as client:
+            resp = await client.get("/health/live")
+        assert resp.status_code == 200
+
+    async def test_ready_before_startup(self):
+        async with await self._client(ready=False) as client:
+            resp = await client.get("/health/ready")
+        assert resp.status_code == 503
+
+    async def test_ready_after_startup(self):
+        async with await self._client(ready=True) as client:
+            resp = await client.get("/health/ready")
+        assert resp.status_code == 200
+        assert resp.json() == {"status": "ready"}
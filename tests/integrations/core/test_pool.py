@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool, StaticPool
+
+from app.core.config import Settings
+from app.core.pool import InstrumentedAsyncQueuePool, pool_options, pool_stats
+
+
+class TestPoolOptions:
+
+    def test_in_memory_sqlite_uses_static_pool(self, monkeypatch):
+        monkeypatch.setenv("DB_TYPE", "sqlite+aiosqlite")
+        monkeypatch.setenv("DB_NAME", ":memory:")
+        options = pool_options(Settings(_env_file=".env.example"))
+
+        assert options["poolclass"] is StaticPool
+        assert "pool_size" not in options
+
+    def test_file_sqlite_opens_connection_per_checkout(self, monkeypatch):
+        monkeypatch.setenv("DB_TYPE", "sqlite+aiosqlite")
+        monkeypatch.setenv("DB_NAME", "todo.db")
+        options = pool_options(Settings(_env_file=".env.example"))
+
+        assert options["poolclass"] is NullPool
+
+    def test_mysql_uses_configured_queue_pool(self, monkeypatch):
+        monkeypatch.setenv("DB_TYPE", "mysql+aiomysql")
+        monkeypatch.setenv("DB_POOL_SIZE", "7")
+        monkeypatch.setenv("DB_MAX_OVERFLOW", "3")
+        monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+        options = pool_options(Settings(_env_file=".env.example"))
+
+        assert options["poolclass"] is InstrumentedAsyncQueuePool
+        assert options["pool_size"] == 7
+        assert options["max_overflow"] == 3
+        assert options["pool_pre_ping"] is False
+
+
+@pytest.mark.asyncio
+class TestPoolStats:
+
+    @pytest.fixture
+    async def queued_engine(self, tmp_path):
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.05,
+        )
+        yield engine
+        await engine.dispose()
+
+    async def test_counts_checkouts(self, queued_engine):
+        async with queued_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            stats = pool_stats(queued_engine)
+            assert stats["checked_out"] == 1
+
+        stats = pool_stats(queued_engine)
+        assert stats["checked_out"] == 0
+        assert stats["checked_in"] == 1
+        assert stats["checkouts"] == 1
+        assert stats["capacity"] == 1
+
+    async def test_counts_timeouts(self, queued_engine):
+        async with queued_engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                async with queued_engine.connect():
+                    pass
+
+        stats = pool_stats(queued_engine)
+        assert stats["timeouts"] == 1
+        assert stats["wait_max_ms"] >= 50
+
+    async def test_static_pool_reports_class_only(self):
+        engine = create_async_engine(
+            "sqlite+aiosqlite:///:memory:", poolclass=StaticPool
+        )
+        assert pool_stats(engine) == {"pool": "StaticPool"}
+        await engine.dispose()
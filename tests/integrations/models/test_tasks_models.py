@@ -1,6 +1,8 @@
 from datetime import datetime, timedelta, timezone
 
 import pytest
+from sqlalchemy import update
+from sqlalchemy.orm.exc import StaleDataError
 
 from app.models.tasks import Task
 from app.models.users import User
@@ -74,6 +76,16 @@ class TestTaskModelSuccess:
 
         assert task.deadline is not None
 
+    async def test_version_increments_on_flush(self, test_db):
+        task = Task(title="Versioned")
+        test_db.add(task)
+        await test_db.commit()
+        assert task.version == 1
+
+        task.title = "Renamed"
+        await test_db.commit()
+        assert task.version == 2
+
 
 # ------------------------------------------------------
 # ERRORS
@@ -99,6 +111,24 @@ class TestTaskModelErrors:
 
         assert task.user_id == 9999
 
+    async def test_stale_version_is_rejected(self, test_db):
+        task = Task(title="Versioned")
+        test_db.add(task)
+        await test_db.commit()
+
+        # another writer moves the row on behind this session's back
+        await test_db.execute(
+            update(Task)
+            .where(Task.id == task.id)
+            .values(version=Task.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+        task.title = "Lost update"
+        with pytest.raises(StaleDataError):
+            await test_db.commit()
+        await test_db.rollback()
+
     def test_invalid_status_enum_value(self):
         with pytest.raises(ValueError):
             TaskEnum("INVALID")
@@ -0,0 +1,254 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core.live import hub
+from app.models.tasks import Task
+from app.models.users import User
+from app.schemas.tasks import TaskEnum
+from app.services import expiry_service
+from app.services.expiry_service import (
+    TaskExpiryScheduler,
+    expire_overdue_tasks,
+    next_deadline,
+)
+from app.services.tasks_service import publish_task_event
+
+
+@pytest.fixture
+def seed_tasks(test_db, user_factory):
+    async def _seed():
+        user = user_factory()
+        test_db.add(user)
+        await test_db.commit()
+        await test_db.refresh(user)
+
+        now = datetime.now(timezone.utc)
+        tasks = [
+            Task(
+                user_id=user.id,
+                title=f"Overdue {i}",
+                deadline=now - timedelta(hours=i + 1),
+            )
+            for i in range(5)
+        ]
+        tasks.append(
+            Task(
+                user_id=user.id,
+                title="Done",
+                deadline=now - timedelta(hours=1),
+                is_completed=True,
+                status=TaskEnum.DONE,
+            )
+        )
+        tasks.append(
+            Task(user_id=user.id, title="Future", deadline=now + timedelta(minutes=5))
+        )
+        test_db.add_all(tasks)
+        await test_db.commit()
+        return now
+
+    return _seed
+
+
+async def statuses(test_db):
+    res = await test_db.execute(
+        select(Task.title, Task.status).execution_options(populate_existing=True)
+    )
+    return dict(res.all())
+
+
+@pytest.mark.asyncio
+class TestExpireOverdueTasks:
+
+    async def test_expires_in_chunks(self, test_db, seed_tasks):
+        now = await seed_tasks()
+
+        expired = await expire_overdue_tasks(test_db, now, chunk_size=2)
+
+        assert expired == 5
+        result = await statuses(test_db)
+        assert all(result[f"Overdue {i}"] == TaskEnum.EXPIRED for i in range(5))
+        assert result["Done"] == TaskEnum.DONE
+        assert result["Future"] == TaskEnum.IN_PROGRESS
+
+    async def test_bumps_tasks_version(self, test_db, seed_tasks):
+        now = await seed_tasks()
+        versions = select(User.tasks_version).execution_options(populate_existing=True)
+        before = (await test_db.execute(versions)).scalar_one()
+
+        await expire_overdue_tasks(test_db, now, chunk_size=2)
+
+        # one bump per chunk that changed something
+        assert (await test_db.execute(versions)).scalar_one() == before + 3
+
+    async def test_stamps_sync_version(self, test_db, seed_tasks):
+        now = await seed_tasks()
+
+        await expire_overdue_tasks(test_db, now, chunk_size=10)
+
+        res = await test_db.execute(
+            select(Task.status, Task.sync_version, User.tasks_version)
+            .join(User, User.id == Task.user_id)
+            .execution_options(populate_existing=True)
+        )
+        for status, sync_version, tasks_version in res:
+            if status == TaskEnum.EXPIRED:
+                assert sync_version == tasks_version
+            else:
+                assert sync_version < tasks_version
+
+    async def test_publishes_expired_events(self, test_db, seed_tasks):
+        now = await seed_tasks()
+        user_id = (await test_db.execute(select(User.id))).scalar_one()
+
+        with hub.subscribe(user_id) as subscription:
+            expired = await expire_overdue_tasks(test_db, now, chunk_size=10)
+
+            kinds = [(await subscription.next(0.01)).kind for _ in range(expired)]
+            assert kinds == ["expired"] * expired
+
+    async def test_publishes_only_rows_it_updated(
+        self, test_db, seed_tasks, monkeypatch
+    ):
+        now = await seed_tasks()
+        user_id = (await test_db.execute(select(User.id))).scalar_one()
+        bump_tasks_version = expiry_service.bump_tasks_version
+
+        async def completed_meanwhile(db, *user_ids):
+            # the owner finishes a task between the SELECT and the UPDATE
+            await db.execute(
+                update(Task)
+                .where(Task.title == "Overdue 0")
+                .values(is_completed=True, status=TaskEnum.DONE)
+            )
+            await bump_tasks_version(db, *user_ids)
+
+        monkeypatch.setattr(expiry_service, "bump_tasks_version", completed_meanwhile)
+
+        with hub.subscribe(user_id) as subscription:
+            expired = await expire_overdue_tasks(test_db, now, chunk_size=10)
+
+            events = [await subscription.next(0.01) for _ in range(expired)]
+            assert subscription.queue.empty()
+
+        assert expired == 4
+        result = await statuses(test_db)
+        assert result["Overdue 0"] == TaskEnum.DONE
+        titles = dict((await test_db.execute(select(Task.id, Task.title))).all())
+        task_ids = [json.loads(event.data)["task_id"] for event in events]
+        assert sorted(titles[task_id] for task_id in task_ids) == [
+            f"Overdue {i}" for i in range(1, 5)
+        ]
+
+    async def test_second_run_is_noop(self, test_db, seed_tasks):
+        now = await seed_tasks()
+
+        await expire_overdue_tasks(test_db, now, chunk_size=10)
+        assert await expire_overdue_tasks(test_db, now, chunk_size=10) == 0
+
+    async def test_next_deadline(self, test_db, seed_tasks):
+        now = await seed_tasks()
+
+        deadline = await next_deadline(test_db, now)
+
+        assert deadline.tzinfo is not None
+        assert timedelta(minutes=4) < deadline - now <= timedelta(minutes=5)
+
+
+@pytest.mark.asyncio
+class TestTaskExpiryScheduler:
+
+    def _scheduler(self, async_engine, **kwargs):
+        return TaskExpiryScheduler(engine=async_engine, **kwargs)
+
+    async def test_run_once_sleeps_until_next_deadline(
+        self, async_engine, test_db, seed_tasks
+    ):
+        await seed_tasks()
+        scheduler = self._scheduler(async_engine, chunk_size=10, max_sleep=3600)
+
+        delay = await scheduler.run_once()
+
+        assert 240 < delay <= 300
+        assert (await statuses(test_db))["Overdue 0"] == TaskEnum.EXPIRED
+
+    async def test_run_once_caps_sleep(self, async_engine):
+        scheduler = self._scheduler(async_engine, max_sleep=7)
+
+        assert await scheduler.run_once() == 7
+
+    async def test_start_and_stop(self, async_engine, test_db, seed_tasks):
+        await seed_tasks()
+        scheduler = self._scheduler(async_engine, chunk_size=10, max_sleep=3600)
+
+        scheduler.start()
+        for _ in range(50):
+            if (await statuses(test_db))["Overdue 4"] == TaskEnum.EXPIRED:
+                break
+            await asyncio.sleep(0.01)
+        await scheduler.stop()
+
+        assert (await statuses(test_db))["Overdue 4"] == TaskEnum.EXPIRED
+
+    async def test_run_once_skips_without_the_lock(
+        self, async_engine, test_db, seed_tasks, monkeypatch
+    ):
+        await seed_tasks()
+
+        @asynccontextmanager
+        async def held_elsewhere(conn):
+            yield False
+
+        monkeypatch.setattr(expiry_service, "expiry_lock", held_elsewhere)
+        scheduler = self._scheduler(async_engine, max_sleep=7)
+
+        assert await scheduler.run_once() == 7
+        assert (await statuses(test_db))["Overdue 0"] == TaskEnum.IN_PROGRESS
+
+    async def test_earlier_deadline_wakes_the_scheduler(
+        self, async_engine, test_db, user_factory
+    ):
+        user = user_factory()
+        test_db.add(user)
+        await test_db.commit()
+        scheduler = self._scheduler(async_engine, chunk_size=10, max_sleep=3600)
+
+        scheduler.start()
+        try:
+            while scheduler.next_run is None:
+                await asyncio.sleep(0.01)
+
+            task = Task(
+                user_id=user.id,
+                title="Soon",
+                deadline=datetime.now(timezone.utc) - timedelta(seconds=1),
+            )
+            test_db.add(task)
+            await test_db.commit()
+            next_run = scheduler.next_run
+            await publish_task_event("created", user.id, task.id, task)
+
+            # without the wake-up the next pass is an hour away
+            for _ in range(50):
+                if scheduler.next_run != next_run:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await scheduler.stop()
+
+        assert (await statuses(test_db))["Soon"] == TaskEnum.EXPIRED
+
+    async def test_later_deadline_does_not_wake(self, async_engine):
+        scheduler = self._scheduler(async_engine)
+        scheduler.next_run = datetime.now(timezone.utc) + timedelta(minutes=1)
+
+        scheduler.deadline_changed(datetime.now(timezone.utc) + timedelta(hours=1))
+        assert not scheduler._wake.is_set()
+
+        scheduler.deadline_changed(datetime.now() + timedelta(seconds=10))
+        assert scheduler._wake.is_set()
@@ -0,0 +1,189 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.admission import DEFAULT, PRIORITY, AdaptiveLimiter
+from app.core.metrics import RequestStats
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def limiter(**kwargs) -> AdaptiveLimiter:
+    options = {
+        "initial": 2,
+        "min_limit": 1,
+        "max_limit": 10,
+        "latency_target": 0.1,
+        "queue_timeout": 0.05,
+        "queue_size": 10,
+        "priority_headroom": 1,
+        "timer": Clock(),
+    }
+    options.update(kwargs)
+    return AdaptiveLimiter(**options)
+
+
+@pytest.mark.asyncio
+class TestAdaptiveLimiter:
+
+    async def test_admits_up_to_the_limit_then_sheds(self):
+        db_limiter = limiter()
+        await db_limiter.acquire()
+        await db_limiter.acquire()
+
+        with pytest.raises(HTTPException) as exc:
+            await db_limiter.acquire()
+
+        assert exc.value.status_code == 503
+        assert exc.value.headers == {"Retry-After": "1"}
+        assert db_limiter.stats()["shed"] == 1
+        assert db_limiter.queue_length() == 0
+
+    async def test_full_queue_sheds_without_waiting(self):
+        db_limiter = limiter(initial=1, queue_size=0, queue_timeout=10)
+        await db_limiter.acquire()
+
+        with pytest.raises(HTTPException):
+            await asyncio.wait_for(db_limiter.acquire(), 1)
+
+        assert db_limiter.queued == 0
+
+    async def test_queued_request_gets_the_released_slot(self):
+        db_limiter = limiter(initial=1, queue_timeout=1)
+        first = await db_limiter.acquire()
+
+        waiting = asyncio.create_task(db_limiter.acquire())
+        await asyncio.sleep(0)
+        first.release()
+        await waiting
+
+        assert db_limiter.inflight == 1
+        assert db_limiter.stats()["queued"] == 1
+
+    async def test_priority_lane_has_headroom_and_goes_first(self):
+        db_limiter = limiter(initial=1, queue_timeout=1)
+        first = await db_limiter.acquire()
+        # over the limit, within the headroom
+        second = await db_limiter.acquire(PRIORITY)
+
+        order = []
+
+        async def acquire(lane):
+            await db_limiter.acquire(lane)
+            order.append(lane)
+
+        default = asyncio.create_task(acquire(DEFAULT))
+        await asyncio.sleep(0)
+        priority = asyncio.create_task(acquire(PRIORITY))
+        await asyncio.sleep(0)
+
+        second.release()
+        await priority
+        assert order == [PRIORITY]
+
+        first.release()
+        await default
+        assert order == [PRIORITY, DEFAULT]
+
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        db_limiter = limiter(initial=1, queue_timeout=1)
+        slot = await db_limiter.acquire()
+
+        waiting = asyncio.create_task(db_limiter.acquire())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        assert db_limiter.queue_length() == 0
+        slot.release()
+        assert db_limiter.inflight == 0
+
+    async def test_release_is_idempotent(self):
+        db_limiter = limiter()
+        slot = await db_limiter.acquire()
+
+        slot.release()
+        slot.release()
+
+        assert db_limiter.inflight == 0
+
+    async def test_fast_samples_grow_a_busy_limit(self):
+        db_limiter = limiter(initial=2)
+        slots = [await db_limiter.acquire() for _ in range(2)]
+
+        for slot in slots:
+            slot.release()
+
+        assert db_limiter.limit == pytest.approx(2.5)
+
+    async def test_idle_limit_does_not_grow(self):
+        db_limiter = limiter(initial=4)
+
+        (await db_limiter.acquire()).release()
+
+        assert db_limiter.limit == 4
+
+    async def test_slow_samples_back_off_once_per_window(self):
+        clock = Clock()
+        db_limiter = limiter(initial=10, timer=clock)
+        slots = [await db_limiter.acquire() for _ in range(3)]
+
+        clock.now += 0.5
+        for slot in slots:
+            slot.release()
+        assert db_limiter.limit == pytest.approx(9)
+        assert db_limiter.decreases == 1
+
+        clock.now += 0.1
+        db_limiter.observe(0.0, failed=True)
+        assert db_limiter.limit == pytest.approx(8.1)
+
+    async def test_limit_stays_within_bounds(self):
+        db_limiter = limiter(initial=1, min_limit=1)
+
+        db_limiter.observe(1.0)
+
+        assert db_limiter.limit == 1
+
+    async def test_tracked_slot_samples_database_time(self):
+        clock = Clock()
+        db_limiter = limiter(initial=10, timer=clock)
+        stats = RequestStats()
+        stats.record("SELECT 1", 0.2)
+
+        slot = await db_limiter.acquire()
+        slot.track(stats)
+        # held long, but mostly off the database
+        clock.now += 0.5
+        stats.record("SELECT 1", 0.01)
+        stats.record_checkout(0.02)
+        slot.release()
+        assert db_limiter.decreases == 0
+
+        slot = await db_limiter.acquire()
+        slot.track(stats)
+        stats.record_checkout(0.2)
+        slot.release()
+        assert db_limiter.decreases == 1
+
+    async def test_priority_samples_leave_the_limit_alone(self):
+        clock = Clock()
+        db_limiter = limiter(initial=4, timer=clock)
+        slots = [await db_limiter.acquire(PRIORITY) for _ in range(4)]
+
+        clock.now += 0.5
+        for slot in slots:
+            slot.release()
+        slot = await db_limiter.acquire(PRIORITY)
+        slot.release(failed=True)
+
+        assert db_limiter.limit == 4
+        assert db_limiter.inflight == 0
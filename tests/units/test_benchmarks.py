@@ -0,0 +1,69 @@
+import pytest
+
+from app.api.auth import auth
+from benchmarks.harness import percentile
+from benchmarks.invalidation import measure
+from benchmarks.run import compare, run_suite
+
+
+def report(p95=10.0, rps=100.0, queries=2.0):
+    return {
+        "results": {
+            "task_list": {
+                "p95_ms": p95,
+                "throughput_rps": rps,
+                "queries_per_request": queries,
+            }
+        }
+    }
+
+
+class TestBenchmarkReport:
+
+    def test_percentile(self):
+        samples = [float(i) for i in range(101)]
+        assert percentile(samples, 50) == 50.0
+        assert percentile(samples, 99) == 99.0
+        assert percentile([3.0], 99) == 3.0
+
+    def test_compare_within_tolerance(self):
+        assert compare(report(), report(p95=11.0, rps=90.0), tolerance=0.2) == []
+
+    def test_compare_flags_regressions(self):
+        regressions = compare(
+            report(), report(p95=20.0, rps=50.0, queries=3.0), tolerance=0.2
+        )
+
+        assert len(regressions) == 3
+        assert all(line.startswith("task_list:") for line in regressions)
+
+    def test_compare_ignores_new_scenarios(self):
+        assert compare({"results": {}}, report(), tolerance=0.2) == []
+
+
+@pytest.mark.asyncio
+async def test_run_suite_smoke(monkeypatch):
+    monkeypatch.setattr(auth, "PASSWORD_HASH_EXECUTOR", "inline")
+
+    result = await run_suite(
+        users=3, tasks_per_user=4, requests=6, concurrency=2, login_requests=2
+    )
+
+    assert set(result["results"]) == {
+        "login_storm",
+        "task_list",
+        "toggle_complete",
+        "admin_users",
+    }
+    for name, scenario in result["results"].items():
+        assert scenario["errors"] == 0, name
+        assert scenario["queries_per_request"] > 0
+
+
+@pytest.mark.asyncio
+async def test_invalidation_smoke():
+    result = await measure(workers=3, messages=20)
+
+    assert result["messages"] == 20
+    assert result["gaps"] == 0
+    assert result["p99_ms"] >= result["p50_ms"] > 0
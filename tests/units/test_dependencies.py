@@ -1,9 +1,21 @@
+import asyncio
 from unittest.mock import MagicMock
 
 import pytest
 from fastapi import HTTPException
+from fastapi.requests import HTTPConnection
 
-from app.dependencies import task_valid, user_valid, validate_email
+from app import dependencies
+from app.core import admission
+from app.core.admission import AdaptiveLimiter, priority_lane
+from app.core.metrics import current_request
+from app.dependencies import (
+    get_async_db,
+    release_db,
+    task_valid,
+    user_valid,
+    validate_email,
+)
 
 
 @pytest.mark.asyncio
@@ -76,3 +88,79 @@ class TestValidateEmail:
     def test_validate_email_invalid(self, invalid_email):
         with pytest.raises(ValueError, match="Invalid email format"):
             validate_email(invalid_email)
+
+
+@pytest.mark.asyncio
+class TestGetAsyncDb:
+
+    @pytest.fixture
+    def db_limiter(self, monkeypatch):
+        db_limiter = AdaptiveLimiter(initial=1, queue_timeout=0.01)
+        monkeypatch.setattr(dependencies, "db_limiter", db_limiter)
+        monkeypatch.setattr(admission, "DB_LIMIT_ENABLED", True)
+        return db_limiter
+
+    def connection(self) -> HTTPConnection:
+        return HTTPConnection({"type": "http", "headers": [], "state": {}})
+
+    async def test_session_holds_a_slot_until_closed(self, db_limiter):
+        dependency = get_async_db(self.connection())
+        await anext(dependency)
+        assert db_limiter.inflight == 1
+
+        with pytest.raises(HTTPException) as exc:
+            await anext(get_async_db(self.connection()))
+        assert exc.value.status_code == 503
+
+        with pytest.raises(StopAsyncIteration):
+            await anext(dependency)
+        assert db_limiter.inflight == 0
+
+    async def test_release_db_frees_the_slot_early(self, db_limiter):
+        dependency = get_async_db(self.connection())
+        session = await anext(dependency)
+
+        await release_db(session)
+        assert db_limiter.inflight == 0
+
+        with pytest.raises(StopAsyncIteration):
+            await anext(dependency)
+        assert db_limiter.inflight == 0
+
+    async def test_priority_lane(self, db_limiter):
+        connection = self.connection()
+        priority_lane(connection)
+
+        await anext(get_async_db(self.connection()))
+        await anext(get_async_db(connection))
+
+        assert db_limiter.inflight == 2
+
+    @pytest.mark.parametrize("priority", [True, False])
+    async def test_login_storm_keeps_the_limit(self, monkeypatch, priority):
+        db_limiter = AdaptiveLimiter(
+            initial=8,
+            min_limit=2,
+            latency_target=0.25,
+            queue_timeout=5,
+            queue_size=100,
+        )
+        monkeypatch.setattr(dependencies, "db_limiter", db_limiter)
+        monkeypatch.setattr(admission, "DB_LIMIT_ENABLED", True)
+
+        async def login():
+            connection = self.connection()
+            if priority:
+                priority_lane(connection)
+            dependency = get_async_db(connection)
+            await anext(dependency)
+            # a fast user lookup, then hashing while the session stays open
+            current_request.get().record("SELECT Users", 0.002)
+            await asyncio.sleep(0.4)
+            with pytest.raises(StopAsyncIteration):
+                await anext(dependency)
+
+        await asyncio.gather(*(login() for _ in range(24)))
+
+        assert db_limiter.decreases == 0
+        assert db_limiter.limit >= 8
@@ -0,0 +1,123 @@
+from app.core.broker import Broker, LocalBroker
+from app.core.cache import TTLCache
+from app.core.invalidation import INVALIDATION_CHANNEL, InvalidationBus
+
+
+class SharedBroker(Broker):
+    shared = True
+
+    def __init__(self):
+        super().__init__()
+        self.up = True
+        self.published = []
+
+    async def publish(self, channel: str, message: dict) -> bool:
+        if not self.up:
+            return False
+        self.published.append((channel, dict(message)))
+        return True
+
+    async def reconnect(self):
+        self.up = True
+        for handler in self.connect_handlers:
+            await handler()
+
+
+def cached_bus(broker: Broker, **kwargs) -> tuple[InvalidationBus, TTLCache]:
+    bus = InvalidationBus(broker, **kwargs)
+    cache = TTLCache(maxsize=10, ttl=60)
+    bus.register("user", cache.invalidate, cache.clear)
+    cache.set("a@example.com", 1)
+    cache.set("b@example.com", 2)
+    return bus, cache
+
+
+def message(seq: int, key: str = "a@example.com", **extra) -> dict:
+    return {"o": "peer", "s": seq, "n": "user", "k": key, **extra}
+
+
+class TestInvalidationBus:
+
+    async def test_local_broker_only_invalidates_here(self):
+        broker = LocalBroker()
+        bus, cache = cached_bus(broker)
+
+        await bus.invalidate("user", "a@example.com", version=3)
+
+        assert cache.get("a@example.com") is None
+        assert cache.get("b@example.com") == 2
+        assert bus.version_of("user", "a@example.com") == 3
+        assert not bus.outbox
+
+    async def test_publishes_numbered_messages(self):
+        broker = SharedBroker()
+        bus, _ = cached_bus(broker)
+
+        await bus.invalidate("user", "a@example.com", version=2)
+        await bus.invalidate("user", "b@example.com")
+
+        assert [m for _, m in broker.published] == [
+            {"o": bus.origin, "s": 1, "n": "user", "k": "a@example.com", "v": 2},
+            {"o": bus.origin, "s": 2, "n": "user", "k": "b@example.com"},
+        ]
+        assert {channel for channel, _ in broker.published} == {INVALIDATION_CHANNEL}
+
+    async def test_receive_applies_and_drops_duplicates(self):
+        bus, cache = cached_bus(SharedBroker())
+
+        bus.receive(message(1, v=4))
+        cache.set("a@example.com", 1)
+        bus.receive(message(1, v=4))
+
+        assert cache.get("a@example.com") == 1
+        assert bus.version_of("user", "a@example.com") == 4
+        assert bus.stats()["duplicates"] == 1
+
+    async def test_versions_only_move_forward(self):
+        bus, _ = cached_bus(SharedBroker())
+
+        bus.receive(message(1, v=5))
+        bus.receive(message(2, v=3))
+
+        assert bus.version_of("user", "a@example.com") == 5
+        assert bus.version_of("user", "c@example.com") == 0
+
+    async def test_gap_clears_every_cache(self):
+        bus, cache = cached_bus(SharedBroker())
+
+        bus.receive(message(1))
+        bus.receive(message(3))
+
+        assert len(cache) == 0
+        assert bus.stats()["gaps"] == 1
+
+    async def test_reconnect_clears_and_replays_outbox(self):
+        broker = SharedBroker()
+        bus, cache = cached_bus(broker)
+        await bus.invalidate("user", "a@example.com")
+
+        broker.up = False
+        await bus.invalidate("user", "b@example.com")
+        cache.set("c@example.com", 3)
+        await broker.reconnect()
+
+        assert len(cache) == 0
+        assert [m["s"] for _, m in broker.published] == [1, 1, 2]
+
+    async def test_outbox_overflow_sends_flush(self):
+        broker = SharedBroker()
+        bus, cache = cached_bus(broker, outbox_size=2)
+
+        broker.up = False
+        for key in ("a", "b", "c"):
+            await bus.invalidate("user", key)
+        await broker.reconnect()
+
+        assert [m for _, m in broker.published] == [
+            {"o": bus.origin, "s": 4, "flush": True}
+        ]
+        assert list(bus.outbox) == [{"o": bus.origin, "s": 4, "flush": True}]
+
+        receiver, receiver_cache = cached_bus(SharedBroker())
+        receiver.receive(broker.published[0][1])
+        assert len(receiver_cache) == 0
@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from app.core.broker import Broker, LocalBroker
+from app.core.live import EventHub, LiveEvent, SlowConsumer, Subscription
+
+
+def message(user_id: int, kind: str = "updated") -> dict:
+    return {"event": kind, "user_id": user_id, "task_id": 1, "task": None}
+
+
+class SharedBroker(Broker):
+    shared = True
+
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    async def publish(self, channel: str, message: dict):
+        self.published.append((channel, message))
+
+
+class TestSubscription:
+
+    async def test_next_times_out_to_none(self):
+        subscription = Subscription(1, queue_size=2)
+
+        assert await subscription.next(0.01) is None
+
+    async def test_overflow_drops_backlog_and_signals(self):
+        subscription = Subscription(1, queue_size=2)
+        event = LiveEvent("updated", "{}")
+
+        assert subscription.offer(event)
+        assert subscription.offer(event)
+        assert not subscription.offer(event)
+
+        with pytest.raises(SlowConsumer):
+            await subscription.next(0.01)
+
+
+class TestEventHub:
+
+    async def test_fans_out_to_the_users_subscribers_only(self):
+        hub = EventHub(LocalBroker(), queue_size=10)
+
+        with hub.subscribe(1) as first, hub.subscribe(1) as second:
+            with hub.subscribe(2) as other:
+                await hub.publish(message(1))
+
+                for subscription in (first, second):
+                    event = await subscription.next(0.01)
+                    assert event.kind == "updated"
+                    assert json.loads(event.data)["user_id"] == 1
+                assert await other.next(0.01) is None
+
+        assert hub.subscribers == {}
+        assert hub.stats() == {"subscribers": 0, "delivered": 2, "dropped": 0}
+
+    async def test_slow_consumer_is_dropped(self):
+        hub = EventHub(LocalBroker(), queue_size=1)
+
+        with hub.subscribe(1) as slow:
+            await hub.publish(message(1))
+            await hub.publish(message(1))
+
+            assert hub.stats()["dropped"] == 1
+            assert slow not in hub.subscribers.get(1, set())
+
+    async def test_local_hub_skips_users_without_subscribers(self):
+        hub = EventHub(LocalBroker())
+
+        assert not hub.wants(1)
+        with hub.subscribe(1):
+            assert hub.wants(1)
+
+    async def test_shared_broker_receives_every_event(self):
+        broker = SharedBroker()
+        hub = EventHub(broker)
+
+        assert hub.wants(1)
+        await hub.publish(message(1))
+        assert broker.published == [("tasks", message(1))]
+
+    async def test_broker_messages_reach_local_subscribers(self):
+        broker = LocalBroker()
+        hub = EventHub(broker)
+
+        with hub.subscribe(1) as subscription:
+            broker.dispatch("tasks", message(1, "deleted"))
+            assert (await subscription.next(0.01)).kind == "deleted"
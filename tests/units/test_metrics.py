@@ -0,0 +1,108 @@
+import logging
+
+from app.core import metrics
+from app.core.metrics import (
+    Histogram,
+    MetricsRegistry,
+    RequestStats,
+    fingerprint,
+    log_query_budget,
+)
+
+
+class TestHistogram:
+
+    def test_observe_places_value_in_bucket(self):
+        hist = Histogram((1, 5))
+        hist.observe(0.5)
+        hist.observe(1)
+        hist.observe(7)
+
+        assert hist.counts == [2, 0, 1]
+        assert hist.count == 3
+        assert hist.sum == 8.5
+
+    def test_render_is_cumulative(self):
+        hist = Histogram((1, 5))
+        hist.observe(0.5)
+        hist.observe(3)
+        lines = []
+        hist.render("x", 'a="b"', lines)
+
+        assert lines == [
+            'x_bucket{a="b",le="1"} 1',
+            'x_bucket{a="b",le="5"} 2',
+            'x_bucket{a="b",le="+Inf"} 2',
+            'x_sum{a="b"} 3.5',
+            'x_count{a="b"} 2',
+        ]
+
+
+class TestMetricsRegistry:
+
+    def test_route_metrics_are_reused(self):
+        registry = MetricsRegistry()
+        assert registry.route("GET", "/a") is registry.route("GET", "/a")
+
+    def test_render_requests_and_gauges(self):
+        registry = MetricsRegistry()
+        stats = RequestStats()
+        stats.queries = 2
+        registry.observe_request("GET", '/q"', 200, 0.01, stats)
+
+        text = registry.render({"db_pool": {"pool": "StaticPool", "checked_out": 3}})
+
+        assert 'http_requests_total{method="GET",route="/q\\"",status="200"} 1' in text
+        assert "db_pool_checked_out 3" in text
+        assert "db_pool_pool" not in text
+
+
+class TestQueryCounter:
+
+    def test_fingerprint_normalises_literals_and_in_lists(self):
+        statement = "SELECT *\n  FROM t WHERE id IN (?, ?, ?) AND name = 'x' LIMIT 10"
+        assert fingerprint(statement) == (
+            "SELECT * FROM t WHERE id IN (?...) AND name = ? LIMIT ?"
+        )
+
+    def test_repeated_groups_by_fingerprint(self):
+        stats = RequestStats()
+        for i in range(3):
+            stats.record(f"SELECT * FROM t WHERE id = {i}")
+        stats.record("SELECT 1")
+
+        assert stats.queries == 4
+        assert stats.repeated(3) == {"SELECT * FROM t WHERE id = ?": 3}
+
+    def test_logs_requests_over_threshold(self, monkeypatch, caplog):
+        monkeypatch.setattr(metrics, "QUERY_LOG_THRESHOLD", 2)
+        stats = RequestStats()
+        for _ in range(3):
+            stats.record("SELECT 1")
+
+        with caplog.at_level(logging.WARNING, logger="app.core.metrics"):
+            log_query_budget("GET", "/x", stats)
+
+        assert "GET /x issued 3 queries" in caplog.text
+        assert "3 x SELECT ?" in caplog.text
+
+    def test_logs_possible_n_plus_one(self, monkeypatch, caplog):
+        monkeypatch.setattr(metrics, "QUERY_LOG_THRESHOLD", 0)
+        monkeypatch.setattr(metrics, "QUERY_REPEAT_THRESHOLD", 2)
+        stats = RequestStats()
+        stats.record("SELECT * FROM t WHERE id = 1")
+        stats.record("SELECT * FROM t WHERE id = 2")
+
+        with caplog.at_level(logging.WARNING, logger="app.core.metrics"):
+            log_query_budget("GET", "/x", stats)
+
+        assert "possible N+1" in caplog.text
+
+    def test_quiet_within_budget(self, caplog):
+        stats = RequestStats()
+        stats.record("SELECT 1")
+
+        with caplog.at_level(logging.WARNING, logger="app.core.metrics"):
+            log_query_budget("GET", "/x", stats)
+
+        assert caplog.text == ""
@@ -0,0 +1,32 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import decode_cursor, encode_cursor
+
+
+class TestCursors:
+
+    def test_roundtrip(self):
+        cursor = encode_cursor({"id": 42, "deadline": "2026-01-01T00:00:00"})
+
+        assert "=" not in cursor
+        assert decode_cursor(cursor, lambda key: key) == {
+            "id": 42,
+            "deadline": "2026-01-01T00:00:00",
+        }
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "not base64!",
+            encode_cursor({"other": 1}),
+            encode_cursor({"id": "x"}),
+            "WzFd",  # [1]
+        ],
+    )
+    def test_invalid_cursor_is_400(self, cursor):
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor(cursor, lambda key: int(key["id"]))
+
+        assert exc.value.status_code == 400
+        assert exc.value.detail == "Invalid cursor"
@@ -0,0 +1,153 @@
+import pytest
+from fastapi import HTTPException
+from starlette.requests import HTTPConnection
+
+from app.core.ratelimit import (
+    MemoryStore,
+    Rate,
+    RateLimit,
+    RateLimitStore,
+    SharedMemoryStore,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def connection(host: str = "10.0.0.1", user: str | None = None) -> HTTPConnection:
+    headers = [(b"x-user", user.encode())] if user else []
+    return HTTPConnection({"type": "http", "client": (host, 1234), "headers": headers})
+
+
+def header_user(connection: HTTPConnection) -> str | None:
+    return connection.headers.get("x-user")
+
+
+@pytest.fixture(params=["memory", "shared"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryStore(maxsize=100)
+        return
+
+    store = SharedMemoryStore(str(tmp_path / "buckets"), slots=64)
+    yield store
+    store.close()
+
+
+class TestStores:
+
+    def test_store_interface_is_abstract(self):
+        with pytest.raises(TypeError):
+            RateLimitStore()
+
+    def test_burst_then_refill(self, store):
+        rate = Rate(2, 10)
+
+        assert store.take("k", rate, 0.0) == 0
+        assert store.take("k", rate, 0.0) == 0
+        assert store.take("k", rate, 0.0) == pytest.approx(5.0)
+        assert store.take("k", rate, 5.0) == 0
+        assert store.take("k", rate, 5.0) > 0
+
+    def test_keys_are_independent(self, store):
+        rate = Rate(1, 10)
+
+        assert store.take("a", rate, 0.0) == 0
+        assert store.take("b", rate, 0.0) == 0
+        assert store.take("a", rate, 0.0) > 0
+
+    def test_refill_is_capped_at_the_limit(self, store):
+        rate = Rate(2, 10)
+        store.take("k", rate, 0.0)
+
+        for _ in range(2):
+            assert store.take("k", rate, 1000.0) == 0
+        assert store.take("k", rate, 1000.0) > 0
+
+    def test_clear(self, store):
+        rate = Rate(1, 10)
+        store.take("k", rate, 0.0)
+        store.clear()
+
+        assert store.take("k", rate, 0.0) == 0
+
+    def test_memory_store_evicts_least_recently_used(self):
+        store = MemoryStore(maxsize=2)
+        rate = Rate(1, 10)
+        for key in ("a", "b", "a", "c"):
+            store.take(key, rate, 0.0)
+
+        assert store.take("a", rate, 0.0) > 0
+        assert store.take("b", rate, 0.0) == 0
+
+    def test_shared_store_is_shared_between_workers(self, tmp_path):
+        path = str(tmp_path / "buckets")
+        first, second = SharedMemoryStore(path, 64), SharedMemoryStore(path, 64)
+        rate = Rate(2, 10)
+
+        assert first.take("k", rate, 0.0) == 0
+        assert second.take("k", rate, 0.0) == 0
+        assert first.take("k", rate, 0.0) > 0
+
+        first.close()
+        second.close()
+
+    def test_shared_store_full_set_evicts_oldest(self, tmp_path):
+        store = SharedMemoryStore(str(tmp_path / "buckets"), slots=4)
+        rate = Rate(1, 100)
+        for i, key in enumerate("abcde"):
+            store.take(key, rate, float(i))
+
+        assert store.take("e", rate, 5.0) > 0
+        # "a" was the oldest of one 4-way set and starts over
+        assert store.take("a", rate, 5.0) == 0
+        store.close()
+
+
+class TestRateLimit:
+
+    async def test_rejects_with_retry_after(self):
+        limit = RateLimit("t", per_ip=Rate(1, 60), store=MemoryStore(10), timer=Clock())
+
+        await limit(connection())
+        with pytest.raises(HTTPException) as exc:
+            await limit(connection())
+
+        assert exc.value.status_code == 429
+        assert exc.value.headers == {"Retry-After": "60"}
+        assert limit.rejected == 1
+
+    async def test_ip_user_and_route_buckets(self):
+        limit = RateLimit(
+            "t",
+            per_ip=Rate(10, 60),
+            per_user=Rate(1, 60),
+            per_route=Rate(2, 60),
+            user_key=header_user,
+            store=MemoryStore(10),
+            timer=Clock(),
+        )
+
+        await limit(connection(user="ann"))
+        with pytest.raises(HTTPException):
+            await limit(connection(user="ann"))
+
+        # a different user from the same IP, and an anonymous caller
+        await limit(connection(user="bob"))
+        with pytest.raises(HTTPException):
+            # the whole policy is out of tokens now
+            await limit(connection("10.0.0.2"))
+
+    async def test_websockets_are_not_counted(self):
+        limit = RateLimit("t", per_route=Rate(1, 60), store=MemoryStore(10))
+        websocket = HTTPConnection(
+            {"type": "websocket", "client": ("10.0.0.1", 1), "headers": []}
+        )
+
+        await limit(websocket)
+        await limit(websocket)
@@ -0,0 +1,16 @@
+from app.core.responses import etag_matches
+
+
+class TestETags:
+
+    def test_weak_comparison(self):
+        assert etag_matches('W/"1-a"', 'W/"1-a"')
+        assert etag_matches('"x", W/"1-a"', '"1-a"')
+        assert etag_matches("*", '"anything"')
+        assert not etag_matches(None, '"x"')
+        assert not etag_matches('"y"', '"x"')
+
+    def test_strong_comparison(self):
+        assert etag_matches('"x"', '"x"', weak=False)
+        assert not etag_matches('W/"x"', '"x"', weak=False)
+        assert not etag_matches('W/"x"', 'W/"x"', weak=False)
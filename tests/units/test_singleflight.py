@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+class TestSingleFlight:
+
+    async def test_concurrent_callers_share_one_call(self):
+        flights = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def fn():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return object()
+
+        tasks = [asyncio.create_task(flights.do("k", fn)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert calls == 1
+        assert results[0] is results[1] is results[2]
+        assert flights.stats() == {"inflight": 0, "leaders": 1, "coalesced": 2}
+
+    async def test_different_keys_and_later_calls_run_again(self):
+        flights = SingleFlight()
+
+        async def fn():
+            return 1
+
+        await asyncio.gather(flights.do("a", fn), flights.do("b", fn))
+        await flights.do("a", fn)
+
+        assert flights.stats()["leaders"] == 3
+
+    async def test_exception_reaches_every_caller(self):
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            raise ValueError("boom")
+
+        tasks = [asyncio.create_task(flights.do("k", fn)) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert flights.calls == {}
+
+    async def test_cancelled_leader_hands_over_to_a_waiter(self):
+        flights = SingleFlight()
+        started = asyncio.Event()
+
+        async def stuck():
+            started.set()
+            await asyncio.Event().wait()
+
+        async def fn():
+            return "fresh"
+
+        leader = asyncio.create_task(flights.do("k", stuck))
+        await started.wait()
+        waiter = asyncio.create_task(flights.do("k", fn))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+
+        assert await waiter == "fresh"
+        assert flights.stats()["leaders"] == 2